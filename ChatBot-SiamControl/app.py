@@ -1,7 +1,16 @@
+import hmac
+import os
+import sys
+import time
+
 import streamlit as st
-from chatbot.bot import responder
+from chatbot.cliente import URL_SERVICIO, obtener_cliente
+from chatbot.consultas import COLUMNAS_FILTRO
+from chatbot.datos import COLUMNAS_CONTRATOS, rango_de_fecha, rango_proximos_dias
+from chatbot.exportar import FORMATOS, exportar
+from chatbot.metricas import iniciar_desde_entorno, metricas
+from chatbot.repositorio import obtener_repositorio
 import pandas as pd
-import os
 
 st.set_page_config(page_title="Chatbot Contratos RRHH-TI", page_icon="🤖")
 st.title("🤖 Chatbot Interno de Contratos y Accesos")
@@ -19,57 +28,141 @@ opciones = [
 ]
 modo = st.selectbox("Selecciona el tipo de consulta:", opciones)
 
+# Tiempo de cada rerun por modo (ver panel de administración más abajo)
+inicio_modo = time.perf_counter()
+metricas.contar('streamlit_modo', modo=modo)
+iniciar_desde_entorno()
+
 if 'history' not in st.session_state:
     st.session_state['history'] = []
 
-# Cargar el CSV adaptado
-contratos_path = os.path.join('data', 'contratos.csv')
-df = pd.read_csv(contratos_path)
-
-# Renombrar columnas si es necesario para mantener consistencia
-col_rename = {
-    'Fch. VENCIMIENTO': 'Fch. VENCIMIENTO',
-    'Fch. Vto.': 'Fch. VENCIMIENTO',
-    'Nº Celular': 'Nº Celular',
-    'Email': 'Email',
-    'DNI / C.E.': 'DNI / C.E.',
-    'Apellidos y nombres': 'Apellidos y nombres',
-    'Régimen Laboral': 'Régimen Laboral',
-    'Tipo de Contrato': 'Tipo de Contrato',
-    'Act': 'Act',
-    'Usuario': 'Usuario'
-}
-df.rename(columns=col_rename, inplace=True)
-
-# Seleccionar solo las columnas requeridas
-columnas_requeridas = [
-    'DNI / C.E.', 'Apellidos y nombres', 'Régimen Laboral', 'Tipo de Contrato',
-    'Act', 'Usuario', 'Nº Celular', 'Fch. VENCIMIENTO', 'Email'
-]
-df = df[columnas_requeridas]
+# Contratos compartidos por todas las sesiones, a través del repositorio del
+# proceso: en memoria (cargados una vez y recargados si cambia el archivo) o
+# SQLite, según SIACON_BACKEND. Con SIACON_SERVICIO las consultas van al
+# servicio de contratos (python -m chatbot.cli servicio) y la app no los carga.
+repo = obtener_cliente() if URL_SERVICIO else obtener_repositorio()
+version = repo.version
+
+
+def consulta_activa(clave, consultar):
+    """
+    Recuerda la última consulta hecha con el botón para que los resultados
+    sigan visibles en los reruns siguientes (p. ej. al pedir la exportación).
+    """
+    if consultar:
+        st.session_state['consulta'] = clave
+    return st.session_state.get('consulta') == clave
+
+
+def seccion_exportar(resultados, filtro, nombre_archivo, etiqueta='Exportar resultados'):
+    """
+    Ofrece exportar los resultados en Excel o CSV. El archivo se genera solo
+    cuando el usuario lo pide y se reutiliza para el mismo filtro y versión
+    de datos, en lugar de escribir el Excel completo en cada rerun.
+    `resultados` puede ser el DataFrame o una función que lo arma.
+    """
+    formato = st.radio("Formato:", list(FORMATOS), horizontal=True, key=f'formato_{nombre_archivo}')
+    pedido = (filtro, formato)
+    if st.button(etiqueta, key=f'exportar_{nombre_archivo}'):
+        st.session_state['exportacion'] = pedido
+    if st.session_state.get('exportacion') == pedido:
+        extension, mime = FORMATOS[formato]
+        if callable(resultados):
+            resultados = resultados()
+        with st.spinner("Generando archivo..."):
+            datos = exportar(resultados, formato, filtro, version)
+        st.download_button(f'Descargar {extension.upper()}', datos, file_name=f'{nombre_archivo}.{extension}', mime=mime)
+
+
+def tabla_paginada(filtro, nombre_archivo, filtros=None, desde=None, hasta=None, orden='Apellidos y nombres',
+                   mensaje_vacio="No se encontraron contratos.", etiqueta='Exportar resultados'):
+    """
+    Muestra solo la página visible de la consulta (filtrada y ordenada sobre
+    los índices del proceso) con sus totales, en lugar de enviar todo el
+    DataFrame al navegador, y ofrece exportar el resultado completo.
+    """
+    col_orden, col_desc, col_tam, col_pagina = st.columns([3, 2, 2, 2])
+    orden = col_orden.selectbox("Ordenar por:", COLUMNAS_CONTRATOS, index=COLUMNAS_CONTRATOS.index(orden), key=f'orden_{nombre_archivo}')
+    descendente = col_desc.checkbox("Descendente", key=f'desc_{nombre_archivo}')
+    tam_pagina = col_tam.selectbox("Filas por página:", [25, 50, 100, 500], index=1, key=f'tam_{nombre_archivo}')
+    pagina = col_pagina.number_input("Página:", min_value=1, value=1, step=1, key=f'pagina_{nombre_archivo}')
+    consulta = repo.consultar(filtros, desde, hasta, orden, descendente, pagina, tam_pagina)
+    if not consulta['total']:
+        st.info(mensaje_vacio)
+        return
+    st.dataframe(consulta['filas'])
+    st.caption(f"Filas {consulta['desde_fila']}–{consulta['hasta_fila']} de {consulta['total']} "
+               f"(página {consulta['pagina']} de {consulta['paginas']})")
+    seccion_exportar(lambda: repo.resultado(filtros, desde, hasta, orden, descendente),
+                     (filtro, orden, descendente), nombre_archivo, etiqueta)
+
+
+def panel_admin():
+    """
+    Panel oculto con las latencias (p50/p95/p99) por etapa, intent y modo.
+    Se abre con ?admin=<clave> en la URL, donde la clave es
+    SIACON_ADMIN_CLAVE; si esa variable no está definida, no hay panel.
+    """
+    clave = os.environ.get('SIACON_ADMIN_CLAVE')
+    pedida = st.query_params.get('admin')
+    if not clave or pedida is None or not hmac.compare_digest(pedida.encode('utf-8'), clave.encode('utf-8')):
+        return
+    resumen = metricas.resumen()
+    with st.sidebar:
+        st.header("Métricas")
+        tramos = pd.DataFrame([
+            {
+                'tramo': t['nombre'],
+                'etiquetas': ', '.join(f'{k}={v}' for k, v in t['etiquetas'].items()),
+                'cuenta': t['cuenta'],
+                'p50 ms': t['p50'] * 1000,
+                'p95 ms': t['p95'] * 1000,
+                'p99 ms': t['p99'] * 1000,
+                'máx ms': t['maximo'] * 1000,
+            }
+            for t in resumen['tramos']
+        ])
+        st.dataframe(tramos, hide_index=True)
+        st.dataframe(pd.DataFrame([
+            {'contador': c['nombre'], 'etiquetas': ', '.join(f'{k}={v}' for k, v in c['etiquetas'].items()), 'valor': c['valor']}
+            for c in resumen['contadores']
+        ]), hide_index=True)
+        bot = sys.modules.get('chatbot.bot')
+        if bot is not None:
+            st.json(bot.cache_respuestas.estadisticas(), expanded=False)
+        st.download_button("Descargar (Prometheus)", metricas.texto_prometheus(), file_name='metricas.txt', mime='text/plain')
+        if st.button("Reiniciar métricas"):
+            metricas.reiniciar()
+
 
 if modo == "Consulta de contratos por vencimiento":
-    fecha = st.text_input("Fecha de vencimiento (YYYY-MM-DD o solo año-mes):")
-    if st.button("Consultar") and fecha:
-        # Filtrar por fecha exacta o por mes
-        if len(fecha) == 7:  # año-mes
-            resultados = df[df['Fch. VENCIMIENTO'].astype(str).str.startswith(fecha)]
-        else:
-            resultados = df[df['Fch. VENCIMIENTO'].astype(str) == fecha]
-        if not resultados.empty:
-            st.dataframe(resultados)
-            from io import BytesIO
-            output = BytesIO()
-            resultados.to_excel(output, index=False, engine='openpyxl')
-            st.download_button('Exportar resultados a Excel', output.getvalue(), file_name='contratos_vencidos.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        else:
-            st.info("No se encontraron contratos para esa fecha.")
+    tipo_busqueda = st.radio("Buscar por:", ["Fecha, mes o año", "Rango de fechas", "Próximos días"], horizontal=True)
+    rango = None
+    if tipo_busqueda == "Fecha, mes o año":
+        fecha = st.text_input("Fecha de vencimiento (YYYY-MM-DD, año-mes o año):")
+        if fecha:
+            rango = rango_de_fecha(fecha)
+    elif tipo_busqueda == "Rango de fechas":
+        seleccion = st.date_input("Vencen entre:", value=())
+        if len(seleccion) == 2:
+            rango = tuple(pd.Timestamp(d) for d in seleccion)
+    else:
+        dias = st.number_input("Vencen en los próximos N días:", min_value=1, max_value=36500, value=30, step=1)
+        rango = rango_proximos_dias(dias)
+    if consulta_activa((modo, rango), st.button("Consultar")):
+        if rango:
+            # Búsquedas binarias sobre el índice de fechas de los contratos
+            tabla_paginada((modo, rango), 'contratos_vencidos', desde=rango[0], hasta=rango[1], orden='Fch. VENCIMIENTO',
+                           mensaje_vacio="No se encontraron contratos para esa fecha.")
+        elif tipo_busqueda == "Fecha, mes o año" and fecha:
+            st.info("Ingresa una fecha válida (YYYY-MM-DD, año-mes o año).")
 elif modo == "Ver todos los contratos":
-    st.dataframe(df)
-    from io import BytesIO
-    output = BytesIO()
-    df.to_excel(output, index=False, engine='openpyxl')
-    st.download_button('Exportar todos a Excel', output.getvalue(), file_name='contratos_todos.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    with st.expander("Filtros"):
+        filtros = {col: st.multiselect(f"{col}:", repo.valores_distintos(col), key=f'filtro_{col}') for col in COLUMNAS_FILTRO}
+        seleccion = st.date_input("Vencen entre:", value=(), key='filtro_fechas')
+    desde, hasta = (pd.Timestamp(seleccion[0]), pd.Timestamp(seleccion[1])) if len(seleccion) == 2 else (None, None)
+    filtro = (modo, tuple((col, tuple(v)) for col, v in filtros.items()), desde, hasta)
+    tabla_paginada(filtro, 'contratos_todos', filtros, desde, hasta, etiqueta='Exportar todos')
 elif modo == "Chat libre (pregunta lo que quieras)":
     st.info("""
 Puedes escribir preguntas abiertas como:
@@ -80,14 +173,19 @@ El bot intentará interpretar tu consulta de la mejor manera posible.
 """)
     user_input = st.text_input("Escribe tu pregunta:")
     if st.button("Enviar") and user_input:
-        respuesta = responder(user_input)
+        if URL_SERVICIO:
+            respuesta = repo.responder(user_input)
+        else:
+            # El motor de intents solo se carga en el modo de chat
+            from chatbot.bot import responder
+            respuesta = responder(user_input)
         st.session_state['history'].append((user_input, respuesta))
 elif modo == "Buscar número de celular por nombre":
     st.write("Puedes ingresar nombre, DNI o email:")
     valor = st.text_input("Nombre, DNI o Email del empleado:")
     if st.button("Buscar") and valor:
         from chatbot.datos import buscar_celular
-        resultado = buscar_celular(df, valor)
+        resultado = buscar_celular(repo, valor)
         if resultado:
             st.success(f"El número de celular de {resultado['nombre']} es {resultado['celular']}")
         else:
@@ -97,50 +195,32 @@ elif modo == "Buscar email por nombre":
     valor = st.text_input("Nombre o DNI del empleado:")
     if st.button("Buscar") and valor:
         from chatbot.datos import buscar_email
-        resultado = buscar_email(df, valor)
+        resultado = buscar_email(repo, valor)
         if resultado:
             st.success(f"El email de {resultado['nombre']} es {resultado['email']}")
         else:
             st.error("No se encontró información para ese valor.")
 elif modo == "Contratos por régimen laboral":
-    regimen = st.selectbox("Selecciona el régimen laboral:", df['Régimen Laboral'].unique())
-    if st.button("Consultar") and regimen:
-        resultados = df[df['Régimen Laboral'] == regimen]
-        if not resultados.empty:
-            st.dataframe(resultados)
-            from io import BytesIO
-            output = BytesIO()
-            resultados.to_excel(output, index=False, engine='openpyxl')
-            st.download_button('Exportar resultados a Excel', output.getvalue(), file_name='contratos_regimen.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        else:
-            st.info("No se encontraron contratos para ese régimen laboral.")
+    regimen = st.selectbox("Selecciona el régimen laboral:", repo.valores_distintos('Régimen Laboral'))
+    if consulta_activa((modo, regimen), st.button("Consultar")) and regimen:
+        tabla_paginada((modo, regimen), 'contratos_regimen', filtros={'Régimen Laboral': regimen},
+                       mensaje_vacio="No se encontraron contratos para ese régimen laboral.")
 elif modo == "Contratos por tipo de contrato":
-    tipo_contrato = st.selectbox("Selecciona el tipo de contrato:", df['Tipo de Contrato'].unique())
-    if st.button("Consultar") and tipo_contrato:
-        resultados = df[df['Tipo de Contrato'] == tipo_contrato]
-        if not resultados.empty:
-            st.dataframe(resultados)
-            from io import BytesIO
-            output = BytesIO()
-            resultados.to_excel(output, index=False, engine='openpyxl')
-            st.download_button('Exportar resultados a Excel', output.getvalue(), file_name='contratos_tipo.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        else:
-            st.info("No se encontraron contratos para ese tipo de contrato.")
+    tipo_contrato = st.selectbox("Selecciona el tipo de contrato:", repo.valores_distintos('Tipo de Contrato'))
+    if consulta_activa((modo, tipo_contrato), st.button("Consultar")) and tipo_contrato:
+        tabla_paginada((modo, tipo_contrato), 'contratos_tipo', filtros={'Tipo de Contrato': tipo_contrato},
+                       mensaje_vacio="No se encontraron contratos para ese tipo de contrato.")
 elif modo == "Contratos por usuario":
-    usuario = st.selectbox("Selecciona el usuario:", df['Usuario'].unique())
-    if st.button("Consultar") and usuario:
-        resultados = df[df['Usuario'] == usuario]
-        if not resultados.empty:
-            st.dataframe(resultados)
-            from io import BytesIO
-            output = BytesIO()
-            resultados.to_excel(output, index=False, engine='openpyxl')
-            st.download_button('Exportar resultados a Excel', output.getvalue(), file_name='contratos_usuario.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        else:
-            st.info("No se encontraron contratos para ese usuario.")
+    usuario = st.selectbox("Selecciona el usuario:", repo.valores_distintos('Usuario'))
+    if consulta_activa((modo, usuario), st.button("Consultar")) and usuario:
+        tabla_paginada((modo, usuario), 'contratos_usuario', filtros={'Usuario': usuario},
+                       mensaje_vacio="No se encontraron contratos para ese usuario.")
 
 st.markdown("---")
 st.subheader("Historial de consultas")
 for pregunta, respuesta in reversed(st.session_state['history']):
     st.markdown(f"**Tú:** {pregunta}")
     st.markdown(f"**Bot:** {respuesta}")
+
+metricas.observar('streamlit_modo', time.perf_counter() - inicio_modo, modo=modo)
+panel_admin()
@@ -0,0 +1,82 @@
+"""
+Compara la búsqueda aproximada de nombres con el índice de trigramas
+(chatbot.difuso) contra el camino anterior con difflib.
+
+Uso (desde ChatBot-SiamControl/):
+    python benchmarks/bench_difuso.py --filas 50000 --consultas 200
+"""
+import argparse
+import difflib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.difuso import IndiceDifuso  # noqa: E402
+from chatbot.texto import normalizar_texto  # noqa: E402
+from sinteticos import APELLIDOS, NOMBRES, con_error  # noqa: E402
+
+
+def generar_nombres(filas, rnd):
+    return [f'{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}, {rnd.choice(NOMBRES)} {rnd.choice(NOMBRES)}'
+            for _ in range(filas)]
+
+
+def camino_difflib(nombres, consulta):
+    # Réplica del flujo anterior de responder(): normaliza todos los nombres
+    # en cada pregunta, difflib sobre la lista completa y búsqueda lineal.
+    normalizados = [normalizar_texto(n) for n in nombres]
+    sugeridos = difflib.get_close_matches(consulta, normalizados, n=1, cutoff=0.7)
+    if sugeridos:
+        return nombres[normalizados.index(sugeridos[0])]
+    relacionados = [n for n, n_norm in zip(nombres, normalizados) if consulta in n_norm]
+    return relacionados[0] if relacionados else None
+
+
+def camino_indice(indice, consulta):
+    sugeridos = indice.sugerir(consulta, n=1, minimo=0.7)
+    if sugeridos:
+        return sugeridos[0]['nombre']
+    relacionados = indice.contienen(consulta)
+    return relacionados[0] if relacionados else None
+
+
+def medir(funcion, consultas):
+    inicio = time.perf_counter()
+    resultados = [funcion(c) for c in consultas]
+    return (time.perf_counter() - inicio) / len(consultas), resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=50000)
+    parser.add_argument('--consultas', type=int, default=200)
+    parser.add_argument('--consultas-difflib', type=int, default=5,
+                        help='consultas para difflib (es lento; se promedia sobre menos)')
+    parser.add_argument('--semilla', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.semilla)
+    nombres = generar_nombres(args.filas, rnd)
+    consultas = [con_error(normalizar_texto(rnd.choice(nombres)), rnd) for _ in range(args.consultas)]
+
+    inicio = time.perf_counter()
+    indice = IndiceDifuso(nombres, [normalizar_texto(n) for n in nombres])
+    construccion = time.perf_counter() - inicio
+
+    t_indice, r_indice = medir(lambda c: camino_indice(indice, c), consultas)
+    muestra = consultas[:args.consultas_difflib]
+    t_difflib, r_difflib = medir(lambda c: camino_difflib(nombres, c), muestra)
+    coinciden = sum(a == b for a, b in zip(r_indice, r_difflib))
+
+    print(f'filas: {args.filas}  nombres distintos: {len(indice.normalizados)}')
+    print(f'construcción del índice: {construccion * 1000:.1f} ms (una vez por carga)')
+    print(f'índice de trigramas: {t_indice * 1000:.2f} ms/consulta ({len(consultas)} consultas)')
+    print(f'difflib:             {t_difflib * 1000:.2f} ms/consulta ({len(muestra)} consultas)')
+    print(f'aceleración: {t_difflib / t_indice:.0f}x  misma sugerencia: {coinciden}/{len(muestra)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Mide tiempo y memoria (pico de tracemalloc) de exportar contratos:
+`DataFrame.to_excel` de pandas (camino anterior) frente a la exportación
+por bloques de chatbot.exportar (openpyxl en modo solo escritura y CSV).
+
+Uso (desde ChatBot-SiamControl/):
+    python benchmarks/bench_exportar.py --filas 100000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.exportar import generar_csv, generar_xlsx  # noqa: E402
+from sinteticos import generar_contratos  # noqa: E402
+
+
+def _to_excel_pandas(df):
+    salida = io.BytesIO()
+    df.to_excel(salida, index=False, engine='openpyxl')
+    return salida.getvalue()
+
+
+CAMINOS = {
+    'pandas to_excel (anterior)': _to_excel_pandas,
+    'xlsx solo escritura': generar_xlsx,
+    'csv por bloques': generar_csv,
+}
+
+
+def medir(funcion, df):
+    inicio = time.perf_counter()
+    datos = funcion(df)
+    duracion = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcion(df)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracion, pico, len(datos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--sin-pandas', action='store_true', help='omite el camino anterior (lento)')
+    args = parser.parse_args(argv)
+
+    df = generar_contratos(args.filas)
+    print(f'filas: {len(df)}')
+    for nombre, funcion in CAMINOS.items():
+        if args.sin_pandas and funcion is _to_excel_pandas:
+            continue
+        duracion, pico, tam = medir(funcion, df)
+        print(f'{nombre:<28} {duracion:7.2f} s  pico {pico / 2**20:8.1f} MiB  archivo {tam / 2**20:6.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
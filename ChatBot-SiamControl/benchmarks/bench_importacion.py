@@ -0,0 +1,76 @@
+"""
+Mide el tiempo de importación de los módulos del chatbot con
+`python -X importtime` y verifica que no se carguen dependencias pesadas
+que el bot no necesita al arrancar (openpyxl solo para exportar, o
+ChatterBot, SQLAlchemy, etc. si se vuelven a agregar).
+
+Uso (desde ChatBot-SiamControl/):
+    python benchmarks/bench_importacion.py
+    python benchmarks/bench_importacion.py --modulo chatbot.bot --max-ms 800
+
+Retorna código 1 si se importa un módulo prohibido o si se supera --max-ms,
+para poder usarlo como control de regresiones.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS = ['chatbot.almacen', 'chatbot.bot']
+PROHIBIDOS = ['chatterbot', 'sqlalchemy', 'nltk', 'spacy', 'openpyxl']
+
+
+def medir_importacion(modulo, repeticiones=3):
+    """
+    Importa `modulo` en un intérprete nuevo con -X importtime y retorna
+    (total_ms, {modulo_importado: acumulado_ms}) de la corrida más rápida.
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+            cwd=RAIZ, capture_output=True, text=True)
+        if proceso.returncode != 0:
+            raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+        acumulados = {}
+        for linea in proceso.stderr.splitlines():
+            if not linea.startswith('import time:') or '|' not in linea:
+                continue
+            _, acumulado, nombre = linea[len('import time:'):].split('|')
+            if acumulado.strip().isdigit():
+                acumulados[nombre.strip()] = int(acumulado) / 1000
+        total = acumulados.get(modulo, 0.0)
+        if mejor is None or total < mejor[0]:
+            mejor = (total, acumulados)
+    return mejor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modulo', action='append', help='módulo a medir (repetible)')
+    parser.add_argument('--max-ms', type=float, help='falla si algún módulo tarda más que esto')
+    parser.add_argument('--top', type=int, default=8, help='módulos de primer nivel más lentos a mostrar')
+    args = parser.parse_args(argv)
+
+    fallas = []
+    for modulo in args.modulo or MODULOS:
+        total, acumulados = medir_importacion(modulo)
+        print(f'{modulo}: {total:.1f} ms')
+        hijos = sorted(((ms, nombre) for nombre, ms in acumulados.items()
+                        if '.' not in nombre and nombre != modulo), reverse=True)
+        for ms, nombre in hijos[:args.top]:
+            print(f'    {nombre:<30} {ms:8.1f} ms')
+        cargados = sorted({n.split('.')[0] for n in acumulados} & set(PROHIBIDOS))
+        if cargados:
+            fallas.append(f'{modulo} importa dependencias pesadas: {", ".join(cargados)}')
+        if args.max_ms is not None and total > args.max_ms:
+            fallas.append(f'{modulo} tarda {total:.1f} ms (máximo {args.max_ms} ms)')
+    for falla in fallas:
+        print(f'ERROR: {falla}')
+    return 1 if fallas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Compara la clasificación de preguntas del enrutador de intents (claves
+literales y regex por intent, ver chatbot.intents) contra la cadena de
+`re.search` sobre los mismos patrones, y verifica que ambos elijan el mismo
+intent y los mismos slots.
+
+Uso (desde ChatBot-SiamControl/):
+    python benchmarks/bench_intents.py --filas 2000 --preguntas 50
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.bot import enrutador  # noqa: E402
+from chatbot.texto import normalizar_texto  # noqa: E402
+from sinteticos import generar_contratos, generar_preguntas  # noqa: E402
+
+# Preguntas fijas que no calzan con ningún intent, cortas y largas
+SIN_INTENT = [
+    'hola como estas',
+    'quien gano el partido de ayer',
+    'necesito ayuda para configurar la impresora del segundo piso que no imprime desde el lunes '
+    'y ya reinicie la computadora varias veces sin resultado, alguien me puede ayudar por favor',
+]
+
+
+def cadena_re_search(patrones):
+    compilados = [(nombre, re.compile(patron)) for nombre, patron in patrones]
+
+    def clasificar(pregunta):
+        for nombre, regex in compilados:
+            match = regex.search(pregunta)
+            if match is not None:
+                return nombre, {k: v for k, v in match.groupdict().items() if v is not None}
+        return None, {}
+    return clasificar
+
+
+def con_enrutador(pregunta):
+    intent, slots = enrutador.clasificar(pregunta)
+    return (intent.nombre if intent else None), slots
+
+
+def medir(funcion, preguntas, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for pregunta in preguntas:
+            funcion(pregunta)
+    return (time.perf_counter() - inicio) / (repeticiones * len(preguntas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=2000)
+    parser.add_argument('--preguntas', type=int, default=50, help='preguntas por intent')
+    parser.add_argument('--repeticiones', type=int, default=200)
+    parser.add_argument('--semilla', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    df = generar_contratos(args.filas, args.semilla)
+    por_intent = {}
+    for intent, pregunta in generar_preguntas(df, args.preguntas, args.semilla):
+        por_intent.setdefault(intent, []).append(normalizar_texto(pregunta))
+    por_intent['sin intent (fijas)'] = [normalizar_texto(p) for p in SIN_INTENT]
+
+    cadena = cadena_re_search([(i.nombre, i.patron) for i in enrutador.intents])
+    distintas = [p for lista in por_intent.values() for p in lista if cadena(p) != con_enrutador(p)]
+    if distintas:
+        print(f'{len(distintas)} preguntas clasificadas distinto, p. ej.: {distintas[0]!r}')
+        return 1
+
+    print(f"{'intent':<26}{'re.search µs':>14}{'enrutador µs':>14}")
+    for intent, preguntas in por_intent.items():
+        t_cadena = medir(cadena, preguntas, args.repeticiones)
+        t_enrutador = medir(con_enrutador, preguntas, args.repeticiones)
+        print(f'{intent:<26}{t_cadena * 1e6:>14.2f}{t_enrutador * 1e6:>14.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
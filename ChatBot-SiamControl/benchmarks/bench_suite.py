@@ -0,0 +1,285 @@
+"""
+Suite de benchmarks sobre padrones sintéticos (ver sinteticos.py): carga de
+datos (CSV, snapshot, índices, SQLite), `responder` por intent con y sin
+caché, búsqueda aproximada, consulta masiva y exportación. Guarda un JSON
+con los resultados y la versión del código para comparar entre commits.
+
+Uso (desde ChatBot-SiamControl/):
+    python benchmarks/bench_suite.py --filas 10000 100000
+    python benchmarks/bench_suite.py --filas 1000000 --exportar-max 100000 --backends pandas sqlite
+    python benchmarks/bench_suite.py --filas 10000 --comparar benchmarks/resultados/anterior.json
+
+Con --comparar retorna código 1 si algún p50 empeora más que --umbral.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from chatbot import repositorio  # noqa: E402
+from chatbot.almacen import AlmacenContratos  # noqa: E402
+from chatbot.cambios import calcular_cambios  # noqa: E402
+from chatbot.datos import RUTA_CONTRATOS, cargar_datos_contratos  # noqa: E402
+from chatbot.exportar import generar_csv, generar_xlsx  # noqa: E402
+from chatbot.indices import IndiceContratos  # noqa: E402
+from chatbot.texto import normalizar_texto  # noqa: E402
+from sinteticos import APELLIDOS, con_error, generar_contratos, generar_preguntas  # noqa: E402
+
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados')
+
+
+def estadisticas(tiempos):
+    ms = np.sort(np.asarray(tiempos)) * 1000
+    return {
+        'n': len(ms),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'media_ms': float(ms.mean()),
+        'min_ms': float(ms[0]),
+        'max_ms': float(ms[-1]),
+    }
+
+
+def medir(funcion, entradas, max_segundos):
+    """Llama a `funcion` con cada entrada (al menos una) hasta agotar `max_segundos`."""
+    tiempos, limite = [], time.perf_counter() + max_segundos
+    for entrada in entradas:
+        inicio = time.perf_counter()
+        funcion(entrada)
+        fin = time.perf_counter()
+        tiempos.append(fin - inicio)
+        if fin > limite:
+            break
+    return tiempos
+
+
+def bench_carga(ruta, args, resultados):
+    repetir = [None] * args.repeticiones
+    resultados['carga.csv'] = estadisticas(medir(lambda _: cargar_datos_contratos(ruta), repetir, args.max_segundos))
+    df = cargar_datos_contratos(ruta)
+    resultados['carga.indices'] = estadisticas(medir(lambda _: IndiceContratos(df), repetir, args.max_segundos))
+    # Recarga incremental: ~0,1 % de filas modificadas, diff e índices
+    indice, nuevo = IndiceContratos(df), df.copy()
+    cambiadas = np.random.default_rng(args.semilla).choice(len(df), max(1, len(df) // 1000), replace=False)
+    nuevo.iloc[cambiadas, nuevo.columns.get_loc('Act')] = 'Inactivo'
+    nuevo.iloc[cambiadas, nuevo.columns.get_loc('Fch. VENCIMIENTO')] = pd.Timestamp('2025-12-31')
+    resultados['carga.incremental'] = estadisticas(
+        medir(lambda _: indice.actualizar(nuevo, calcular_cambios(df, nuevo)), repetir, args.max_segundos))
+    from chatbot import snapshot
+    if version_pyarrow() is not None:
+        resultados['carga.snapshot_construir'] = estadisticas(
+            medir(lambda _: snapshot.construir_snapshot(ruta), repetir, args.max_segundos))
+        resultados['carga.snapshot_leer'] = estadisticas(
+            medir(lambda _: snapshot.leer_snapshot(snapshot.ruta_snapshot(ruta)), repetir, args.max_segundos))
+    # Camino completo de un proceso nuevo: snapshot (si hay pyarrow) e índices
+    resultados['carga.almacen'] = estadisticas(
+        medir(lambda _: AlmacenContratos(ruta).obtener(), repetir, args.max_segundos))
+    if 'sqlite' in args.backends:
+        resultados['carga.sqlite'] = estadisticas(
+            medir(lambda _: repositorio.sincronizar_sqlite(ruta), repetir, args.max_segundos))
+    return df
+
+
+def bench_responder(df, backend, args, resultados):
+    from chatbot.bot import cache_respuestas, enrutador, responder
+    repositorio.BACKEND = backend
+    repositorio.obtener_repositorio()
+    preguntas = generar_preguntas(df, args.preguntas, args.semilla)
+    por_intent = {}
+    for intent, pregunta in preguntas:
+        por_intent.setdefault(intent, []).append(pregunta)
+
+    tam_cache = cache_respuestas.max_entradas
+    cache_respuestas.configurar(max_entradas=0)
+    try:
+        for intent, lista in por_intent.items():
+            clasificadas = [enrutador.clasificar(normalizar_texto(p))[0] for p in lista]
+            aciertos = sum((i.nombre if i else 'desconocido') == intent for i in clasificadas)
+            resultado = estadisticas(medir(responder, lista, args.max_segundos))
+            resultado['clasificacion_correcta'] = aciertos / len(lista)
+            resultados[f'{backend}.intent.{intent}'] = resultado
+    finally:
+        cache_respuestas.configurar(max_entradas=tam_cache)
+    todas = [p for _, p in preguntas]
+    cache_respuestas.limpiar()
+    for pregunta in todas:
+        responder(pregunta)
+    resultados[f'{backend}.responder_con_cache'] = estadisticas(medir(responder, todas, args.max_segundos))
+
+
+def bench_difuso(df, args, resultados):
+    repo = repositorio.obtener_repositorio('pandas')
+    rnd = random.Random(args.semilla)
+    nombres = df['Apellidos y nombres'].sample(args.preguntas * 5, replace=True, random_state=args.semilla)
+    consultas = [con_error(normalizar_texto(n), rnd) for n in nombres]
+    resultados['difuso.sugerir'] = estadisticas(
+        medir(lambda c: repo.sugerir_nombres(c, n=1, minimo=0.7), consultas, args.max_segundos))
+    fragmentos = [normalizar_texto(rnd.choice(APELLIDOS)) for _ in range(args.preguntas)]
+    resultados['difuso.contienen'] = estadisticas(
+        medir(repo.nombres_que_contienen, fragmentos, args.max_segundos))
+
+
+def bench_lote(df, args, resultados):
+    from chatbot.lote import consulta_masiva
+    repo = repositorio.obtener_repositorio('pandas')
+    muestra = df.sample(min(1000, len(df)), random_state=args.semilla)
+    claves = [*muestra['DNI / C.E.'][::3], *muestra['Apellidos y nombres'][1::3], *muestra['Email'][2::3]]
+    resultados['lote.consulta_masiva_1000'] = estadisticas(
+        medir(lambda _: consulta_masiva(repo, claves), [None] * args.repeticiones, args.max_segundos))
+
+
+def bench_exportar(df, args, resultados):
+    parte = df.iloc[:args.exportar_max]
+    for nombre, generar in (('xlsx', generar_xlsx), ('csv', generar_csv)):
+        tamanios = []
+        resultado = estadisticas(medir(lambda _: tamanios.append(len(generar(parte))), [None], 0))
+        resultado['filas'] = len(parte)
+        resultado['bytes'] = tamanios[0]
+        resultados[f'exportar.{nombre}'] = resultado
+
+
+def correr(filas, args):
+    """Corre la suite sobre un padrón de `filas` contratos en un directorio temporal."""
+    resultados = {}
+    inicio = time.perf_counter()
+    df = generar_contratos(filas, args.semilla)
+    print(f'\n== {filas} filas (padrón generado en {time.perf_counter() - inicio:.1f} s)', flush=True)
+    directorio = tempfile.mkdtemp(prefix='siacon-bench-')
+    anterior = os.getcwd()
+    try:
+        # Las rutas del bot (contratos, snapshot, base SQLite, historial) son
+        # relativas: apuntan al padrón sintético dentro del temporal
+        os.chdir(directorio)
+        os.makedirs(os.path.dirname(RUTA_CONTRATOS))
+        df.to_csv(RUTA_CONTRATOS, index=False, date_format='%Y-%m-%d')
+        etapas = [
+            ('carga', lambda: bench_carga(RUTA_CONTRATOS, args, resultados)),
+            *[(f'responder ({b})', lambda b=b: bench_responder(df, b, args, resultados)) for b in args.backends],
+            ('difuso', lambda: bench_difuso(df, args, resultados)),
+            ('lote', lambda: bench_lote(df, args, resultados)),
+            ('exportar', lambda: bench_exportar(df, args, resultados)),
+        ]
+        for nombre, etapa in etapas:
+            if nombre.split(' ')[0] in args.omitir:
+                continue
+            inicio = time.perf_counter()
+            etapa()
+            print(f'  {nombre}: {time.perf_counter() - inicio:.1f} s', flush=True)
+        from chatbot.historial import obtener_historial
+        obtener_historial().cerrar()
+    finally:
+        os.chdir(anterior)
+        repositorio.BACKEND = args.backend_original
+        shutil.rmtree(directorio, ignore_errors=True)
+    return resultados
+
+
+def _git(*comando):
+    try:
+        return subprocess.run(['git', *comando], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def version_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow.__version__
+
+
+def metadatos(args):
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'cambios_sin_commit': bool(_git('status', '--porcelain', '--', '.')),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': version_pyarrow(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'semilla': args.semilla,
+        'preguntas_por_intent': args.preguntas,
+        'backends': args.backends,
+    }
+
+
+def imprimir(resultados):
+    for filas, benches in resultados.items():
+        print(f'\n{filas} filas')
+        print(f"{'benchmark':<44} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'media ms':>10}")
+        for nombre, r in benches.items():
+            print(f"{nombre:<44} {r['n']:>5} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['media_ms']:>10.3f}")
+
+
+def comparar(actual, anterior, umbral):
+    """Imprime la razón de p50 actual/anterior y retorna los benchmarks que empeoraron."""
+    peores = []
+    print(f"\nComparación con {anterior['meta'].get('commit')} ({anterior['meta'].get('fecha')}):")
+    for filas, benches in actual['resultados'].items():
+        previos = anterior['resultados'].get(filas, {})
+        for nombre, r in benches.items():
+            if nombre not in previos or not previos[nombre]['p50_ms']:
+                continue
+            razon = r['p50_ms'] / previos[nombre]['p50_ms']
+            marca = '  <-- más lento' if razon > 1 + umbral else ''
+            print(f"{filas:>8} {nombre:<44} {previos[nombre]['p50_ms']:>10.3f} -> {r['p50_ms']:>10.3f} ms  x{razon:.2f}{marca}")
+            if marca:
+                peores.append((filas, nombre, razon))
+    return peores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--backends', nargs='+', choices=['pandas', 'sqlite'], default=['pandas'])
+    parser.add_argument('--preguntas', type=int, default=20, help='preguntas por intent')
+    parser.add_argument('--repeticiones', type=int, default=3, help='repeticiones de carga y consulta masiva')
+    parser.add_argument('--max-segundos', type=float, default=10.0, help='tiempo máximo por benchmark')
+    parser.add_argument('--exportar-max', type=int, default=100000, help='filas máximas a exportar')
+    parser.add_argument('--omitir', nargs='*', default=[], choices=['carga', 'responder', 'difuso', 'lote', 'exportar'])
+    parser.add_argument('--semilla', type=int, default=7)
+    parser.add_argument('--salida', help='JSON de resultados (por defecto benchmarks/resultados/<fecha>-<commit>.json)')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior para comparar')
+    parser.add_argument('--umbral', type=float, default=0.15, help='empeoramiento de p50 tolerado al comparar')
+    args = parser.parse_args(argv)
+    args.backend_original = repositorio.BACKEND
+
+    actual = {'meta': metadatos(args), 'resultados': {}}
+    for filas in args.filas:
+        actual['resultados'][str(filas)] = correr(filas, args)
+    imprimir(actual['resultados'])
+
+    salida = args.salida
+    if salida is None:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        salida = os.path.join(DIRECTORIO_RESULTADOS,
+                              f"{time.strftime('%Y%m%d-%H%M%S')}-{actual['meta']['commit'] or 'sin-git'}.json")
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(actual, f, ensure_ascii=False, indent=1)
+    print(f'\nResultados en {salida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anterior = json.load(f)
+        if comparar(actual, anterior, args.umbral):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
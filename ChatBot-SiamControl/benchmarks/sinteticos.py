@@ -0,0 +1,163 @@
+"""
+Datos sintéticos para los benchmarks: padrones de contratos de cualquier
+tamaño (nombres en español con tildes y ñ, DNIs y C.E., régimen, tipo,
+usuarios, celulares, vencimientos y emails) y preguntas para el bot armadas
+a partir de los patrones de los intents de chatbot.bot.
+
+Uso (desde ChatBot-SiamControl/):
+    python benchmarks/sinteticos.py --filas 100000 --salida /tmp/contratos_100k.csv
+    python benchmarks/sinteticos.py --filas 1000 --preguntas 20
+"""
+import argparse
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.datos import MESES, normalizar_contratos  # noqa: E402
+from chatbot.texto import normalizar_texto  # noqa: E402
+
+NOMBRES = ['Juan', 'María', 'José', 'Lucía', 'Sofía', 'Pedro', 'Ana', 'Luis', 'Carmen', 'Jesús',
+           'Andrés', 'Rosa', 'Víctor', 'Elena', 'Raúl', 'Patricia', 'Martín', 'Inés', 'Óscar', 'Nuria',
+           'Carlos', 'Milagros', 'Jorge', 'Verónica', 'Miguel', 'Mónica', 'César', 'Gabriela', 'Julián',
+           'Fátima', 'Rubén', 'Noemí', 'Ángel', 'Beatriz', 'Iván', 'Leticia', 'Hernán', 'Yésica', 'Simón',
+           'Rocío', 'Germán', 'Begoña', 'Tomás', 'Maité', 'Nicolás', 'Zoila', 'Efraín', 'Dolores']
+APELLIDOS = ['Pérez', 'Gómez', 'Ruiz', 'Torres', 'López', 'Fernández', 'Ramírez', 'Sánchez', 'Díaz',
+             'Quispe', 'Mamani', 'Huamán', 'Flores', 'Rojas', 'Chávez', 'Vásquez', 'Castillo', 'Ñique',
+             'Gutiérrez', 'Mendoza', 'Cárdenas', 'Salazar', 'Paredes', 'Zúñiga', 'Espinoza', 'García',
+             'Rodríguez', 'Martínez', 'Hernández', 'González', 'Álvarez', 'Romero', 'Muñoz', 'Jiménez',
+             'Ccori', 'Condori', 'Apaza', 'Ticona', 'Peña', 'Aguirre', 'Benítez', 'Ibáñez', 'Núñez',
+             'Sáenz', 'Valdivia', 'Córdova', 'Palomino', 'Yupanqui', 'Cáceres', 'Villanueva']
+
+# Valores y pesos aproximados de un padrón real
+REGIMENES = {'CAS': 0.50, '728': 0.28, '276': 0.15, '30057': 0.07}
+TIPOS = {'Indeterminado': 0.35, 'Renovable': 0.40, 'Suplente': 0.15, 'Temporal': 0.10}
+ESTADOS = {'Activo': 0.85, 'Inactivo': 0.15}
+
+
+def _elegir(rnd, valores, filas):
+    return rnd.choice(list(valores), filas, p=list(valores.values()))
+
+
+def generar_contratos(filas, semilla=7, hoy='2025-07-01'):
+    """
+    Padrón sintético normalizado con `filas` contratos. Los DNIs son únicos
+    (8 dígitos; ~3 % son C.E. de 9), los usuarios y emails también, y los
+    vencimientos van de un año antes a dos años después de `hoy` (~2 % sin
+    fecha). La misma semilla da el mismo padrón.
+    """
+    rnd = np.random.default_rng(semilla)
+    nombres = np.array(NOMBRES, dtype=object)
+    apellidos = np.array(APELLIDOS, dtype=object)
+    nombre1 = rnd.choice(nombres, filas)
+    nombre2 = np.where(rnd.random(filas) < 0.4, ' ' + rnd.choice(nombres, filas), '')
+    apellido1 = rnd.choice(apellidos, filas)
+    apellido2 = rnd.choice(apellidos, filas)
+    completos = nombre1 + nombre2 + ' ' + apellido1 + ' ' + apellido2
+
+    documentos = rnd.choice(10**8, filas, replace=False)
+    extranjeros = rnd.random(filas) < 0.03
+    dnis = [f'{d:09d}' if e else f'{d:08d}' for d, e in zip(documentos.tolist(), extranjeros.tolist())]
+
+    # Usuario: inicial del nombre y primer apellido sin tildes, numerado si se repite
+    iniciales = {n: normalizar_texto(n[0]) for n in NOMBRES}
+    sin_tildes = {a: normalizar_texto(a).replace(' ', '') for a in APELLIDOS}
+    base = pd.Series([iniciales[n] + sin_tildes[a] for n, a in zip(nombre1, apellido1)])
+    repetidos = base.groupby(base).cumcount()
+    usuarios = (base + np.where(repetidos > 0, repetidos.astype(str), '')).tolist()
+
+    hoy = pd.Timestamp(hoy)
+    vencimientos = pd.Series(hoy - pd.Timedelta(days=365) + pd.to_timedelta(rnd.integers(0, 3 * 365, filas), unit='D'))
+    vencimientos[rnd.random(filas) < 0.02] = pd.NaT
+
+    return normalizar_contratos(pd.DataFrame({
+        'DNI / C.E.': dnis,
+        'Apellidos y nombres': completos,
+        'Régimen Laboral': _elegir(rnd, REGIMENES, filas),
+        'Tipo de Contrato': _elegir(rnd, TIPOS, filas),
+        'Act': _elegir(rnd, ESTADOS, filas),
+        'Usuario': usuarios,
+        'Nº Celular': [f'9{n:08d}' for n in rnd.integers(0, 10**8, filas).tolist()],
+        'Fch. VENCIMIENTO': vencimientos,
+        'Email': [f'{u}@email.com' for u in usuarios],
+    }))
+
+
+def con_error(texto, rnd):
+    """Introduce un error de tipeo (cambio, omisión o inserción de una letra)."""
+    i = rnd.randrange(len(texto))
+    letra = rnd.choice('abcdefghijklmnopqrstuvwxyz')
+    return rnd.choice([texto[:i] + letra + texto[i + 1:], texto[:i] + texto[i + 1:], texto[:i] + letra + texto[i:]])
+
+
+def _pregunta(intent, df, rnd):
+    fila = df.iloc[rnd.randrange(len(df))]
+    nombre = fila['Apellidos y nombres']
+    if intent == 'vencimiento_por_nombre':
+        # Uno de cada cinco con error de tipeo, para pasar por las sugerencias
+        if rnd.random() < 0.2:
+            nombre = con_error(nombre, rnd)
+        return f'¿Cuándo vence el contrato de {nombre}?'
+    if intent == 'proximos_dias':
+        return f'¿Qué contratos vencen en los próximos {rnd.choice([7, 15, 30, 60, 90])} días?'
+    if intent == 'rango_fechas':
+        desde = pd.Timestamp('2025-01-01') + pd.Timedelta(days=rnd.randrange(540))
+        hasta = desde + pd.Timedelta(days=rnd.randrange(1, 31))
+        return f"¿Qué contratos vencen entre {desde:%Y-%m-%d} y {hasta:%Y-%m-%d}?"
+    if intent == 'contratos_por_mes':
+        if rnd.random() < 0.5:
+            return f'¿Qué contratos vencen en {MESES[rnd.randint(1, 12)]}?'
+        return f'¿Qué contratos vencen en {rnd.choice([2024, 2025, 2026])}-{rnd.randint(1, 12):02d}?'
+    if intent == 'correo_bienvenida':
+        return f'¿Se envió el correo de bienvenida a {nombre}?'
+    if intent == 'celular':
+        return f"¿Qué número de celular tiene {fila['DNI / C.E.']}?"
+    if intent == 'email':
+        return f'¿Cuál es el email de {nombre}?'
+    if intent == 'regimen_laboral':
+        return f"¿Qué contratos del régimen laboral {fila['Régimen Laboral']} hay?"
+    if intent == 'tipo_contrato':
+        return f"¿Qué contratos del tipo de contrato {fila['Tipo de Contrato']} hay?"
+    if intent == 'usuario':
+        return f"¿Qué contrato para usuario {fila['Usuario']} existe?"
+    return rnd.choice(['Hola, ¿cómo estás?', '¿Quién ganó el partido?', 'Necesito ayuda con mi laptop'])
+
+
+# Intents de chatbot.bot, en el orden en que se registran, más las preguntas no reconocidas
+INTENTS = ['vencimiento_por_nombre', 'proximos_dias', 'rango_fechas', 'contratos_por_mes', 'correo_bienvenida',
+           'celular', 'email', 'regimen_laboral', 'tipo_contrato', 'usuario', 'desconocido']
+
+
+def generar_preguntas(df, por_intent=20, semilla=7, intents=INTENTS):
+    """Lista de (intent esperado, pregunta), `por_intent` preguntas de cada intent."""
+    rnd = random.Random(semilla)
+    return [(intent, _pregunta(intent, df, rnd)) for intent in intents for _ in range(por_intent)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=10000)
+    parser.add_argument('--semilla', type=int, default=7)
+    parser.add_argument('--salida', help='escribe el padrón en este CSV/XLSX')
+    parser.add_argument('--preguntas', type=int, default=0, help='muestra N preguntas por intent')
+    args = parser.parse_args(argv)
+
+    df = generar_contratos(args.filas, args.semilla)
+    if args.salida:
+        if args.salida.lower().endswith('.xlsx'):
+            df.to_excel(args.salida, index=False)
+        else:
+            df.to_csv(args.salida, index=False, date_format='%Y-%m-%d')
+        print(f'{len(df)} contratos escritos en {args.salida}')
+    else:
+        print(df.head(10).to_string())
+    for intent, pregunta in generar_preguntas(df, args.preguntas, args.semilla):
+        print(f'{intent:<24} {pregunta}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import os
+import threading
+
+from .cambios import calcular_cambios
+from .datos import RUTA_CONTRATOS
+from .indices import obtener_indice, registrar_indice
+from .metricas import metricas
+from .repositorio import RepositorioPandas
+from .snapshot import cargar_contratos
+
+
+class InstantaneaContratos:
+    """
+    Datos de contratos ya normalizados, junto con la versión del archivo del
+    que se cargaron y de sus índices de búsqueda. Se trata como de solo
+    lectura: una recarga crea una instantánea nueva en lugar de modificar la
+    existente. `cambios` son las diferencias con la instantánea anterior
+    cuando la recarga fue incremental (ver `chatbot.cambios`).
+    """
+
+    def __init__(self, df, version, indice=None, cambios=None):
+        self.df = df
+        self.version = version
+        self.cambios = cambios
+        # Los índices se construyen una vez por carga, no por consulta
+        self.indice = obtener_indice(df) if indice is None else registrar_indice(df, indice)
+        self.repositorio = RepositorioPandas(df, version, cambios)
+
+
+class AlmacenContratos:
+    """
+    Almacén compartido por todo el proceso (app y bot) para el archivo de
+    contratos. Lee y normaliza el CSV/XLSX una sola vez y solo vuelve a
+    cargarlo cuando cambia la fecha de modificación o el tamaño del archivo.
+    Si hay pyarrow, la carga pasa por el snapshot columnar (ver
+    `chatbot.snapshot`) en lugar de volver a parsear el texto.
+
+    Al recargar compara la carga nueva con la anterior por 'DNI / C.E.' y,
+    si cambiaron pocas filas, actualiza los índices solo para esas filas en
+    lugar de reconstruirlos. Mientras un hilo recarga, los demás siguen
+    respondiendo con la instantánea anterior; la nueva se publica de una vez
+    cuando está completa.
+    """
+
+    def __init__(self, ruta=RUTA_CONTRATOS):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        # (firma del archivo, instantánea) se reemplaza en bloque para que
+        # los lectores nunca vean una mezcla de ambos
+        self._estado = (None, None)
+
+    def _firma_archivo(self):
+        try:
+            info = os.stat(self.ruta)
+        except FileNotFoundError:
+            return None
+        return (info.st_mtime_ns, info.st_size)
+
+    @staticmethod
+    def _version(firma):
+        if firma is None:
+            return 'vacio'
+        return f'{firma[0]:x}-{firma[1]:x}'
+
+    def obtener(self):
+        """Retorna la instantánea vigente, recargando el archivo si cambió."""
+        firma = self._firma_archivo()
+        firma_actual, instantanea = self._estado
+        if instantanea is not None and firma == firma_actual:
+            return instantanea
+        # Si otro hilo ya está recargando, no se lo espera: se responde con
+        # la instantánea anterior, que sigue siendo consistente
+        if not self._lock.acquire(blocking=instantanea is None):
+            return instantanea
+        try:
+            firma_actual, instantanea = self._estado
+            if instantanea is None or firma != firma_actual:
+                instantanea = self._recargar(firma, instantanea)
+                self._estado = (firma, instantanea)
+            return instantanea
+        finally:
+            self._lock.release()
+
+    def _recargar(self, firma, anterior):
+        with metricas.tramo('carga_datos', etapa='lectura'):
+            df = cargar_contratos(self.ruta)
+        version = self._version(firma)
+        if anterior is not None:
+            with metricas.tramo('carga_datos', etapa='incremental'):
+                cambios = calcular_cambios(anterior.df, df)
+                if cambios is not None:
+                    cambios.version_anterior, cambios.version = anterior.version, version
+                    indice = anterior.indice.actualizar(df, cambios)
+                    metricas.contar('recargas_datos', tipo='incremental')
+                    return InstantaneaContratos(df, version, indice, cambios)
+        with metricas.tramo('carga_datos', etapa='indices'):
+            instantanea = InstantaneaContratos(df, version)
+        metricas.contar('recargas_datos', tipo='completa')
+        return instantanea
+
+    @property
+    def df(self):
+        return self.obtener().df
+
+    @property
+    def version(self):
+        return self.obtener().version
+
+
+_almacenes = {}
+_almacenes_lock = threading.Lock()
+
+
+def obtener_almacen(ruta=RUTA_CONTRATOS):
+    """Retorna el almacén único del proceso para la ruta indicada."""
+    clave = os.path.abspath(ruta)
+    with _almacenes_lock:
+        almacen = _almacenes.get(clave)
+        if almacen is None:
+            almacen = AlmacenContratos(ruta)
+            _almacenes[clave] = almacen
+        return almacen
@@ -1,211 +1,204 @@
-from chatterbot import ChatBot
-from chatterbot.trainers import ListTrainer
-from .datos import cargar_datos_contratos, buscar_vencimiento_por_nombre, listar_contratos_por_mes, estado_correo_bienvenida, buscar_celular, buscar_email
-import re
-import pandas as pd
-import unicodedata
-import difflib
-import csv
-import os
-
-# --- Función utilitaria para normalizar texto ---
-def normalizar_texto(texto):
-    """
-    Normaliza un texto eliminando tildes, convirtiendo a minúsculas y quitando espacios extra.
-    Esto permite comparar cadenas de texto de forma robusta ante errores comunes de usuario.
-    """
-    texto = ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
-    return ' '.join(texto.lower().split())
+from .datos import buscar_vencimiento_por_nombre, listar_contratos_por_mes, estado_correo_bienvenida, buscar_celular, buscar_email, formatear_fecha, contratos_por_rango, contratos_proximos_dias, contratos_por_valor
+from .cache import CacheRespuestas, recolectar_dependencias, registrar_dependencia
+from .historial import RUTA_HISTORIAL, obtener_historial
+from .intents import EnrutadorIntents
+from .metricas import metricas
+from .repositorio import obtener_repositorio
+from .texto import normalizar_texto
 
-def guardar_historial(pregunta, respuesta, archivo='data/historial_chat.csv'):
+def guardar_historial(pregunta, respuesta, archivo=RUTA_HISTORIAL):
     """
     Guarda la pregunta y respuesta en un archivo CSV para trazabilidad.
+    Solo encola la fila: la escritura la hace en lotes el hilo del historial.
     """
-    existe = os.path.exists(archivo)
-    with open(archivo, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if not existe:
-            writer.writerow(['pregunta', 'respuesta'])
-        writer.writerow([pregunta, respuesta])
+    obtener_historial(archivo).registrar(pregunta, respuesta)
 
-# --- Función principal del chatbot ---
-def responder(pregunta):
+def sugerir_nombre(repo, nombre):
     """
-    Procesa la pregunta del usuario y retorna una respuesta según los intents definidos:
-    1. Consulta de vencimiento de contrato por nombre
-    2. Listado de contratos que vencen en un mes
-    3. Estado del correo de bienvenida
-    4. Búsqueda de número de celular por nombre, DNI o Email
-    5. Búsqueda de email por nombre, DNI o Email
-    6. Búsqueda de contratos por régimen laboral
-    7. Búsqueda de contratos por tipo de contrato
-    8. Búsqueda de contratos por usuario
-    Si la pregunta no coincide con ningún intent, responde con un mensaje genérico.
+    Arma la respuesta cuando no hay coincidencia exacta para un nombre:
+    primero la sugerencia más parecida ("¿Quiso decir ...?") y, si no hay,
+    los nombres que contienen el texto buscado.
     """
-    # Cargar los datos desde el CSV
-    df = cargar_datos_contratos()
-    # Convertir la columna de fechas a tipo datetime para evitar errores
-    if not df.empty and 'Fch. VENCIMIENTO' in df.columns:
-        df['Fch. VENCIMIENTO'] = pd.to_datetime(df['Fch. VENCIMIENTO'], errors='coerce').dt.strftime('%Y-%m-%d')
-    # Normalizar la pregunta del usuario
-    pregunta_l = normalizar_texto(pregunta)
-    nombres = df['Apellidos y nombres'].tolist() if not df.empty else []
-    nombres_normalizados = [normalizar_texto(n) for n in nombres]
-
-    # --- Intent 1: Vencimiento por nombre ---
-    match = re.search(r'vence el contrato de ([\w áéíóúüñ]+)', pregunta_l)
-    if match:
-        nombre = match.group(1).strip()
-        df['nombre_normalizado'] = df['Apellidos y nombres'].apply(normalizar_texto)
-        info = buscar_vencimiento_por_nombre(df.assign(**{'Apellidos y nombres': df['nombre_normalizado']}), nombre)
-        if info:
-            fecha = info['fecha_vencimiento']
-            respuesta = f"El contrato de {info['nombre']} vence el {fecha} y está {info['estado']}."
-            guardar_historial(pregunta, respuesta)
-            return respuesta
-        else:
-            sugeridos = difflib.get_close_matches(nombre, nombres_normalizados, n=1, cutoff=0.7)
-            if sugeridos:
-                idx = nombres_normalizados.index(sugeridos[0])
-                sugerido = nombres[idx]
-                respuesta = f"No se encontró información para {nombre}. ¿Quiso decir {sugerido}?"
-            else:
-                relacionados = [n for n, n_norm in zip(nombres, nombres_normalizados) if nombre in n_norm]
-                if relacionados:
-                    respuesta = f"No se encontró información exacta para {nombre}. Coincidencias: {', '.join(relacionados)}"
-                else:
-                    respuesta = f"No se encontró información para {nombre}."
-            guardar_historial(pregunta, respuesta)
-            return respuesta
-
-    # --- Intent 2: Contratos por mes ---
-    match = re.search(r'contratos vencen en ([a-záéíóúüñ]+)', pregunta_l)
-    if match:
-        mes = match.group(1).strip()
-        lista = listar_contratos_por_mes(df, mes)
-        if lista:
-            # Respuesta como tabla Markdown
-            tabla = '| Nombre | Tipo de Contrato | Fecha Vencimiento |\n|---|---|---|\n'
-            for x in lista:
-                fecha = x['Fch. VENCIMIENTO']
-                tabla += f"| {x['Apellidos y nombres']} | {x['Tipo de Contrato']} | {fecha} |\n"
-            respuesta = f"Contratos que vencen en {mes}:\n" + tabla
-            guardar_historial(pregunta, respuesta)
-            return respuesta
-        else:
-            respuesta = f"No hay contratos que venzan en {mes}."
-            guardar_historial(pregunta, respuesta)
-            return respuesta
-
-    # --- Intent 3: Estado correo bienvenida ---
-    match = re.search(r'correo de bienvenida a ([\w áéíóúüñ@.]+)', pregunta_l)
-    if match:
-        nombre = match.group(1).strip()
-        df['nombre_normalizado'] = df['Apellidos y nombres'].apply(normalizar_texto)
-        info = estado_correo_bienvenida(df.assign(**{'Apellidos y nombres': df['nombre_normalizado']}), nombre)
-        if info:
-            if info['correo_bienvenida']:
-                respuesta = f"El correo de bienvenida a {info['nombre']} fue enviado el {info['fecha_envio_correo']}."
-            else:
-                respuesta = f"No se ha enviado el correo de bienvenida a {info['nombre']}."
-        else:
-            sugeridos = difflib.get_close_matches(nombre, nombres_normalizados, n=1, cutoff=0.7)
-            if sugeridos:
-                idx = nombres_normalizados.index(sugeridos[0])
-                sugerido = nombres[idx]
-                respuesta = f"No se encontró información para {nombre}. ¿Quiso decir {sugerido}?"
-            else:
-                relacionados = [n for n, n_norm in zip(nombres, nombres_normalizados) if nombre in n_norm]
-                if relacionados:
-                    respuesta = f"No se encontró información exacta para {nombre}. Coincidencias: {', '.join(relacionados)}"
-                else:
-                    respuesta = f"No se encontró información para {nombre}."
-        guardar_historial(pregunta, respuesta)
-        return respuesta
+    registrar_dependencia('nombres')
+    sugeridos = repo.sugerir_nombres(nombre, n=1, minimo=0.7)
+    if sugeridos:
+        return f"No se encontró información para {nombre}. ¿Quiso decir {sugeridos[0]['nombre']}?"
+    relacionados = repo.nombres_que_contienen(nombre)
+    if relacionados:
+        return f"No se encontró información exacta para {nombre}. Coincidencias: {', '.join(relacionados)}"
+    return f"No se encontró información para {nombre}."
 
-    # --- Intent 4: Buscar número de celular por nombre, DNI o Email ---
-    match = re.search(r'(n(ú|u)mero de celular (de|tiene) ([\w áéíóúüñ@.]+))', pregunta_l)
-    if match:
-        valor = match.group(4).strip()
-        info = buscar_celular(df, valor)
-        if info:
-            respuesta = f"El número de celular de {info['nombre']} es {info['celular']}."
-        else:
-            respuesta = f"No se encontró información para {valor}."
-        guardar_historial(pregunta, respuesta)
-        return respuesta
+@metricas.medir('tabla_markdown')
+def tabla_markdown(filas, columna):
+    """Tabla Markdown Nombre | <columna> | Fecha Vencimiento para una lista de registros."""
+    tabla = f'| Nombre | {columna} | Fecha Vencimiento |\n|---|---|---|\n'
+    for x in filas:
+        tabla += f"| {x['Apellidos y nombres']} | {x[columna]} | {formatear_fecha(x['Fch. VENCIMIENTO'])} |\n"
+    return tabla
 
-    # --- Intent 5: Buscar email por nombre o DNI ---
-    match = re.search(r'email (de|tiene) ([\w áéíóúüñ@.]+)', pregunta_l)
-    if match:
-        valor = match.group(2).strip()
-        # Solo buscar por nombre o DNI (no email)
-        if '@' in valor:
-            respuesta = "Para buscar email, ingresa nombre o DNI, no un correo."
-        else:
-            info = buscar_email(df, valor)
-            if info:
-                respuesta = f"El email de {info['nombre']} es {info['email']}."
-            else:
-                respuesta = f"No se encontró información para {valor}."
-        guardar_historial(pregunta, respuesta)
-        return respuesta
+# --- Intents del chatbot ---
+# Cada intent se registra con su patrón (sobre la pregunta normalizada) y
+# recibe el repositorio de contratos y los slots extraídos. El orden de
+# registro define la prioridad cuando una pregunta calza con varios.
+enrutador = EnrutadorIntents()
 
-    # --- Intent 6: Buscar contratos por régimen laboral (más flexible) ---
-    match = re.search(r'(contratos (son|del|de|por) (r(é|e)gimen laboral|r(é|e)gimen) ([\w]+))', pregunta_l)
-    if match:
-        regimen = match.group(6).strip().lower()
-        resultados = df[df['Régimen Laboral'].str.lower() == regimen]
-        if not resultados.empty:
-            tabla = '| Nombre | Régimen Laboral | Fecha Vencimiento |\n|---|---|---|\n'
-            for _, x in resultados.iterrows():
-                tabla += f"| {x['Apellidos y nombres']} | {x['Régimen Laboral']} | {x['Fch. VENCIMIENTO']} |\n"
-            respuesta = f"Contratos del régimen laboral {regimen}:\n" + tabla
-        else:
-            respuesta = f"No se encontraron contratos para el régimen laboral {regimen}."
-        guardar_historial(pregunta, respuesta)
-        return respuesta
+# --- Intent 1: Vencimiento por nombre ---
+@enrutador.intent('vencimiento_por_nombre', r'vence el contrato de (?P<nombre>[\w áéíóúüñ]+)')
+def _vencimiento_por_nombre(repo, slots):
+    nombre = slots['nombre'].strip()
+    info = buscar_vencimiento_por_nombre(repo, nombre)
+    if info:
+        fecha = info['fecha_vencimiento']
+        return f"El contrato de {info['nombre']} vence el {fecha} y está {info['estado']}."
+    return sugerir_nombre(repo, nombre)
 
-    # --- Intent 7: Buscar contratos por tipo de contrato ---
-    match = re.search(r'contratos (del|de) tipo de contrato ([\w]+)', pregunta_l)
-    if match:
-        tipo = match.group(2).strip().lower()
-        resultados = df[df['Tipo de Contrato'].str.lower() == tipo]
-        if not resultados.empty:
-            tabla = '| Nombre | Tipo de Contrato | Fecha Vencimiento |\n|---|---|---|\n'
-            for _, x in resultados.iterrows():
-                tabla += f"| {x['Apellidos y nombres']} | {x['Tipo de Contrato']} | {x['Fch. VENCIMIENTO']} |\n"
-            respuesta = f"Contratos del tipo de contrato {tipo}:\n" + tabla
-        else:
-            respuesta = f"No se encontraron contratos para el tipo de contrato {tipo}."
-        guardar_historial(pregunta, respuesta)
-        return respuesta
+# --- Intent 2a: Contratos que vencen en los próximos N días ---
+# (antes que el intent 2, que si no tomaría "los" como nombre de mes)
+@enrutador.intent('proximos_dias', r'vencen en (?:los )?(?:proximos|siguientes) (?P<dias>\d+) dias')
+def _proximos_dias(repo, slots):
+    dias = int(slots['dias'])
+    resultados = contratos_proximos_dias(repo, dias)
+    if not resultados.empty:
+        return f"Contratos que vencen en los próximos {dias} días:\n" + tabla_markdown(resultados.to_dict('records'), 'Tipo de Contrato')
+    return f"No hay contratos que venzan en los próximos {dias} días."
 
-    # --- Intent 8: Buscar contratos por usuario ---
-    match = re.search(r'contrato (de|para) usuario ([\w]+)', pregunta_l)
-    if match:
-        usuario = match.group(2).strip().lower()
-        resultados = df[df['Usuario'].str.lower() == usuario]
-        if not resultados.empty:
-            tabla = '| Nombre | Usuario | Fecha Vencimiento |\n|---|---|---|\n'
-            for _, x in resultados.iterrows():
-                tabla += f"| {x['Apellidos y nombres']} | {x['Usuario']} | {x['Fch. VENCIMIENTO']} |\n"
-            respuesta = f"Contratos para el usuario {usuario}:\n" + tabla
-        else:
-            respuesta = f"No se encontraron contratos para el usuario {usuario}."
-        guardar_historial(pregunta, respuesta)
-        return respuesta
+# --- Intent 2b: Contratos que vencen entre dos fechas ---
+@enrutador.intent('rango_fechas', r'vencen entre (?:el )?(?P<desde>\d{4}-\d{2}-\d{2}) y (?:el )?(?P<hasta>\d{4}-\d{2}-\d{2})')
+def _rango_fechas(repo, slots):
+    desde, hasta = slots['desde'], slots['hasta']
+    try:
+        resultados = contratos_por_rango(repo, desde, hasta)
+    except ValueError:
+        return f"No entiendo el rango de fechas {desde} a {hasta}. Usa el formato YYYY-MM-DD."
+    if not resultados.empty:
+        return f"Contratos que vencen entre {desde} y {hasta}:\n" + tabla_markdown(resultados.to_dict('records'), 'Tipo de Contrato')
+    return f"No hay contratos que venzan entre {desde} y {hasta}."
+
+# --- Intent 2: Contratos por mes (nombre del mes o año-mes) ---
+@enrutador.intent('contratos_por_mes', r'contratos vencen en (?P<mes>\d{4}-\d{2}|[a-záéíóúüñ]+)')
+def _contratos_por_mes(repo, slots):
+    mes = slots['mes'].strip()
+    lista = listar_contratos_por_mes(repo, mes)
+    if lista:
+        # Respuesta como tabla Markdown
+        return f"Contratos que vencen en {mes}:\n" + tabla_markdown(lista, 'Tipo de Contrato')
+    return f"No hay contratos que venzan en {mes}."
+
+# --- Intent 3: Estado correo bienvenida ---
+@enrutador.intent('correo_bienvenida', r'correo de bienvenida a (?P<nombre>[\w áéíóúüñ@.]+)')
+def _correo_bienvenida(repo, slots):
+    nombre = slots['nombre'].strip()
+    info = estado_correo_bienvenida(repo, nombre)
+    if not info:
+        return sugerir_nombre(repo, nombre)
+    if info['correo_bienvenida']:
+        return f"El correo de bienvenida a {info['nombre']} fue enviado el {info['fecha_envio_correo']}."
+    return f"No se ha enviado el correo de bienvenida a {info['nombre']}."
+
+# --- Intent 4: Buscar número de celular por nombre, DNI o Email ---
+@enrutador.intent('celular', r'n(?:ú|u)mero de celular (?:de|tiene) (?P<valor>[\w áéíóúüñ@.]+)')
+def _celular(repo, slots):
+    valor = slots['valor'].strip()
+    info = buscar_celular(repo, valor)
+    if info:
+        return f"El número de celular de {info['nombre']} es {info['celular']}."
+    return f"No se encontró información para {valor}."
+
+# --- Intent 5: Buscar email por nombre o DNI ---
+@enrutador.intent('email', r'email (?:de|tiene) (?P<valor>[\w áéíóúüñ@.]+)')
+def _email(repo, slots):
+    valor = slots['valor'].strip()
+    # Solo buscar por nombre o DNI (no email)
+    if '@' in valor:
+        return "Para buscar email, ingresa nombre o DNI, no un correo."
+    info = buscar_email(repo, valor)
+    if info:
+        return f"El email de {info['nombre']} es {info['email']}."
+    return f"No se encontró información para {valor}."
+
+# --- Intent 6: Buscar contratos por régimen laboral (más flexible) ---
+@enrutador.intent('regimen_laboral', r'contratos (?:son|del|de|por) (?:r(?:é|e)gimen laboral|r(?:é|e)gimen) (?P<regimen>[\w]+)')
+def _regimen_laboral(repo, slots):
+    regimen = slots['regimen'].strip().lower()
+    resultados = contratos_por_valor(repo, 'Régimen Laboral', regimen)
+    if not resultados.empty:
+        return f"Contratos del régimen laboral {regimen}:\n" + tabla_markdown(resultados.to_dict('records'), 'Régimen Laboral')
+    return f"No se encontraron contratos para el régimen laboral {regimen}."
+
+# --- Intent 7: Buscar contratos por tipo de contrato ---
+@enrutador.intent('tipo_contrato', r'contratos (?:del|de) tipo de contrato (?P<tipo>[\w]+)')
+def _tipo_contrato(repo, slots):
+    tipo = slots['tipo'].strip().lower()
+    resultados = contratos_por_valor(repo, 'Tipo de Contrato', tipo)
+    if not resultados.empty:
+        return f"Contratos del tipo de contrato {tipo}:\n" + tabla_markdown(resultados.to_dict('records'), 'Tipo de Contrato')
+    return f"No se encontraron contratos para el tipo de contrato {tipo}."
+
+# --- Intent 8: Buscar contratos por usuario ---
+@enrutador.intent('usuario', r'contrato (?:de|para) usuario (?P<usuario>[\w]+)')
+def _usuario(repo, slots):
+    usuario = slots['usuario'].strip().lower()
+    resultados = contratos_por_valor(repo, 'Usuario', usuario)
+    if not resultados.empty:
+        return f"Contratos para el usuario {usuario}:\n" + tabla_markdown(resultados.to_dict('records'), 'Usuario')
+    return f"No se encontraron contratos para el usuario {usuario}."
 
-    # --- Intent por defecto: pregunta no reconocida ---
+# --- Intent por defecto: pregunta no reconocida ---
+@enrutador.por_defecto
+def _no_reconocida(repo, slots):
     ayuda = (
         "Ejemplos de preguntas válidas:\n"
         "- ¿Qué contratos vencen en 2025-07?\n"
+        "- ¿Qué contratos vencen en los próximos 30 días?\n"
+        "- ¿Qué contratos vencen entre 2025-07-01 y 2025-08-15?\n"
         "- ¿Cuál es el email de Juan Pérez?\n"
         "- ¿Qué número de celular tiene 12345678?\n"
         "- ¿Qué contratos son del régimen laboral CAS?\n"
         "- ¿Qué contratos tiene el usuario jperez?\n"
         "Puedes preguntar por vencimientos, emails, celulares, régimen laboral, tipo de contrato o usuario."
     )
-    respuesta = f"Lo siento, no entiendo la pregunta. {ayuda}"
-    guardar_historial(pregunta, respuesta)
-    return respuesta
+    return f"Lo siento, no entiendo la pregunta. {ayuda}"
+
+# Respuestas ya calculadas, por pregunta normalizada y versión de los datos.
+# Los límites se ajustan con cache_respuestas.configurar(...).
+cache_respuestas = CacheRespuestas()
+
+# --- Función principal del chatbot ---
+def responder(pregunta):
+    """
+    Procesa la pregunta del usuario y retorna una respuesta según los intents
+    registrados en `enrutador` (vencimiento por nombre, contratos por mes,
+    próximos N días o rango de fechas, correo de bienvenida, celular, email, régimen laboral, tipo de contrato
+    y usuario). Si la pregunta no coincide con ningún intent, responde con un
+    mensaje genérico. Las estadísticas por intent están en
+    `enrutador.estadisticas()` (respuestas calculadas y aciertos de caché),
+    las de la caché en `cache_respuestas.estadisticas()` y los tiempos y
+    contadores de cada etapa en `chatbot.metricas.metricas`.
+    """
+    with metricas.tramo('responder'):
+        # Repositorio del proceso (en memoria o SQLite, ver chatbot.repositorio)
+        with metricas.tramo('obtener_datos'):
+            repo = obtener_repositorio()
+            version = repo.version
+            # Recarga incremental: se descartan solo las respuestas afectadas
+            cambios = repo.cambios
+            if cambios is not None:
+                cache_respuestas.actualizar_version(cambios.version_anterior, version, cambios)
+        # Normalizar la pregunta del usuario y despachar al intent que corresponda
+        with metricas.tramo('normalizacion'):
+            pregunta_l = normalizar_texto(pregunta)
+        guardada = cache_respuestas.obtener(pregunta_l, version)
+        if guardada is None:
+            with recolectar_dependencias() as dependencias:
+                intent, respuesta = enrutador.atender(pregunta_l, repo)
+            cache_respuestas.guardar(pregunta_l, version, respuesta, dependencias, intent)
+            metricas.contar('respuestas', cache='fallo', intent=intent)
+        else:
+            # Los aciertos también cuentan para el intent que calculó la respuesta
+            respuesta, intent = guardada
+            enrutador.contar_acierto(intent)
+            metricas.contar('respuestas', cache='acierto', intent=intent)
+        # El historial registra todas las preguntas, también las respondidas desde la caché
+        with metricas.tramo('historial'):
+            guardar_historial(pregunta, respuesta)
+        return respuesta
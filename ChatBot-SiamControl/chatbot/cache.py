@@ -0,0 +1,164 @@
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Dependencias de la respuesta que se está calculando (ver recolectar_dependencias)
+_dependencias = contextvars.ContextVar('dependencias', default=None)
+
+
+def registrar_dependencia(*dependencia):
+    """
+    Anota qué datos leyó la respuesta en curso, p. ej. ('clave', dni),
+    ('fechas', inicio, fin), ('mes', 7), ('valor', columna, valor) o
+    ('nombres',). Sin un `recolectar_dependencias` activo no hace nada.
+    """
+    dependencias = _dependencias.get()
+    if dependencias is not None:
+        dependencias.add(dependencia)
+
+
+@contextmanager
+def recolectar_dependencias():
+    """Junta en un set las dependencias registradas dentro del bloque `with`."""
+    dependencias = set()
+    token = _dependencias.set(dependencias)
+    try:
+        yield dependencias
+    finally:
+        _dependencias.reset(token)
+
+
+class CacheRespuestas:
+    """
+    Caché LRU con vencimiento (TTL) para las respuestas del chatbot.
+
+    La clave es la pregunta normalizada junto con la versión de los datos de
+    contratos, así que una recarga del archivo deja de acertar con las
+    respuestas anteriores; además, al ver por primera vez una versión nueva
+    se descartan las entradas de la anterior (una consulta en curso que
+    todavía use la versión vieja no las vuelve a llenar). El tamaño se
+    limita por cantidad de entradas (`max_entradas`) y por caracteres totales
+    de las respuestas guardadas (`max_caracteres`). `ttl=None` desactiva el
+    vencimiento.
+
+    Si la recarga fue incremental, `actualizar_version` conserva las
+    respuestas cuyas dependencias no tocó el cambio (ver
+    `chatbot.cambios.CambiosContratos.afecta`).
+    """
+
+    def __init__(self, max_entradas=1024, max_caracteres=5_000_000, ttl=600):
+        self.max_entradas = max_entradas
+        self.max_caracteres = max_caracteres
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._caracteres = 0
+        self._version = None
+        self._versiones_vistas = set()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expiradas = 0
+        self.desalojadas = 0
+        self.invalidadas = 0
+
+    def configurar(self, max_entradas=None, max_caracteres=None, ttl=None):
+        """Cambia los límites; los valores en None se mantienen."""
+        with self._lock:
+            if max_entradas is not None:
+                self.max_entradas = max_entradas
+            if max_caracteres is not None:
+                self.max_caracteres = max_caracteres
+            if ttl is not None:
+                self.ttl = ttl
+            self._ajustar()
+
+    def obtener(self, pregunta, version):
+        """(respuesta, intent) guardados para la pregunta normalizada, o None."""
+        with self._lock:
+            self._cambiar_version(version)
+            entrada = self._entradas.get(pregunta) if version == self._version else None
+            if entrada is None:
+                self.fallos += 1
+                return None
+            respuesta, vence, _, intent = entrada
+            if vence is not None and vence < time.monotonic():
+                self._quitar(pregunta)
+                self.expiradas += 1
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(pregunta)
+            self.aciertos += 1
+            return respuesta, intent
+
+    def guardar(self, pregunta, version, respuesta, dependencias=None, intent=None):
+        """
+        Guarda la respuesta. `dependencias` son las que anotó al calcularse
+        (ver `recolectar_dependencias`); None la invalida con cualquier cambio.
+        `intent` es el nombre del intent que la calculó, para contar los
+        aciertos por intent.
+        """
+        with self._lock:
+            if version != self._version or len(respuesta) > self.max_caracteres:
+                return
+            if pregunta in self._entradas:
+                self._quitar(pregunta)
+            vence = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._entradas[pregunta] = (respuesta, vence, dependencias, intent)
+            self._caracteres += len(respuesta)
+            self._ajustar()
+
+    def actualizar_version(self, anterior, nueva, cambios):
+        """
+        Pasa de la versión `anterior` a `nueva` descartando solo las entradas
+        afectadas por `cambios`. Si la caché no está en `anterior` (o ya vio
+        `nueva`), no hace nada y rige el descarte completo de `obtener`.
+        """
+        with self._lock:
+            if self._version != anterior or nueva in self._versiones_vistas:
+                return
+            for pregunta, (_, _, dependencias, _) in list(self._entradas.items()):
+                if dependencias is None or cambios.afecta(dependencias):
+                    self._quitar(pregunta)
+                    self.invalidadas += 1
+            self._versiones_vistas.add(nueva)
+            self._version = nueva
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._caracteres = 0
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'caracteres': self._caracteres,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'expiradas': self.expiradas,
+                'desalojadas': self.desalojadas,
+                'invalidadas': self.invalidadas,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+                'version': self._version,
+            }
+
+    def _cambiar_version(self, version):
+        if version not in self._versiones_vistas:
+            self._versiones_vistas.add(version)
+            self._entradas.clear()
+            self._caracteres = 0
+            self._version = version
+
+    def _quitar(self, pregunta):
+        respuesta = self._entradas.pop(pregunta)[0]
+        self._caracteres -= len(respuesta)
+
+    def _ajustar(self):
+        while self._entradas and (len(self._entradas) > self.max_entradas
+                                  or self._caracteres > self.max_caracteres):
+            pregunta, (respuesta, *_) = self._entradas.popitem(last=False)
+            self._caracteres -= len(respuesta)
+            self.desalojadas += 1
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from .datos import COLUMNAS_CATEGORICAS, COLUMNAS_CONTRATOS
+from .texto import normalizar_texto
+
+COLUMNA_CLAVE = 'DNI / C.E.'
+
+# Por encima de esta fracción de filas cambiadas conviene reconstruir todo
+MAX_FRACCION_CAMBIOS = 0.2
+
+
+class CambiosContratos:
+    """
+    Diferencias entre dos cargas del archivo de contratos, por 'DNI / C.E.'.
+
+    Las posiciones se refieren al DataFrame anterior (`bajas`, `quitadas`) o
+    al nuevo (`altas`, `agregadas`); una fila modificada cuenta como quitada
+    en el anterior y agregada en el nuevo. `mapa[pos_anterior]` es la
+    posición en el nuevo DataFrame de las filas que siguen iguales, o -1.
+    También resume qué tocó el cambio (claves de búsqueda, fechas, valores de
+    las columnas de filtro) para invalidar solo las respuestas afectadas.
+    """
+
+    def __init__(self, viejo, nuevo, altas, bajas, modificadas_viejo, modificadas_nuevo, mapa,
+                 version_anterior=None, version=None):
+        self.altas = altas
+        self.bajas = bajas
+        self.modificadas = len(modificadas_nuevo)
+        self.quitadas = np.union1d(bajas, modificadas_viejo)
+        self.agregadas = np.union1d(altas, modificadas_nuevo)
+        self.mapa = mapa
+        self.mapa[self.quitadas] = -1
+        # Sin altas ni bajas las filas conservan su posición
+        self.misma_posicion = not len(altas) and not len(bajas)
+        self.version_anterior = version_anterior
+        self.version = version
+
+        tocadas = pd.concat([viejo.iloc[self.quitadas], nuevo.iloc[self.agregadas]], ignore_index=True)
+        self.claves = set()
+        for nombre, dni, email in zip(tocadas['Apellidos y nombres'], tocadas['DNI / C.E.'], tocadas['Email']):
+            self.claves.update((normalizar_texto(str(nombre)), str(dni).strip().lower(), str(email).strip().lower()))
+        self.claves.discard('')
+        fechas = tocadas['Fch. VENCIMIENTO'].dropna()
+        self.fechas = np.sort(fechas.to_numpy(dtype='datetime64[ns]'))
+        self.meses = set(fechas.dt.month)
+        self.valores = {col: {str(v).lower() for v in tocadas[col]} for col in COLUMNAS_CATEGORICAS}
+        nombres_viejos = viejo['Apellidos y nombres'].iloc[modificadas_viejo].to_numpy()
+        nombres_nuevos = nuevo['Apellidos y nombres'].iloc[modificadas_nuevo].to_numpy()
+        self.nombres_cambiaron = bool(len(altas) or len(bajas) or (nombres_viejos != nombres_nuevos).any())
+
+    def __len__(self):
+        return len(self.altas) + len(self.bajas) + self.modificadas
+
+    def __repr__(self):
+        return (f'CambiosContratos(altas={len(self.altas)}, bajas={len(self.bajas)}, '
+                f'modificadas={self.modificadas})')
+
+    def afecta(self, dependencias):
+        """
+        True si el cambio toca alguna de las dependencias que anotó una
+        respuesta (ver `chatbot.cache.registrar_dependencia`).
+        """
+        for dependencia in dependencias:
+            tipo = dependencia[0]
+            if tipo == 'clave':
+                if dependencia[1] in self.claves or normalizar_texto(dependencia[1]) in self.claves:
+                    return True
+            elif tipo == 'nombres':
+                if self.nombres_cambiaron:
+                    return True
+            elif tipo == 'fechas':
+                # Intervalo [inicio, fin); None es abierto
+                _, inicio, fin = dependencia
+                i = 0 if inicio is None else np.searchsorted(self.fechas, np.datetime64(inicio, 'ns'))
+                j = len(self.fechas) if fin is None else np.searchsorted(self.fechas, np.datetime64(fin, 'ns'))
+                if j > i:
+                    return True
+            elif tipo == 'mes':
+                if dependencia[1] in self.meses:
+                    return True
+            elif tipo == 'valor':
+                _, columna, valor = dependencia
+                if valor in self.valores.get(columna, ()):
+                    return True
+            else:
+                return True
+        return False
+
+
+def _distintas(a, b):
+    """Filas (alineadas) de `a` y `b` que difieren en alguna columna."""
+    distintas = np.zeros(len(a), dtype=bool)
+    for col in COLUMNAS_CONTRATOS:
+        if col == 'Fch. VENCIMIENTO':
+            x = a[col].to_numpy(dtype='datetime64[ns]')
+            y = b[col].to_numpy(dtype='datetime64[ns]')
+            distintas |= (x != y) & ~(np.isnat(x) & np.isnat(y))
+        else:
+            distintas |= a[col].astype(object).to_numpy() != b[col].astype(object).to_numpy()
+    return distintas
+
+
+def calcular_cambios(viejo, nuevo, max_fraccion=MAX_FRACCION_CAMBIOS):
+    """
+    Compara dos DataFrames de contratos por 'DNI / C.E.' y retorna los
+    `CambiosContratos`, o None si no se pueden aplicar de forma incremental:
+    DNIs vacíos o repetidos, filas que cambiaron de orden, o más de
+    `max_fraccion` de filas cambiadas. En ese caso se recarga todo.
+    """
+    dni_viejo, dni_nuevo = viejo[COLUMNA_CLAVE], nuevo[COLUMNA_CLAVE]
+    if (dni_viejo == '').any() or (dni_nuevo == '').any() or not dni_viejo.is_unique or not dni_nuevo.is_unique:
+        return None
+    anterior = pd.Index(dni_viejo).get_indexer(dni_nuevo)
+    comunes_nuevo = np.flatnonzero(anterior >= 0)
+    comunes_viejo = anterior[comunes_nuevo]
+    if len(comunes_viejo) > 1 and not (np.diff(comunes_viejo) > 0).all():
+        return None
+    altas = np.flatnonzero(anterior < 0)
+    mapa = np.full(len(viejo), -1, dtype=np.int64)
+    mapa[comunes_viejo] = comunes_nuevo
+    bajas = np.flatnonzero(mapa < 0)
+    distintas = _distintas(viejo.iloc[comunes_viejo], nuevo.iloc[comunes_nuevo])
+    total = len(altas) + len(bajas) + int(distintas.sum())
+    if total > max_fraccion * max(len(nuevo), 1):
+        return None
+    return CambiosContratos(viejo, nuevo, altas, bajas, comunes_viejo[distintas], comunes_nuevo[distintas], mapa)
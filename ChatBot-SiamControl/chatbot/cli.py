@@ -0,0 +1,114 @@
+"""
+Comandos de mantenimiento del chatbot de contratos.
+
+Uso (desde ChatBot-SiamControl/):
+    python -m chatbot.cli snapshot [--ruta data/contratos.xlsx] [--forzar]
+    python -m chatbot.cli sqlite [--ruta data/contratos.csv] [--db data/contratos.db]
+    python -m chatbot.cli lote dnis.txt resultado.xlsx [--columna DNI] [--backend sqlite]
+    python -m chatbot.cli servicio [--puerto 8765 | --socket /tmp/siacon.sock] [--workers 4]
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+
+from .datos import RUTA_CONTRATOS
+from .repositorio import RUTA_SQLITE
+
+
+def _cmd_snapshot(args):
+    from .snapshot import construir_snapshot, ruta_snapshot, snapshot_vigente
+    if not args.forzar and snapshot_vigente(args.ruta):
+        print(f'El snapshot {ruta_snapshot(args.ruta)} ya está al día.')
+        return 0
+    inicio = time.perf_counter()
+    ruta = construir_snapshot(args.ruta)
+    print(f'Snapshot {ruta} construido en {time.perf_counter() - inicio:.2f} s.')
+    return 0
+
+
+def _cmd_sqlite(args):
+    from .repositorio import sincronizar_sqlite
+    inicio = time.perf_counter()
+    filas = sincronizar_sqlite(args.ruta, args.db)
+    print(f'{filas} contratos importados a {args.db} en {time.perf_counter() - inicio:.2f} s.')
+    return 0
+
+
+def _cmd_lote(args):
+    from .lote import exportar_lote, resumen_texto
+    from .repositorio import obtener_repositorio
+    inicio = time.perf_counter()
+    repo = obtener_repositorio(args.backend, args.ruta)
+    resumen = exportar_lote(repo, args.entrada, args.salida, columna=args.columna, sugerencias=args.sugerencias)
+    print(resumen_texto(resumen))
+    print(f'Resultado escrito en {args.salida} en {time.perf_counter() - inicio:.2f} s.')
+    return 0
+
+
+def _cmd_servicio(args):
+    from .servicio import ServicioContratos
+    inicio = time.perf_counter()
+    servicio = ServicioContratos(args.workers, args.backend, args.tiempo_maximo).iniciar()
+    try:
+        servidor = servicio.crear_servidor(args.puerto, args.host, args.socket)
+    except BaseException:
+        servicio.cerrar()
+        raise
+    direccion = f'unix://{args.socket}' if args.socket else f'http://{args.host}:{servidor.server_address[1]}'
+    print(f'Servicio de contratos en {direccion} con {servicio.workers} workers '
+          f'({servicio.backend}), listo en {time.perf_counter() - inicio:.2f} s.', flush=True)
+    # SIGTERM (systemd, docker stop) cierra igual que Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servicio.cerrar()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m chatbot.cli', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    snapshot = comandos.add_parser('snapshot', help='pre-construye el snapshot columnar de contratos')
+    snapshot.add_argument('--ruta', default=RUTA_CONTRATOS, help='CSV/XLSX de origen (por defecto %(default)s)')
+    snapshot.add_argument('--forzar', action='store_true', help='reconstruye aunque esté al día')
+    snapshot.set_defaults(func=_cmd_snapshot)
+
+    sqlite = comandos.add_parser('sqlite', help='importa/sincroniza los contratos a la base SQLite')
+    sqlite.add_argument('--ruta', default=RUTA_CONTRATOS, help='CSV/XLSX de origen (por defecto %(default)s)')
+    sqlite.add_argument('--db', default=RUTA_SQLITE, help='base SQLite de destino (por defecto %(default)s)')
+    sqlite.set_defaults(func=_cmd_sqlite)
+
+    lote = comandos.add_parser('lote', help='consulta celular, email y vencimiento de muchas personas a la vez')
+    lote.add_argument('entrada', help='archivo .txt (una clave por línea), .csv o .xlsx con nombres, DNIs o emails')
+    lote.add_argument('salida', help='archivo de resultado .xlsx o .csv')
+    lote.add_argument('--columna', help='columna de la entrada .csv/.xlsx con las claves (por defecto la primera)')
+    lote.add_argument('--sugerencias', type=int, default=3, help='nombres sugeridos por clave sin coincidencia (0 para no sugerir)')
+    lote.add_argument('--backend', choices=['pandas', 'sqlite'], help='origen de los datos (por defecto SIACON_BACKEND)')
+    lote.add_argument('--ruta', default=RUTA_CONTRATOS, help='CSV/XLSX de contratos (por defecto %(default)s)')
+    lote.set_defaults(func=_cmd_lote)
+
+    servicio = comandos.add_parser('servicio', help='atiende el chat y las consultas por HTTP local con un pool de procesos')
+    servicio.add_argument('--host', default='127.0.0.1', help='por defecto %(default)s')
+    servicio.add_argument('--puerto', type=int, default=int(os.environ.get('SIACON_SERVICIO_PUERTO', 8765)),
+                          help='puerto TCP (por defecto %(default)s; 0 elige uno libre)')
+    servicio.add_argument('--socket', help='atiende en este socket UNIX en lugar de TCP')
+    servicio.add_argument('--workers', type=int, default=int(os.environ.get('SIACON_SERVICIO_WORKERS', 0)) or None,
+                          help='procesos del pool (por defecto uno por núcleo)')
+    servicio.add_argument('--backend', choices=['pandas', 'sqlite'], help='origen de los datos (por defecto SIACON_BACKEND)')
+    servicio.add_argument('--tiempo-maximo', type=float, default=60, help='segundos por consulta antes de responder 504')
+    servicio.set_defaults(func=_cmd_servicio)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
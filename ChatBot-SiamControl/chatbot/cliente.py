@@ -0,0 +1,153 @@
+"""
+Cliente del servicio de contratos (ver `chatbot.servicio`). Implementa la
+misma interfaz que los repositorios de `chatbot.repositorio`, así que las
+funciones de `chatbot.datos` y las vistas de la app lo usan sin cambios, más
+`responder` para el chat. Reutiliza las conexiones HTTP entre consultas.
+"""
+import http.client
+import json
+import os
+import queue
+import socket
+import threading
+from urllib.parse import urlsplit
+
+from .repositorio import RepositorioContratos
+from .servicio import codificar, decodificar
+
+# Dirección del servicio, p. ej. http://127.0.0.1:8765 o unix:///tmp/siacon.sock;
+# vacía si la app consulta los datos en su propio proceso
+URL_SERVICIO = os.environ.get('SIACON_SERVICIO', '')
+
+
+class _ConexionUnix(http.client.HTTPConnection):
+    def __init__(self, ruta, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.ruta = ruta
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.ruta)
+
+
+class ClienteContratos(RepositorioContratos):
+    """
+    Repositorio remoto sobre el servicio de contratos. Mantiene un pool de
+    hasta `max_conexiones` conexiones abiertas (keep-alive), compartido por
+    los hilos del proceso. Los errores del servicio se levantan como
+    ValueError (operación desconocida o argumentos inválidos) o
+    RuntimeError (error al ejecutarla en el servicio).
+    """
+
+    def __init__(self, url=URL_SERVICIO, timeout=60, max_conexiones=8):
+        partes = urlsplit(url)
+        if partes.scheme == 'unix':
+            self._abrir = lambda: _ConexionUnix(partes.path, timeout)
+        elif partes.scheme == 'http':
+            self._abrir = lambda: http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=timeout)
+        else:
+            raise ValueError(f'Dirección de servicio no soportada: {url!r} (use http://host:puerto o unix:///ruta)')
+        self.url = url
+        self._pool = queue.LifoQueue(maxsize=max_conexiones)
+
+    def _pedir(self, conexion, operacion, cuerpo):
+        conexion.request('POST', f'/api/{operacion}', cuerpo, {'Content-Type': 'application/json'})
+        respuesta = conexion.getresponse()
+        return respuesta, respuesta.read()
+
+    def llamar(self, operacion, *args, **kwargs):
+        """Corre una operación del servicio (ver `chatbot.servicio.OPERACIONES`) y retorna su resultado."""
+        cuerpo = json.dumps({'args': args, 'kwargs': kwargs}, default=codificar, ensure_ascii=False).encode('utf-8')
+        try:
+            conexion = self._pool.get_nowait()
+        except queue.Empty:
+            conexion = None
+        try:
+            if conexion is not None:
+                try:
+                    respuesta, datos = self._pedir(conexion, operacion, cuerpo)
+                except (http.client.RemoteDisconnected, ConnectionError):
+                    # El servicio cerró la conexión ociosa: se reintenta con una nueva
+                    conexion.close()
+                    conexion = None
+            if conexion is None:
+                conexion = self._abrir()
+                respuesta, datos = self._pedir(conexion, operacion, cuerpo)
+        except BaseException:
+            if conexion is not None:
+                conexion.close()
+            raise
+        if respuesta.will_close:
+            conexion.close()
+        else:
+            try:
+                self._pool.put_nowait(conexion)
+            except queue.Full:
+                conexion.close()
+        contenido = json.loads(datos, object_hook=decodificar)
+        if respuesta.status == 200:
+            return contenido['resultado']
+        error = contenido.get('error', respuesta.reason)
+        if respuesta.status in (400, 404):
+            raise ValueError(error)
+        raise RuntimeError(f'Servicio de contratos ({respuesta.status}): {error}')
+
+    def cerrar(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def responder(self, pregunta):
+        """`chatbot.bot.responder` en el servicio."""
+        return self.llamar('responder', pregunta)
+
+    @property
+    def version(self):
+        return self.llamar('version')
+
+    def buscar_fila(self, valor):
+        return self.llamar('buscar_fila', valor)
+
+    def sugerir_nombres(self, nombre, n=1, minimo=0.7):
+        return self.llamar('sugerir_nombres', nombre, n=n, minimo=minimo)
+
+    def nombres_que_contienen(self, fragmento):
+        return self.llamar('nombres_que_contienen', fragmento)
+
+    def resolver(self, claves):
+        return self.llamar('resolver', list(claves))
+
+    def por_rango(self, desde=None, hasta=None):
+        return self.llamar('por_rango', desde, hasta)
+
+    def por_mes(self, mes):
+        return self.llamar('por_mes', mes)
+
+    def filtrar_igual(self, columna, valor):
+        return self.llamar('filtrar_igual', columna, valor)
+
+    def valores_distintos(self, columna):
+        return self.llamar('valores_distintos', columna)
+
+    def consultar(self, filtros=None, desde=None, hasta=None, orden=None, descendente=False, pagina=1, tam_pagina=50):
+        return self.llamar('consultar', filtros, desde, hasta, orden, descendente, pagina, tam_pagina)
+
+    def resultado(self, filtros=None, desde=None, hasta=None, orden=None, descendente=False):
+        return self.llamar('resultado', filtros, desde, hasta, orden, descendente)
+
+
+_clientes = {}
+_clientes_lock = threading.Lock()
+
+
+def obtener_cliente(url=None):
+    """Cliente compartido por el proceso para `url` (por defecto SIACON_SERVICIO)."""
+    url = url or URL_SERVICIO
+    with _clientes_lock:
+        cliente = _clientes.get(url)
+        if cliente is None:
+            cliente = _clientes[url] = ClienteContratos(url)
+        return cliente
@@ -0,0 +1,99 @@
+import threading
+
+import numpy as np
+
+from .indices import obtener_indice
+
+# Columnas que se pueden usar como filtro por igualdad
+COLUMNAS_FILTRO = ['Régimen Laboral', 'Tipo de Contrato', 'Usuario', 'Act']
+
+# Consultas ordenadas que se guardan por carga de datos
+MAX_CONSULTAS_GUARDADAS = 64
+
+_lock = threading.Lock()
+
+
+def valores_distintos(df, columna):
+    """Valores distintos (no vacíos) de una columna, calculados una vez por carga."""
+    return [v for v in obtener_indice(df).por_valor(columna) if v != '']
+
+
+def _como_tupla(valor):
+    if valor is None:
+        return ()
+    if isinstance(valor, (list, tuple, set)):
+        return tuple(sorted(valor))
+    return (valor,)
+
+
+def filtrar(df, filtros=None, desde=None, hasta=None, orden=None, descendente=False):
+    """
+    Posiciones de las filas que cumplen todos los filtros, ya ordenadas.
+
+    `filtros` es un dict columna -> valor o lista de valores (se combinan con
+    Y entre columnas y O dentro de una columna); `desde`/`hasta` limitan la
+    fecha de vencimiento (ambos incluidos). Usa los índices por valor y por
+    fecha, y guarda el resultado ordenado para que pasar de página no vuelva
+    a filtrar ni ordenar.
+    """
+    indice = obtener_indice(df)
+    filtros = {col: _como_tupla(v) for col, v in (filtros or {}).items() if _como_tupla(v)}
+    clave = (tuple(sorted(filtros.items())), str(desde), str(hasta), orden, descendente)
+    with _lock:
+        posiciones = indice.consultas.get(clave)
+        if posiciones is not None:
+            indice.consultas.move_to_end(clave)
+            return posiciones
+
+    conjuntos = []
+    for columna, valores in filtros.items():
+        if columna not in COLUMNAS_FILTRO:
+            raise ValueError(f'No se puede filtrar por la columna {columna!r}')
+        grupos = indice.por_valor(columna)
+        partes = [grupos[v] for v in valores if v in grupos]
+        conjuntos.append(np.unique(np.concatenate(partes)) if partes else np.array([], dtype=np.intp))
+    if desde is not None or hasta is not None:
+        conjuntos.append(np.sort(indice.fechas.rango(desde, hasta)))
+    if conjuntos:
+        conjuntos.sort(key=len)
+        posiciones = conjuntos[0]
+        for otro in conjuntos[1:]:
+            posiciones = np.intersect1d(posiciones, otro, assume_unique=True)
+    else:
+        posiciones = np.arange(len(df))
+
+    if orden is not None:
+        valores = df[orden].iloc[posiciones].reset_index(drop=True)
+        orden_pos = valores.sort_values(ascending=not descendente, kind='stable', na_position='last').index.to_numpy()
+        posiciones = posiciones[orden_pos]
+
+    with _lock:
+        indice.consultas[clave] = posiciones
+        while len(indice.consultas) > MAX_CONSULTAS_GUARDADAS:
+            indice.consultas.popitem(last=False)
+    return posiciones
+
+
+def consultar(df, filtros=None, desde=None, hasta=None, orden=None, descendente=False, pagina=1, tam_pagina=50):
+    """
+    Retorna solo la página pedida de la consulta, junto con los totales:
+    {'filas': DataFrame de la página, 'total', 'pagina', 'paginas',
+    'desde_fila', 'hasta_fila', 'posiciones'}. La página se ajusta al rango
+    válido; 'posiciones' permite armar el resultado completo (p. ej. para
+    exportarlo) solo cuando se necesite.
+    """
+    posiciones = filtrar(df, filtros, desde, hasta, orden, descendente)
+    total = len(posiciones)
+    paginas = max(1, -(-total // tam_pagina))
+    pagina = min(max(1, int(pagina)), paginas)
+    inicio = (pagina - 1) * tam_pagina
+    visibles = posiciones[inicio:inicio + tam_pagina]
+    return {
+        'filas': df.iloc[visibles],
+        'total': total,
+        'pagina': pagina,
+        'paginas': paginas,
+        'desde_fila': inicio + 1 if total else 0,
+        'hasta_fila': inicio + len(visibles),
+        'posiciones': posiciones,
+    }
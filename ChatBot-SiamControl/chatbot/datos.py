@@ -1,83 +1,214 @@
 import pandas as pd
 import os
+import re
 
-# Cargar datos desde CSV (ejemplo)
-def cargar_datos_contratos(ruta_csv='data/contratos.csv'):
+from .cache import registrar_dependencia
+from .metricas import metricas
+
+RUTA_CONTRATOS = os.path.join('data', 'contratos.csv')
+
+# Columnas con las que trabajan el bot y la app
+COLUMNAS_CONTRATOS = [
+    'DNI / C.E.', 'Apellidos y nombres', 'Régimen Laboral', 'Tipo de Contrato',
+    'Act', 'Usuario', 'Nº Celular', 'Fch. VENCIMIENTO', 'Email']
+
+# Nombres alternativos que aparecen en los archivos de RRHH
+RENOMBRAR_COLUMNAS = {
+    'Fch. Vto.': 'Fch. VENCIMIENTO',
+}
+
+# Columnas que se leen como texto para no perder ceros a la izquierda
+COLUMNAS_TEXTO = {'DNI / C.E.': str, 'Nº Celular': str}
+
+# Columnas con pocos valores distintos, guardadas como categorías
+COLUMNAS_CATEGORICAS = ['Régimen Laboral', 'Tipo de Contrato', 'Act', 'Usuario']
+
+
+def normalizar_contratos(df):
+    """
+    Deja el DataFrame de contratos listo para consultar: renombra columnas,
+    conserva solo las requeridas, tipa DNI y celular como texto, guarda como
+    categorías las columnas de pocos valores y convierte 'Fch. VENCIMIENTO'
+    a datetime una sola vez.
+    """
+    df = df.rename(columns=RENOMBRAR_COLUMNAS)
+    df = df.reindex(columns=COLUMNAS_CONTRATOS)
+    for col in COLUMNAS_CONTRATOS:
+        if col != 'Fch. VENCIMIENTO':
+            df[col] = df[col].fillna('').astype(str).str.strip()
+    for col in COLUMNAS_CATEGORICAS:
+        df[col] = df[col].astype('category')
+    df['Fch. VENCIMIENTO'] = pd.to_datetime(df['Fch. VENCIMIENTO'], errors='coerce')
+    return df.reset_index(drop=True)
+
+
+def formatear_fecha(fecha):
+    """Convierte una fecha de vencimiento a texto 'YYYY-MM-DD' (o '' si no hay)."""
+    if isinstance(fecha, str):
+        return fecha
+    if pd.isna(fecha):
+        return ''
+    return pd.Timestamp(fecha).strftime('%Y-%m-%d')
+
+
+# Cargar datos desde CSV o XLSX
+def cargar_datos_contratos(ruta_csv=RUTA_CONTRATOS):
     if not os.path.exists(ruta_csv):
         # Retorna un DataFrame vacío si no existe el archivo
-        return pd.DataFrame(columns=[
-            'DNI / C.E.', 'Apellidos y nombres', 'Régimen Laboral', 'Tipo de Contrato',
-            'Act', 'Usuario', 'Nº Celular', 'Fch. VENCIMIENTO', 'Email'])
-    return pd.read_csv(ruta_csv)
+        return normalizar_contratos(pd.DataFrame(columns=COLUMNAS_CONTRATOS))
+    if ruta_csv.lower().endswith(('.xlsx', '.xls')):
+        df = pd.read_excel(ruta_csv, dtype=COLUMNAS_TEXTO)
+    else:
+        df = pd.read_csv(ruta_csv, dtype=COLUMNAS_TEXTO)
+    return normalizar_contratos(df)
 
 # Funciones de consulta
+# Reciben `fuente`: un DataFrame de contratos o un repositorio de
+# chatbot.repositorio (en memoria o SQLite); todas las búsquedas pasan por
+# el repositorio.
+
+def _repositorio(fuente):
+    from .repositorio import como_repositorio
+    return como_repositorio(fuente)
+
+
+@metricas.medir('consulta_datos', operacion='buscar_fila')
+def _buscar_fila(fuente, valor):
+    """Primera fila cuyo nombre (sin tildes), DNI o email coincide con valor."""
+    registrar_dependencia('clave', str(valor).strip().lower())
+    return _repositorio(fuente).buscar_fila(valor)
+
 
 # Buscar vencimiento de contrato por nombre (Apellidos y nombres)
-def buscar_vencimiento_por_nombre(df, valor):
-    valor = valor.lower()
-    fila = df[(df['Apellidos y nombres'].str.lower() == valor) |
-              (df['DNI / C.E.'].astype(str).str.lower() == valor) |
-              (df['Email'].str.lower() == valor)]
-    if fila.empty:
+def buscar_vencimiento_por_nombre(fuente, valor):
+    datos = _buscar_fila(fuente, valor)
+    if datos is None:
         return None
-    datos = fila.iloc[0]
     return {
         'nombre': datos['Apellidos y nombres'],
-        'fecha_vencimiento': datos['Fch. VENCIMIENTO'],
+        'fecha_vencimiento': formatear_fecha(datos['Fch. VENCIMIENTO']),
         'estado': datos['Act']
     }
 
+MESES = {
+    1: 'enero', 2: 'febrero', 3: 'marzo', 4: 'abril', 5: 'mayo', 6: 'junio',
+    7: 'julio', 8: 'agosto', 9: 'septiembre', 10: 'octubre', 11: 'noviembre', 12: 'diciembre'
+}
+
 # Listar contratos que vencen en un mes (por Fch. VENCIMIENTO)
-def listar_contratos_por_mes(df, mes):
-    df['mes_vencimiento'] = pd.to_datetime(df['Fch. VENCIMIENTO']).dt.month
-    meses = {
-        1: 'enero', 2: 'febrero', 3: 'marzo', 4: 'abril', 5: 'mayo', 6: 'junio',
-        7: 'julio', 8: 'agosto', 9: 'septiembre', 10: 'octubre', 11: 'noviembre', 12: 'diciembre'
-    }
-    mes_num = [k for k, v in meses.items() if v == mes.lower()]
-    if not mes_num:
-        return []
-    return df[df['mes_vencimiento'] == mes_num[0]][['Apellidos y nombres', 'Tipo de Contrato', 'Fch. VENCIMIENTO']].to_dict('records')
+def listar_contratos_por_mes(fuente, mes):
+    """
+    Acepta el nombre del mes ('julio', cualquier año) o año-mes ('2025-07').
+    Retorna registros ordenados por fecha de vencimiento.
+    """
+    mes = mes.strip().lower()
+    if re.fullmatch(r'\d{4}-\d{2}', mes):
+        rango = rango_de_fecha(mes)
+        if rango is None:
+            return []
+        resultados = contratos_por_rango(fuente, *rango)
+    else:
+        mes_num = [k for k, v in MESES.items() if v == mes]
+        if not mes_num:
+            return []
+        registrar_dependencia('mes', mes_num[0])
+        with metricas.tramo('consulta_datos', operacion='por_mes'):
+            resultados = _repositorio(fuente).por_mes(mes_num[0])
+    return _registros_vencimiento(resultados)
+
+def _registros_vencimiento(resultados):
+    registros = resultados[['Apellidos y nombres', 'Tipo de Contrato', 'Fch. VENCIMIENTO']].to_dict('records')
+    for registro in registros:
+        registro['Fch. VENCIMIENTO'] = formatear_fecha(registro['Fch. VENCIMIENTO'])
+    return registros
+
+# Rango de días (desde, hasta) que abarca 'YYYY-MM-DD', 'YYYY-MM' o 'YYYY'
+@metricas.medir('parseo_fecha')
+def rango_de_fecha(fecha):
+    """Retorna (desde, hasta), ambos incluidos, o None si el texto no es una fecha válida."""
+    fecha = fecha.strip()
+    try:
+        if re.fullmatch(r'\d{4}', fecha):
+            desde = pd.Timestamp(year=int(fecha), month=1, day=1)
+            return desde, desde + pd.DateOffset(years=1) - pd.Timedelta(days=1)
+        if re.fullmatch(r'\d{4}-\d{1,2}', fecha):
+            anio, mes = fecha.split('-')
+            desde = pd.Timestamp(year=int(anio), month=int(mes), day=1)
+            return desde, desde + pd.DateOffset(months=1) - pd.Timedelta(days=1)
+        dia = pd.Timestamp(fecha).normalize()
+    except ValueError:
+        return None
+    return (dia, dia) if not pd.isna(dia) else None
+
+# Contratos que vencen en una fecha: 'YYYY-MM-DD', 'YYYY-MM' o 'YYYY'
+def contratos_por_fecha(fuente, fecha):
+    """
+    Retorna el DataFrame de contratos que vencen en el día, mes o año
+    indicado, ordenado por fecha; vacío si el texto no es una fecha válida.
+    """
+    rango = rango_de_fecha(fecha)
+    if rango is None:
+        return normalizar_contratos(pd.DataFrame(columns=COLUMNAS_CONTRATOS))
+    return contratos_por_rango(fuente, *rango)
+
+# Contratos que vencen entre dos fechas (ambas incluidas)
+@metricas.medir('consulta_datos', operacion='por_rango')
+def contratos_por_rango(fuente, desde=None, hasta=None):
+    # Días completos: [inicio, fin)
+    registrar_dependencia('fechas',
+                          None if desde is None else pd.Timestamp(desde).normalize(),
+                          None if hasta is None else pd.Timestamp(hasta).normalize() + pd.Timedelta(days=1))
+    return _repositorio(fuente).por_rango(desde, hasta)
+
+# Último día que se puede consultar: los rangos se cierran al día siguiente
+# ([inicio, fin)), que también debe caber en un Timestamp
+FECHA_MAXIMA = pd.Timestamp.max.normalize() - pd.Timedelta(days=1)
+
+# Rango (hoy, hoy + N días); un N que se pasa de FECHA_MAXIMA se acota a ella
+def rango_proximos_dias(dias, hoy=None):
+    hoy = pd.Timestamp(hoy) if hoy is not None else pd.Timestamp.today()
+    hoy = hoy.normalize()
+    if int(dias) >= (FECHA_MAXIMA - hoy).days:
+        return hoy, FECHA_MAXIMA
+    return hoy, hoy + pd.Timedelta(days=int(dias))
+
+# Contratos que vencen desde hoy hasta dentro de N días
+def contratos_proximos_dias(fuente, dias, hoy=None):
+    return contratos_por_rango(fuente, *rango_proximos_dias(dias, hoy))
+
+# Contratos cuya columna coincide con el valor, sin distinguir mayúsculas
+@metricas.medir('consulta_datos', operacion='por_valor')
+def contratos_por_valor(fuente, columna, valor):
+    registrar_dependencia('valor', columna, str(valor).lower())
+    return _repositorio(fuente).filtrar_igual(columna, valor)
 
 # Estado del correo de bienvenida (por nombre, DNI o Email)
-def estado_correo_bienvenida(df, valor):
-    valor = valor.lower()
-    fila = df[(df['Apellidos y nombres'].str.lower() == valor) |
-              (df['DNI / C.E.'].astype(str).str.lower() == valor) |
-              (df['Email'].str.lower() == valor)]
-    if fila.empty:
+def estado_correo_bienvenida(fuente, valor):
+    datos = _buscar_fila(fuente, valor)
+    if datos is None:
         return None
-    datos = fila.iloc[0]
     correo_bienvenida = datos['Act'].lower() == 'activo'
     return {
         'nombre': datos['Apellidos y nombres'],
         'correo_bienvenida': correo_bienvenida,
-        'fecha_envio_correo': datos['Fch. VENCIMIENTO'] if correo_bienvenida else None
+        'fecha_envio_correo': formatear_fecha(datos['Fch. VENCIMIENTO']) if correo_bienvenida else None
     }
 
 # Buscar número de celular por nombre, DNI o Email
-def buscar_celular(df, valor):
-    valor = valor.lower()
-    fila = df[(df['Apellidos y nombres'].str.lower() == valor) |
-              (df['DNI / C.E.'].astype(str).str.lower() == valor) |
-              (df['Email'].str.lower() == valor)]
-    if fila.empty:
+def buscar_celular(fuente, valor):
+    datos = _buscar_fila(fuente, valor)
+    if datos is None:
         return None
-    datos = fila.iloc[0]
     return {
         'nombre': datos['Apellidos y nombres'],
         'celular': datos['Nº Celular']
     }
 
 # Buscar email por nombre, DNI o Email
-def buscar_email(df, valor):
-    valor = valor.lower()
-    fila = df[(df['Apellidos y nombres'].str.lower() == valor) |
-              (df['DNI / C.E.'].astype(str).str.lower() == valor) |
-              (df['Email'].str.lower() == valor)]
-    if fila.empty:
+def buscar_email(fuente, valor):
+    datos = _buscar_fila(fuente, valor)
+    if datos is None:
         return None
-    datos = fila.iloc[0]
     return {
         'nombre': datos['Apellidos y nombres'],
         'email': datos['Email']
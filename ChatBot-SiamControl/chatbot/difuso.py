@@ -0,0 +1,161 @@
+from bisect import insort
+from collections import Counter, defaultdict
+
+
+def _trigramas(texto):
+    """Trigramas de caracteres con relleno, para que los bordes también cuenten."""
+    relleno = f'  {texto} '
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def distancia_acotada(a, b, maximo):
+    """
+    Distancia de edición (Levenshtein) entre `a` y `b`, cortando en cuanto se
+    sabe que supera `maximo`. En ese caso retorna `maximo + 1`.
+    """
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    if len(a) < len(b):
+        a, b = b, a
+    previa = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        minimo = i
+        for j, cb in enumerate(b, 1):
+            valor = min(previa[j] + 1, actual[j - 1] + 1, previa[j - 1] + (ca != cb))
+            actual.append(valor)
+            if valor < minimo:
+                minimo = valor
+        if minimo > maximo:
+            return maximo + 1
+        previa = actual
+    return previa[-1]
+
+
+class IndiceDifuso:
+    """
+    Índice de búsqueda aproximada sobre nombres ya normalizados. Usa
+    trigramas de caracteres para elegir pocos candidatos y luego verifica
+    cada uno con una distancia de edición acotada, en lugar de comparar la
+    consulta contra la lista completa de nombres.
+    """
+
+    def __init__(self, nombres, nombres_normalizados, max_candidatos=100):
+        self.max_candidatos = max_candidatos
+        self.nombres = []          # nombre original, uno por nombre distinto
+        self.normalizados = []     # nombre normalizado, uno por nombre distinto
+        self.posiciones = []       # filas donde aparece cada nombre distinto
+        self.sin_filas = 0         # nombres que quedaron sin filas tras actualizar
+        self._ids = ids = {}
+        for pos, (nombre, normalizado) in enumerate(zip(nombres, nombres_normalizados)):
+            if not normalizado:
+                continue
+            nid = ids.get(normalizado)
+            if nid is None:
+                nid = ids[normalizado] = len(self.normalizados)
+                self.nombres.append(nombre)
+                self.normalizados.append(normalizado)
+                self.posiciones.append([])
+            self.posiciones[nid].append(pos)
+        self._por_trigrama = defaultdict(list)
+        for nid, normalizado in enumerate(self.normalizados):
+            for trigrama in _trigramas(normalizado):
+                self._por_trigrama[trigrama].append(nid)
+
+    def _candidatos(self, consulta):
+        conteo = Counter()
+        for trigrama in _trigramas(consulta):
+            conteo.update(self._por_trigrama.get(trigrama, ()))
+        candidatos = conteo.most_common(self.max_candidatos + self.sin_filas)
+        return [nid for nid, _ in candidatos if self.posiciones[nid]][:self.max_candidatos]
+
+    def actualizar(self, nombres_anteriores, agregados, mapa, misma_posicion, nombres_filas):
+        """
+        Retorna un índice nuevo con los cambios de una recarga, sin modificar
+        este (que puede seguir en uso). `nombres_anteriores` son los nombres
+        normalizados de las filas quitadas, `agregados` pares (posición nueva,
+        nombre normalizado), `mapa` lleva posiciones anteriores a nuevas (-1
+        si la fila se quitó) y `nombres_filas` son los nombres originales de
+        las filas nuevas. Solo se copian las listas que cambian; un nombre que
+        se queda sin filas se conserva vacío y se ignora.
+        """
+        nuevo = IndiceDifuso.__new__(IndiceDifuso)
+        nuevo.max_candidatos = self.max_candidatos
+        nuevo.nombres = list(self.nombres)
+        nuevo.normalizados = list(self.normalizados)
+        nuevo._ids = dict(self._ids)
+        nuevo._por_trigrama = defaultdict(list, self._por_trigrama)
+        tocados = {self._ids[n] for n in nombres_anteriores if n in self._ids}
+        if misma_posicion:
+            nuevo.posiciones = list(self.posiciones)
+            for nid in tocados:
+                nuevo.posiciones[nid] = [p for p in self.posiciones[nid] if mapa[p] >= 0]
+        else:
+            # Las filas se corrieron: se trasladan todas las posiciones
+            nuevo.posiciones = [[mapa[p] for p in lista if mapa[p] >= 0] for lista in self.posiciones]
+        copiadas = set(tocados) if misma_posicion else set(range(len(nuevo.posiciones)))
+        for pos, normalizado in agregados:
+            if not normalizado:
+                continue
+            nid = nuevo._ids.get(normalizado)
+            if nid is None:
+                nid = nuevo._ids[normalizado] = len(nuevo.normalizados)
+                nuevo.nombres.append(None)
+                nuevo.normalizados.append(normalizado)
+                nuevo.posiciones.append([])
+                for trigrama in _trigramas(normalizado):
+                    # Copia al escribir: las listas se comparten con el índice anterior
+                    nuevo._por_trigrama[trigrama] = nuevo._por_trigrama.get(trigrama, []) + [nid]
+            elif nid not in copiadas:
+                nuevo.posiciones[nid] = list(nuevo.posiciones[nid])
+            copiadas.add(nid)
+            tocados.add(nid)
+            insort(nuevo.posiciones[nid], pos)
+        # El nombre que se muestra es el de la primera fila, como al construir
+        for nid in tocados:
+            if nuevo.posiciones[nid]:
+                nuevo.nombres[nid] = nombres_filas[nuevo.posiciones[nid][0]]
+        nuevo.sin_filas = sum(1 for lista in nuevo.posiciones if not lista)
+        return nuevo
+
+    def sugerir(self, consulta, n=1, minimo=0.7):
+        """
+        Retorna hasta `n` sugerencias ordenadas de mayor a menor puntaje
+        (1 - distancia / longitud), cada una como dict con 'nombre',
+        'puntaje' y 'posicion' (primera fila del nombre en el DataFrame).
+        Solo incluye las que alcanzan el puntaje `minimo`.
+        """
+        if not consulta:
+            return []
+        resultados = []
+        for nid in self._candidatos(consulta):
+            normalizado = self.normalizados[nid]
+            largo = max(len(consulta), len(normalizado))
+            maximo = int((1 - minimo) * largo)
+            distancia = distancia_acotada(consulta, normalizado, maximo)
+            if distancia > maximo:
+                continue
+            puntaje = 1 - distancia / largo
+            resultados.append((puntaje, nid))
+        # A igual puntaje, el nombre de la primera fila (tras `actualizar` los
+        # nombres nuevos van al final y su id no sigue el orden de las filas)
+        resultados.sort(key=lambda r: (-r[0], self.posiciones[r[1]][0]))
+        return [
+            {'nombre': self.nombres[nid], 'puntaje': round(puntaje, 4), 'posicion': self.posiciones[nid][0]}
+            for puntaje, nid in resultados[:n]
+        ]
+
+    def contienen(self, fragmento):
+        """Nombres originales (uno por fila, en orden) que contienen el fragmento."""
+        if not fragmento:
+            return []
+        if len(fragmento) < 3:
+            nids = [nid for nid, normalizado in enumerate(self.normalizados) if fragmento in normalizado]
+        else:
+            # Solo pueden contener el fragmento los nombres con todos sus trigramas
+            trigramas = {fragmento[i:i + 3] for i in range(len(fragmento) - 2)}
+            listas = sorted((self._por_trigrama.get(t, []) for t in trigramas), key=len)
+            candidatos = set(listas[0]).intersection(*listas[1:])
+            nids = [nid for nid in candidatos if fragmento in self.normalizados[nid]]
+        filas = sorted((pos, self.nombres[nid]) for nid in nids for pos in self.posiciones[nid])
+        return [nombre for _, nombre in filas]
@@ -0,0 +1,127 @@
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from .metricas import metricas
+
+MIME_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+MIME_CSV = 'text/csv'
+
+FORMATOS = {
+    'Excel': ('xlsx', MIME_XLSX),
+    'CSV': ('csv', MIME_CSV),
+}
+
+
+def filas_excel(df, tam_bloque=5000):
+    """
+    Recorre el DataFrame por bloques y entrega filas como tuplas de Python
+    listas para openpyxl (fechas como `date`, vacíos como None).
+    """
+    for inicio in range(0, len(df), tam_bloque):
+        bloque = df.iloc[inicio:inicio + tam_bloque]
+        columnas = []
+        for col in bloque.columns:
+            serie = bloque[col]
+            vacios = serie.isna().to_numpy()
+            if pd.api.types.is_datetime64_any_dtype(serie):
+                serie = serie.dt.date
+            valores = serie.astype(object).tolist()
+            if vacios.any():
+                valores = [None if vacio else v for v, vacio in zip(valores, vacios)]
+            columnas.append(valores)
+        yield from zip(*columnas)
+
+
+def escribir_xlsx(df, destino, tam_bloque=5000):
+    """
+    Escribe el DataFrame como XLSX en `destino` (ruta o archivo binario) con
+    un libro de openpyxl en modo solo escritura, que va volcando las filas a
+    disco en lugar de mantener todas las celdas en memoria.
+    """
+    from openpyxl import Workbook
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet('Contratos')
+    hoja.append([str(c) for c in df.columns])
+    for fila in filas_excel(df, tam_bloque):
+        hoja.append(fila)
+    libro.save(destino)
+
+
+def iterar_csv(df, tam_bloque=20000, fecha='%Y-%m-%d'):
+    """Genera el CSV (UTF-8 con BOM, para Excel) por bloques de bytes."""
+    for inicio in range(0, max(len(df), 1), tam_bloque):
+        texto = df.iloc[inicio:inicio + tam_bloque].to_csv(
+            index=False, header=inicio == 0, date_format=fecha, lineterminator='\r\n')
+        yield ('\ufeff' + texto if inicio == 0 else texto).encode('utf-8')
+
+
+def generar_xlsx(df, tam_bloque=5000):
+    salida = io.BytesIO()
+    escribir_xlsx(df, salida, tam_bloque)
+    return salida.getvalue()
+
+
+def generar_csv(df, tam_bloque=20000):
+    return b''.join(iterar_csv(df, tam_bloque))
+
+
+class CacheExportaciones:
+    """
+    Archivos ya generados, por (filtro, versión de datos, formato). Una
+    exportación solo se genera cuando alguien la pide y se reutiliza entre
+    sesiones mientras no cambien los datos. Limita entradas y bytes totales.
+    """
+
+    def __init__(self, max_entradas=16, max_bytes=200 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, generar):
+        with self._lock:
+            datos = self._entradas.get(clave)
+            if datos is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return datos
+            self.fallos += 1
+        # Se genera fuera del lock para no frenar otras descargas
+        datos = generar()
+        with self._lock:
+            if clave not in self._entradas and len(datos) <= self.max_bytes:
+                self._entradas[clave] = datos
+                self._bytes += len(datos)
+                while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                    _, viejo = self._entradas.popitem(last=False)
+                    self._bytes -= len(viejo)
+        return datos
+
+    def estadisticas(self):
+        with self._lock:
+            return {'entradas': len(self._entradas), 'bytes': self._bytes,
+                    'aciertos': self.aciertos, 'fallos': self.fallos}
+
+
+cache_exportaciones = CacheExportaciones()
+
+
+def exportar(df, formato, filtro, version):
+    """
+    Bytes del archivo `formato` ('Excel' o 'CSV') para `df`, generado una sola
+    vez por (filtro, versión de datos). `filtro` identifica la consulta que
+    produjo `df` y debe ser hashable.
+    """
+    generar = generar_xlsx if FORMATOS[formato][0] == 'xlsx' else generar_csv
+
+    def generar_medido():
+        with metricas.tramo('exportacion', formato=formato):
+            return generar(df)
+    metricas.contar('exportaciones', formato=formato)
+    return cache_exportaciones.obtener((filtro, version, formato), generar_medido)
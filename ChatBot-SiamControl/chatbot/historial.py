@@ -0,0 +1,214 @@
+import atexit
+import csv
+import os
+import queue
+import threading
+import time
+
+from .metricas import metricas
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializa dentro del proceso
+    fcntl = None
+
+RUTA_HISTORIAL = os.path.join('data', 'historial_chat.csv')
+
+
+def _limite(variable, por_defecto, escala):
+    """Límite de rotación desde una variable de entorno; 0 lo desactiva (None)."""
+    valor = float(os.environ.get(variable, por_defecto))
+    return int(valor * escala) if valor > 0 else None
+
+
+# Rotación por defecto: al llegar a SIACON_HISTORIAL_MAX_MB megabytes (10) o
+# tras SIACON_HISTORIAL_MAX_DIAS días (7) desde la primera fila del archivo
+MAX_BYTES = _limite('SIACON_HISTORIAL_MAX_MB', 10, 1024 * 1024)
+MAX_SEGUNDOS = _limite('SIACON_HISTORIAL_MAX_DIAS', 7, 24 * 60 * 60)
+
+_FIN = object()
+
+
+class HistorialChat:
+    """
+    Registro del historial de chat en CSV con escritura en segundo plano.
+
+    `registrar` solo encola la fila y retorna de inmediato; un hilo escritor
+    la vacía por lotes (hasta `tam_lote` filas o `intervalo` segundos desde la
+    primera pendiente). Si la cola de `max_pendientes` filas está llena la
+    fila se descarta y se cuenta en `descartadas`, para no bloquear nunca al
+    que responde. El archivo se rota (renombrándolo con fecha y hora) al
+    superar `max_bytes` o tras `max_segundos` desde su primera fila.
+
+    Varios procesos pueden compartir el archivo: escriben y rotan con un
+    bloqueo (flock) sobre '<archivo>.lock', que además guarda cuándo empezó
+    el archivo actual, así su edad no depende de cuándo arrancó cada proceso.
+    """
+
+    def __init__(self, archivo=RUTA_HISTORIAL, max_pendientes=10000, tam_lote=200, intervalo=1.0,
+                 max_bytes=MAX_BYTES, max_segundos=MAX_SEGUNDOS):
+        self.archivo = archivo
+        self.tam_lote = tam_lote
+        self.intervalo = intervalo
+        self.max_bytes = max_bytes
+        self.max_segundos = max_segundos
+        self.descartadas = 0
+        self._cola = queue.Queue(maxsize=max_pendientes)
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    def registrar(self, pregunta, respuesta):
+        """Encola una fila del historial. Retorna False si tuvo que descartarla."""
+        self._iniciar()
+        try:
+            self._cola.put_nowait((pregunta, respuesta))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.descartadas += 1
+            metricas.contar('historial_descartadas')
+            return False
+
+    def vaciar(self):
+        """Espera a que todas las filas encoladas hasta ahora estén en disco."""
+        if self._hilo is not None:
+            self._cola.join()
+
+    def cerrar(self):
+        """Escribe lo pendiente y detiene el hilo escritor."""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None:
+            self._cola.put(_FIN)
+            hilo.join()
+
+    def _iniciar(self):
+        if self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._trabajar, name='historial-chat', daemon=True)
+                self._hilo.start()
+
+    def _trabajar(self):
+        while True:
+            fila = self._cola.get()
+            lote, terminar = [], False
+            if fila is _FIN:
+                terminar = True
+            else:
+                lote.append(fila)
+                limite = time.monotonic() + self.intervalo
+                while len(lote) < self.tam_lote:
+                    restante = limite - time.monotonic()
+                    try:
+                        fila = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+                    except queue.Empty:
+                        break
+                    if fila is _FIN:
+                        terminar = True
+                        break
+                    lote.append(fila)
+            try:
+                if lote:
+                    with metricas.tramo('historial_escritura'):
+                        self._escribir(lote)
+                    metricas.contar('historial_filas', len(lote))
+            finally:
+                for _ in range(len(lote) + terminar):
+                    self._cola.task_done()
+            if terminar:
+                return
+
+    def _escribir(self, filas):
+        directorio = os.path.dirname(self.archivo)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(f'{self.archivo}.lock', 'a+', encoding='utf-8') as bloqueo:
+            if fcntl is not None:
+                # Otros procesos (p. ej. varios servidores) pueden escribir y rotar el mismo archivo
+                fcntl.flock(bloqueo, fcntl.LOCK_EX)
+            try:
+                self._rotar_si_corresponde(bloqueo)
+                with open(self.archivo, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    if f.tell() == 0:
+                        writer.writerow(['pregunta', 'respuesta'])
+                        _anotar_inicio(bloqueo, time.time())
+                    writer.writerows(filas)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(bloqueo, fcntl.LOCK_UN)
+
+    def _rotar_si_corresponde(self, bloqueo):
+        """Rota el archivo si corresponde; se llama con el bloqueo tomado."""
+        try:
+            tam = os.path.getsize(self.archivo)
+        except OSError:
+            return
+        inicio = _leer_inicio(bloqueo)
+        if inicio is None:
+            # Archivo sin inicio anotado (p. ej. de una versión anterior): cuenta desde ahora
+            inicio = time.time()
+            _anotar_inicio(bloqueo, inicio)
+        por_tam = self.max_bytes is not None and tam >= self.max_bytes
+        por_tiempo = self.max_segundos is not None and time.time() - inicio >= self.max_segundos
+        if not (por_tam or por_tiempo):
+            return
+        base, ext = os.path.splitext(self.archivo)
+        destino = f"{base}.{time.strftime('%Y%m%d-%H%M%S')}{ext}"
+        n = 1
+        while os.path.exists(destino):
+            destino = f"{base}.{time.strftime('%Y%m%d-%H%M%S')}-{n}{ext}"
+            n += 1
+        try:
+            os.replace(self.archivo, destino)
+        except OSError:
+            pass
+
+
+def _leer_inicio(bloqueo):
+    """Momento (epoch) de la primera fila del archivo actual, anotado en su archivo de bloqueo."""
+    bloqueo.seek(0)
+    try:
+        return float(bloqueo.read().strip())
+    except ValueError:
+        return None
+
+
+def _anotar_inicio(bloqueo, inicio):
+    bloqueo.seek(0)
+    bloqueo.truncate()
+    bloqueo.write(repr(inicio))
+    bloqueo.flush()
+
+
+_historiales = {}
+_historiales_lock = threading.Lock()
+
+
+def obtener_historial(archivo=RUTA_HISTORIAL, **opciones):
+    """
+    Retorna el historial único del proceso para el archivo indicado. Las
+    `opciones` (p. ej. max_bytes, max_segundos; ver `HistorialChat`) se usan
+    al crearlo y, si ya existe, actualizan sus límites de rotación.
+    """
+    clave = os.path.abspath(archivo)
+    with _historiales_lock:
+        historial = _historiales.get(clave)
+        if historial is None:
+            historial = HistorialChat(archivo, **opciones)
+            _historiales[clave] = historial
+        else:
+            for nombre in ('max_bytes', 'max_segundos', 'tam_lote', 'intervalo'):
+                if nombre in opciones:
+                    setattr(historial, nombre, opciones[nombre])
+        return historial
+
+
+@atexit.register
+def _cerrar_historiales():
+    with _historiales_lock:
+        historiales = list(_historiales.values())
+    for historial in historiales:
+        historial.cerrar()
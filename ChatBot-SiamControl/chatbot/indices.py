@@ -0,0 +1,255 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .difuso import IndiceDifuso
+from .texto import normalizar_texto
+
+
+class IndiceContratos:
+    """
+    Índice de búsqueda exacta sobre un DataFrame de contratos. Relaciona el
+    nombre normalizado (sin tildes), el DNI y el email en minúsculas con la
+    posición de la primera fila que los contiene, de modo que cada búsqueda
+    es una consulta a diccionario en lugar de recorrer columnas completas.
+    """
+
+    def __init__(self, df):
+        self.nombres = df['Apellidos y nombres'].tolist()
+        self.nombres_normalizados = [normalizar_texto(n) for n in self.nombres]
+        self.por_nombre = _primeras_posiciones(self.nombres_normalizados)
+        self.por_dni = _primeras_posiciones(str(d).strip().lower() for d in df['DNI / C.E.'])
+        self.por_email = _primeras_posiciones(str(e).strip().lower() for e in df['Email'])
+        self.difuso = IndiceDifuso(self.nombres, self.nombres_normalizados)
+        self.fechas = IndiceFechas(df['Fch. VENCIMIENTO'])
+        self._df = weakref.ref(df)
+        self._por_valor = {}
+        self._lock = threading.Lock()
+        # Resultados de consultas paginadas ya ordenados (ver chatbot.consultas)
+        self.consultas = OrderedDict()
+
+    def buscar(self, valor):
+        """
+        Retorna la posición de la primera fila cuyo nombre, DNI o email
+        coincide con `valor`, o None si no hay coincidencias.
+        """
+        clave = str(valor).strip().lower()
+        posiciones = [
+            self.por_nombre.get(normalizar_texto(clave)),
+            self.por_dni.get(clave),
+            self.por_email.get(clave),
+        ]
+        posiciones = [p for p in posiciones if p is not None]
+        return min(posiciones) if posiciones else None
+
+    def actualizar(self, df, cambios):
+        """
+        Índice para `df`, la nueva carga de los contratos, a partir de este y
+        de los `CambiosContratos` (ver `chatbot.cambios`): solo se normalizan
+        y reindexan las filas agregadas o modificadas. Este índice no se
+        modifica, así que las consultas que lo usan siguen viendo la carga
+        anterior completa.
+        """
+        nuevo = IndiceContratos.__new__(IndiceContratos)
+        mapa = cambios.mapa
+        quitadas, agregadas = cambios.quitadas, cambios.agregadas
+        nuevo.nombres = df['Apellidos y nombres'].tolist()
+        normalizados = np.empty(len(df), dtype=object)
+        if len(mapa):
+            siguen = np.flatnonzero(mapa >= 0)
+            normalizados[mapa[siguen]] = np.asarray(self.nombres_normalizados, dtype=object)[siguen]
+        for pos in agregadas:
+            normalizados[pos] = normalizar_texto(nuevo.nombres[pos])
+        nuevo.nombres_normalizados = normalizados.tolist()
+        dnis = df['DNI / C.E.'].astype(str).str.strip().str.lower()
+        emails = df['Email'].astype(str).str.strip().str.lower()
+        nuevo.por_nombre = _actualizar_primeras(
+            self.por_nombre, cambios, [self.nombres_normalizados[p] for p in quitadas], pd.Series(nuevo.nombres_normalizados))
+        nuevo.por_dni = _actualizar_primeras(self.por_dni, cambios, self._claves('DNI / C.E.', quitadas), dnis)
+        nuevo.por_email = _actualizar_primeras(self.por_email, cambios, self._claves('Email', quitadas), emails)
+        nuevo.difuso = self.difuso.actualizar(
+            [self.nombres_normalizados[p] for p in quitadas],
+            [(pos, nuevo.nombres_normalizados[pos]) for pos in agregadas],
+            mapa, cambios.misma_posicion, nuevo.nombres)
+        nuevo.fechas = self.fechas.actualizar(df['Fch. VENCIMIENTO'], mapa, agregadas)
+        nuevo._df = weakref.ref(df)
+        nuevo._lock = threading.Lock()
+        nuevo._por_valor = {}
+        with self._lock:
+            por_valor = dict(self._por_valor)
+        for columna, grupos in por_valor.items():
+            nuevo._por_valor[columna] = _actualizar_grupos(grupos, mapa, agregadas, df[columna])
+        nuevo.consultas = OrderedDict()
+        return nuevo
+
+    def _claves(self, columna, posiciones):
+        """Valores en minúsculas de `columna` en esas posiciones de la carga anterior."""
+        df = self._df()
+        if df is None or not len(posiciones):
+            return []
+        return df[columna].iloc[posiciones].astype(str).str.strip().str.lower().tolist()
+
+    def por_valor(self, columna):
+        """
+        Diccionario valor -> posiciones (arreglo ordenado) para una columna de
+        filtro como 'Régimen Laboral' o 'Usuario'. Se arma la primera vez que
+        se pide y se reutiliza mientras dure esta carga de datos.
+        """
+        grupos = self._por_valor.get(columna)
+        if grupos is None:
+            df = self._df()
+            grupos = {valor: np.asarray(pos) for valor, pos in df.groupby(columna, observed=True, sort=True).indices.items()}
+            with self._lock:
+                grupos = self._por_valor.setdefault(columna, grupos)
+        return grupos
+
+
+class IndiceFechas:
+    """
+    Posiciones de las filas ordenadas por 'Fch. VENCIMIENTO' (sin las que no
+    tienen fecha), junto con las fechas ya ordenadas como datetime64. Cada
+    consulta por día, mes, año o rango son dos búsquedas binarias y un corte
+    del arreglo; el resultado sale ordenado por fecha de vencimiento.
+    """
+
+    def __init__(self, fechas):
+        valores = pd.to_datetime(fechas, errors='coerce').to_numpy(dtype='datetime64[ns]')
+        validas = np.flatnonzero(~np.isnat(valores))
+        self.posiciones = validas[np.argsort(valores[validas], kind='stable')]
+        self.fechas = valores[self.posiciones]
+
+    def actualizar(self, fechas, mapa, agregadas):
+        """
+        Índice para la nueva carga: traslada las posiciones que siguen con
+        `mapa` (-1 = quitada) e inserta las `agregadas` con `fechas` (la
+        columna nueva) en su lugar, sin volver a ordenar todo.
+        """
+        nuevo = IndiceFechas.__new__(IndiceFechas)
+        trasladadas = mapa[self.posiciones] if len(self.posiciones) else self.posiciones
+        siguen = trasladadas >= 0
+        posiciones, valores = trasladadas[siguen], self.fechas[siguen]
+        agregadas = np.asarray(agregadas, dtype=posiciones.dtype)
+        nuevas = pd.to_datetime(fechas.iloc[agregadas], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        validas = ~np.isnat(nuevas)
+        agregadas, nuevas = agregadas[validas], nuevas[validas]
+        orden = np.lexsort((agregadas, nuevas))
+        agregadas, nuevas = agregadas[orden], nuevas[orden]
+        # Entre fechas iguales manda la posición, como en el orden estable inicial
+        lugares = np.empty(len(agregadas), dtype=np.intp)
+        for k, (pos, fecha) in enumerate(zip(agregadas, nuevas)):
+            i = np.searchsorted(valores, fecha, 'left')
+            j = np.searchsorted(valores, fecha, 'right')
+            lugares[k] = i + np.searchsorted(posiciones[i:j], pos)
+        nuevo.posiciones = np.insert(posiciones, lugares, agregadas)
+        nuevo.fechas = np.insert(valores, lugares, nuevas)
+        return nuevo
+
+    def entre(self, inicio=None, fin=None):
+        """Posiciones con inicio <= fecha < fin (None = sin límite)."""
+        i = 0 if inicio is None else np.searchsorted(self.fechas, np.datetime64(pd.Timestamp(inicio), 'ns'), 'left')
+        j = len(self.fechas) if fin is None else np.searchsorted(self.fechas, np.datetime64(pd.Timestamp(fin), 'ns'), 'left')
+        return self.posiciones[i:j]
+
+    def rango(self, desde=None, hasta=None):
+        """Posiciones con vencimiento entre los días `desde` y `hasta`, ambos incluidos."""
+        fin = None if hasta is None else pd.Timestamp(hasta).normalize() + pd.Timedelta(days=1)
+        inicio = None if desde is None else pd.Timestamp(desde).normalize()
+        return self.entre(inicio, fin)
+
+    def dia(self, fecha):
+        return self.rango(fecha, fecha)
+
+    def anio_mes(self, anio, mes):
+        inicio = pd.Timestamp(year=anio, month=mes, day=1)
+        return self.entre(inicio, inicio + pd.DateOffset(months=1))
+
+    def anio(self, anio):
+        return self.entre(pd.Timestamp(year=anio, month=1, day=1), pd.Timestamp(year=anio + 1, month=1, day=1))
+
+    def mes(self, mes):
+        """Posiciones que vencen en el mes indicado (1-12) de cualquier año."""
+        if not len(self.fechas):
+            return self.posiciones
+        primero = pd.Timestamp(self.fechas[0]).year
+        ultimo = pd.Timestamp(self.fechas[-1]).year
+        return np.concatenate([self.anio_mes(anio, mes) for anio in range(primero, ultimo + 1)])
+
+
+def _actualizar_primeras(primeras, cambios, claves_quitadas, claves_nuevas):
+    """
+    Diccionario clave -> primera posición para la nueva carga, a partir del
+    anterior: las claves de filas quitadas o agregadas se recalculan con una
+    sola pasada sobre `claves_nuevas` (la columna nueva); las demás solo se
+    trasladan con el mapa de posiciones si las filas se corrieron.
+    """
+    mapa = cambios.mapa
+    if cambios.misma_posicion:
+        nuevas = dict(primeras)
+    else:
+        mapa_lista = mapa.tolist()
+        nuevas = {clave: mapa_lista[pos] for clave, pos in primeras.items() if mapa_lista[pos] >= 0}
+    afectadas = set(claves_quitadas)
+    afectadas.update(claves_nuevas.iloc[cambios.agregadas])
+    afectadas.discard('')
+    for clave in afectadas:
+        nuevas.pop(clave, None)
+    if afectadas:
+        posiciones = np.flatnonzero(claves_nuevas.isin(afectadas).to_numpy())
+        for pos, clave in zip(posiciones.tolist(), claves_nuevas.iloc[posiciones]):
+            nuevas.setdefault(clave, pos)
+    return nuevas
+
+
+def _actualizar_grupos(grupos, mapa, agregadas, columna):
+    """Grupos valor -> posiciones (ver `IndiceContratos.por_valor`) para la nueva carga."""
+    nuevos = {}
+    for valor, posiciones in grupos.items():
+        trasladadas = mapa[posiciones]
+        nuevos[valor] = trasladadas[trasladadas >= 0]
+    for valor, posiciones in pd.Series(agregadas).groupby(columna.iloc[agregadas].to_numpy()):
+        nuevos[valor] = np.union1d(nuevos.get(valor, np.array([], dtype=np.intp)), posiciones.to_numpy())
+    return {valor: nuevos[valor] for valor in sorted(nuevos) if len(nuevos[valor])}
+
+
+def _primeras_posiciones(claves):
+    posiciones = {}
+    for pos, clave in enumerate(claves):
+        if clave:
+            posiciones.setdefault(clave, pos)
+    return posiciones
+
+
+# Índices ya construidos, por DataFrame. Se descartan solos cuando el
+# DataFrame deja de existir (por ejemplo, tras una recarga del almacén).
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+def registrar_indice(df, indice):
+    """Asocia a `df` un índice ya construido (p. ej. con `IndiceContratos.actualizar`)."""
+    clave = id(df)
+    with _indices_lock:
+        if clave not in _indices:
+            _indices[clave] = indice
+            weakref.finalize(df, _indices.pop, clave, None)
+        return _indices[clave]
+
+
+def obtener_indice(df):
+    """
+    Retorna el índice del DataFrame, construyéndolo solo la primera vez.
+    El DataFrame se trata como de solo lectura, igual que en el almacén.
+    """
+    clave = id(df)
+    indice = _indices.get(clave)
+    if indice is not None:
+        return indice
+    indice = IndiceContratos(df)
+    with _indices_lock:
+        if clave not in _indices:
+            _indices[clave] = indice
+            weakref.finalize(df, _indices.pop, clave, None)
+        return _indices[clave]
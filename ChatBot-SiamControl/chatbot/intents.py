@@ -0,0 +1,182 @@
+import re
+import threading
+import time
+
+from .metricas import metricas
+
+
+def clave_literal(patron):
+    """
+    Tramo literal más largo del patrón fuera de grupos y clases, que toda
+    pregunta que calce debe contener; p. ej. 'mero de celular ' en
+    r'n(?:ú|u)mero de celular (?:de|tiene) (?P<valor>.+)'. Un carácter
+    cuantificado ('ab?') no cuenta, y si el patrón tiene una alternativa
+    '|' fuera de grupos no hay clave ('').
+    """
+    tramos, actual, nivel, i = [], '', 0, 0
+    while i < len(patron):
+        caracter = patron[i]
+        literal = None
+        if caracter == '\\':
+            siguiente = patron[i + 1:i + 2]
+            # \. o \  son literales; \d, \w, \b, etc. no
+            if siguiente and not siguiente.isalnum():
+                literal = siguiente
+            i += 1
+        elif caracter == '[':
+            # Salta la clase: un ']' inicial (o tras '^') es parte de ella
+            i += 2 if patron[i + 1:i + 2] == '^' else 1
+            i += patron[i:i + 1] == ']'
+            while i < len(patron) and patron[i] != ']':
+                i += 2 if patron[i] == '\\' else 1
+        elif caracter == '(':
+            nivel += 1
+        elif caracter == ')':
+            nivel -= 1
+        elif caracter == '|' and nivel == 0:
+            return ''
+        elif caracter in '*+?{':
+            # El carácter cuantificado es opcional o se repite: no cuenta
+            actual = actual[:-1]
+            if caracter == '{':
+                i = patron.find('}', i) if '}' in patron[i:] else len(patron)
+        elif caracter not in '.^$':
+            literal = caracter
+        if literal is not None and nivel == 0:
+            actual += literal
+        else:
+            tramos.append(actual)
+            actual = ''
+        i += 1
+    tramos.append(actual)
+    # A igual largo, el último: suele estar más cerca de los slots y ser más específico
+    return max(reversed(tramos), key=len)
+
+
+class Intent:
+    """
+    Un intent registrado: nombre, patrón con slots nombrados, manejador y la
+    clave literal que la pregunta debe contener para probar el patrón.
+    """
+
+    def __init__(self, nombre, patron, manejador, clave=None):
+        self.nombre = nombre
+        self.patron = patron
+        self.manejador = manejador
+        self.clave = clave_literal(patron) if clave is None else clave
+        self.regex = re.compile(patron)
+
+
+class EnrutadorIntents:
+    """
+    Clasifica una pregunta (ya normalizada) en un intent y llama al
+    manejador registrado con los slots extraídos.
+
+    Cada intent tiene una clave literal (p. ej. 'correo de bienvenida') que
+    toda pregunta que calce debe contener; solo se prueban, con su regex
+    compilada, los intents cuya clave aparece en la pregunta. Comprobar una
+    subcadena cuesta mucho menos que una búsqueda con regex, así que una
+    pregunta que no calza con nada no pasa por ninguna. Si una pregunta
+    calza con varios intents gana el registrado primero, igual que la
+    cadena de `re.search` que reemplaza. Cada patrón declara sus slots como
+    grupos nombrados, p. ej. r'email de (?P<valor>.+)'.
+
+    También lleva, por intent, la cantidad de consultas atendidas, el
+    tiempo acumulado del manejador y las respuestas servidas desde una caché
+    (ver `contar_acierto` y `estadisticas`).
+    """
+
+    def __init__(self, por_defecto=None):
+        self._intents = []
+        self._por_defecto = por_defecto
+        self._lock = threading.Lock()
+        self._consultas = {}
+        self._tiempo = {}
+        self._aciertos = {}
+
+    def intent(self, nombre, patron, clave=None):
+        """
+        Decorador que registra `manejador(datos, slots)` para el patrón.
+        `clave` es un texto que toda pregunta que calce contiene; por defecto,
+        el tramo literal más largo del patrón (ver `clave_literal`).
+        """
+        def registrar(manejador):
+            self.registrar(nombre, patron, manejador, clave)
+            return manejador
+        return registrar
+
+    def registrar(self, nombre, patron, manejador, clave=None):
+        if any(i.nombre == nombre for i in self._intents):
+            raise ValueError(f'Intent ya registrado: {nombre}')
+        self._intents.append(Intent(nombre, patron, manejador, clave))
+
+    @property
+    def intents(self):
+        """Intents registrados, en orden de prioridad."""
+        return tuple(self._intents)
+
+    def por_defecto(self, manejador):
+        """Decorador que registra el manejador para preguntas no reconocidas."""
+        self._por_defecto = manejador
+        return manejador
+
+    def clasificar(self, pregunta):
+        """Retorna (intent, slots) para la pregunta, o (None, {}) si no calza."""
+        for intent in self._intents:
+            if intent.clave in pregunta:
+                match = intent.regex.search(pregunta)
+                if match is not None:
+                    return intent, {nombre: valor for nombre, valor in match.groupdict().items() if valor is not None}
+        return None, {}
+
+    def despachar(self, pregunta, datos):
+        """
+        Clasifica la pregunta y retorna la respuesta del manejador, que recibe
+        `datos` (la fuente de contratos, p. ej. un repositorio) y los slots.
+        """
+        return self.atender(pregunta, datos)[1]
+
+    def atender(self, pregunta, datos):
+        """Como `despachar`, pero retorna (nombre del intent, respuesta)."""
+        with metricas.tramo('clasificacion'):
+            intent, slots = self.clasificar(pregunta)
+        nombre = intent.nombre if intent else 'desconocido'
+        manejador = intent.manejador if intent else self._por_defecto
+        inicio = time.perf_counter()
+        try:
+            return nombre, manejador(datos, slots)
+        finally:
+            duracion = time.perf_counter() - inicio
+            with self._lock:
+                self._consultas[nombre] = self._consultas.get(nombre, 0) + 1
+                self._tiempo[nombre] = self._tiempo.get(nombre, 0.0) + duracion
+            metricas.observar('intent', duracion, intent=nombre)
+
+    def contar_acierto(self, nombre):
+        """Anota una respuesta del intent `nombre` servida desde una caché, sin pasar por el manejador."""
+        with self._lock:
+            self._aciertos[nombre] = self._aciertos.get(nombre, 0) + 1
+
+    def estadisticas(self):
+        """
+        Por intent: consultas calculadas por el manejador y su tiempo
+        (segundos), y aciertos de caché (respuestas que no lo llamaron).
+        """
+        with self._lock:
+            estadisticas = {}
+            for nombre in [*self._consultas, *(n for n in self._aciertos if n not in self._consultas)]:
+                consultas = self._consultas.get(nombre, 0)
+                tiempo = self._tiempo.get(nombre, 0.0)
+                estadisticas[nombre] = {
+                    'consultas': consultas,
+                    'aciertos_cache': self._aciertos.get(nombre, 0),
+                    'tiempo_total': tiempo,
+                    'tiempo_promedio': tiempo / consultas if consultas else 0.0,
+                }
+            return estadisticas
+
+    def reiniciar_estadisticas(self):
+        with self._lock:
+            self._consultas.clear()
+            self._tiempo.clear()
+            self._aciertos.clear()
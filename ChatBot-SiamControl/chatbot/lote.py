@@ -0,0 +1,150 @@
+"""
+Consultas masivas: celular, email y vencimiento de cientos de personas a la
+vez (p. ej. para revisiones de accesos), a partir de una lista o un archivo
+de nombres, DNIs o emails.
+"""
+import os
+from itertools import islice
+
+import pandas as pd
+
+from .exportar import filas_excel
+from .repositorio import como_repositorio
+
+# Columnas de contrato que se incluyen por defecto en el resultado
+COLUMNAS_LOTE = ['Apellidos y nombres', 'DNI / C.E.', 'Nº Celular', 'Email', 'Fch. VENCIMIENTO', 'Act']
+
+
+def leer_claves(entrada, columna=None, tam_bloque=5000):
+    """
+    Entrega las claves por bloques (listas), sin cargar toda la entrada en
+    memoria. `entrada` puede ser una lista/iterable de textos o la ruta de un
+    archivo: .txt (una clave por línea), .xlsx o .csv (con encabezado; se usa
+    `columna`, o la primera columna si no se indica). Omite claves vacías.
+    """
+    if not isinstance(entrada, (str, os.PathLike)):
+        claves = (str(c).strip() for c in entrada if c is not None)
+        yield from _bloques((c for c in claves if c), tam_bloque)
+        return
+    ruta = os.fspath(entrada)
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.txt':
+        with open(ruta, encoding='utf-8-sig') as archivo:
+            yield from _bloques((linea.strip() for linea in archivo if linea.strip()), tam_bloque)
+    elif extension in ('.xlsx', '.xlsm'):
+        yield from _bloques(_claves_xlsx(ruta, columna), tam_bloque)
+    else:
+        for bloque in pd.read_csv(ruta, dtype=str, keep_default_na=False, chunksize=tam_bloque,
+                                  usecols=[columna] if columna else [0], encoding='utf-8-sig'):
+            claves = bloque.iloc[:, 0].str.strip()
+            yield claves[claves != ''].tolist()
+
+
+def _bloques(claves, tam_bloque):
+    claves = iter(claves)
+    while True:
+        bloque = list(islice(claves, tam_bloque))
+        if not bloque:
+            return
+        yield bloque
+
+
+def _claves_xlsx(ruta, columna):
+    from openpyxl import load_workbook
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = [str(c).strip() if c is not None else '' for c in next(filas, ())]
+        if columna and columna not in encabezado:
+            raise ValueError(f'La columna {columna!r} no está en {ruta}')
+        posicion = encabezado.index(columna) if columna else 0
+        for fila in filas:
+            valor = fila[posicion] if posicion < len(fila) else None
+            if valor is not None and str(valor).strip():
+                yield str(valor).strip()
+    finally:
+        libro.close()
+
+
+def consulta_masiva(fuente, claves, columnas=COLUMNAS_LOTE, sugerencias=3):
+    """
+    Resuelve un bloque de claves (nombre, DNI o email) con un solo cruce
+    contra los contratos. Retorna un DataFrame con 'Clave', 'Encontrado',
+    las `columnas` pedidas y 'Sugerencias' (nombres parecidos, solo para las
+    claves sin coincidencia).
+    """
+    repo = como_repositorio(fuente)
+    claves = list(claves)
+    filas = repo.resolver(claves)
+    encontradas = filas['Apellidos y nombres'].notna()
+    resultado = pd.DataFrame({'Clave': claves, 'Encontrado': encontradas.map({True: 'Sí', False: 'No'})})
+    for col in columnas:
+        serie = filas[col]
+        if col == 'Fch. VENCIMIENTO':
+            resultado[col] = pd.to_datetime(serie)
+        else:
+            resultado[col] = serie.astype(object).where(encontradas, '')
+    resultado['Sugerencias'] = ''
+    if sugerencias:
+        for i in resultado.index[~encontradas.to_numpy()]:
+            nombres = repo.sugerir_nombres(claves[i], n=sugerencias, minimo=0.6)
+            resultado.at[i, 'Sugerencias'] = '; '.join(s['nombre'] for s in nombres)
+    return resultado
+
+
+def exportar_lote(fuente, entrada, salida, columna=None, columnas=COLUMNAS_LOTE, sugerencias=3, tam_bloque=5000):
+    """
+    Resuelve todas las claves de `entrada` (ver `leer_claves`) y escribe el
+    resultado en `salida` (.xlsx o .csv) bloque a bloque, de modo que ni la
+    entrada ni el resultado completos pasan por memoria. Retorna un resumen:
+    {'claves', 'encontradas', 'no_encontradas': [{'clave', 'sugerencias'}]}.
+    """
+    repo = como_repositorio(fuente)
+    resumen = {'claves': 0, 'encontradas': 0, 'no_encontradas': []}
+    es_xlsx = salida.lower().endswith('.xlsx')
+    if es_xlsx:
+        from openpyxl import Workbook
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet('Consulta masiva')
+        hoja.append(['Clave', 'Encontrado', *columnas, 'Sugerencias'])
+    else:
+        archivo = open(salida, 'w', encoding='utf-8-sig', newline='')
+    try:
+        for claves in leer_claves(entrada, columna, tam_bloque):
+            if not claves:
+                continue
+            bloque = consulta_masiva(repo, claves, columnas, sugerencias)
+            if es_xlsx:
+                for fila in filas_excel(bloque, tam_bloque):
+                    hoja.append(fila)
+            else:
+                bloque.to_csv(archivo, index=False, header=resumen['claves'] == 0,
+                              date_format='%Y-%m-%d', lineterminator='\r\n')
+            faltantes = bloque[bloque['Encontrado'] == 'No']
+            resumen['claves'] += len(bloque)
+            resumen['encontradas'] += len(bloque) - len(faltantes)
+            resumen['no_encontradas'].extend(
+                {'clave': c, 'sugerencias': s.split('; ') if s else []}
+                for c, s in zip(faltantes['Clave'], faltantes['Sugerencias']))
+        if es_xlsx:
+            libro.save(salida)
+        elif resumen['claves'] == 0:
+            archivo.write(','.join(['Clave', 'Encontrado', *columnas, 'Sugerencias']) + '\r\n')
+    finally:
+        if not es_xlsx:
+            archivo.close()
+    return resumen
+
+
+def resumen_texto(resumen, max_faltantes=50):
+    """Resumen legible de `exportar_lote` para la consola."""
+    lineas = [f"{resumen['encontradas']} de {resumen['claves']} claves encontradas."]
+    faltantes = resumen['no_encontradas']
+    if faltantes:
+        lineas.append('Sin coincidencia:')
+        for f in faltantes[:max_faltantes]:
+            sugeridos = f" (¿quiso decir {' / '.join(f['sugerencias'])}?)" if f['sugerencias'] else ''
+            lineas.append(f"  - {f['clave']}{sugeridos}")
+        if len(faltantes) > max_faltantes:
+            lineas.append(f'  ... y {len(faltantes) - max_faltantes} más (ver columna Sugerencias).')
+    return '\n'.join(lineas)
@@ -0,0 +1,281 @@
+"""
+Métricas de latencia y contadores del chatbot y la app.
+
+Los tramos (`metricas.tramo('nombre', etiqueta=...)` o el decorador
+`metricas.medir`) guardan cantidad, suma, máximo y las últimas muestras de
+cada serie, de donde salen p50/p95/p99. Registrar cuesta un par de
+microsegundos, así que queda activo en producción; `SIACON_METRICAS=0` lo
+desactiva.
+
+Salidas opcionales, configuradas por variables de entorno:
+- SIACON_METRICAS_PUERTO: sirve el formato de texto de Prometheus en
+  http://127.0.0.1:<puerto>/metrics.
+- SIACON_METRICAS_JSON: vuelca el resumen en JSON a esa ruta cada
+  SIACON_METRICAS_INTERVALO segundos (60 por defecto).
+
+Un proceso hijo (p. ej. los workers de `chatbot.servicio`) puede pasarle sus
+registros al principal con `acumular_pendientes`, `extraer_pendientes` e
+`incorporar`.
+"""
+import json
+import os
+import threading
+import time
+import warnings
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+CUANTILES = (0.5, 0.95, 0.99)
+
+
+class _Serie:
+    __slots__ = ('cuenta', 'suma', 'maximo', 'muestras')
+
+    def __init__(self, max_muestras):
+        self.cuenta = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+        self.muestras = deque(maxlen=max_muestras)
+
+
+def _percentil(ordenadas, q):
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))]
+
+
+def _etiquetas_prometheus(etiquetas, extra=()):
+    pares = [*etiquetas, *extra]
+    if not pares:
+        return ''
+    texto = ','.join(
+        f'{k}="' + str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for k, v in pares)
+    return '{' + texto + '}'
+
+
+class Metricas:
+    """
+    Registro de tiempos y contadores del proceso, por nombre y etiquetas.
+    Los percentiles se calculan sobre las últimas `max_muestras` muestras de
+    cada serie (ventana reciente); cantidad y suma son acumuladas.
+    """
+
+    def __init__(self, activo=True, max_muestras=2048):
+        self.activo = activo
+        self.max_muestras = max_muestras
+        self.inicio = time.time()
+        self._tiempos = {}
+        self._contadores = {}
+        self._pendientes = None
+        self._lock = threading.Lock()
+
+    def observar(self, nombre, segundos, **etiquetas):
+        """Registra una duración (en segundos) en la serie `nombre`."""
+        if not self.activo:
+            return
+        with self._lock:
+            self._observar((nombre, tuple(sorted(etiquetas.items()))), segundos)
+
+    def _observar(self, clave, segundos):
+        serie = self._tiempos.get(clave)
+        if serie is None:
+            serie = self._tiempos[clave] = _Serie(self.max_muestras)
+        serie.cuenta += 1
+        serie.suma += segundos
+        if segundos > serie.maximo:
+            serie.maximo = segundos
+        serie.muestras.append(segundos)
+        if self._pendientes is not None:
+            self._pendientes.append(('tiempo', clave, segundos))
+
+    @contextmanager
+    def tramo(self, nombre, **etiquetas):
+        """Mide el bloque `with` y lo registra en la serie `nombre`."""
+        if not self.activo:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nombre, time.perf_counter() - inicio, **etiquetas)
+
+    def medir(self, nombre, **etiquetas):
+        """Decorador que mide cada llamada a la función como un tramo."""
+        def decorador(funcion):
+            @wraps(funcion)
+            def medida(*args, **kwargs):
+                if not self.activo:
+                    return funcion(*args, **kwargs)
+                inicio = time.perf_counter()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.observar(nombre, time.perf_counter() - inicio, **etiquetas)
+            return medida
+        return decorador
+
+    def contar(self, nombre, n=1, **etiquetas):
+        """Suma `n` al contador `nombre`."""
+        if not self.activo:
+            return
+        with self._lock:
+            self._contar((nombre, tuple(sorted(etiquetas.items()))), n)
+
+    def _contar(self, clave, n):
+        self._contadores[clave] = self._contadores.get(clave, 0) + n
+        if self._pendientes is not None:
+            self._pendientes.append(('contador', clave, n))
+
+    def acumular_pendientes(self):
+        """
+        Desde ahora guarda también cada registro en una lista aparte, que
+        `extraer_pendientes` entrega y vacía.
+        """
+        with self._lock:
+            if self._pendientes is None:
+                self._pendientes = []
+
+    def extraer_pendientes(self):
+        """Registros desde la extracción anterior, para pasarlos a `incorporar` en otro proceso."""
+        with self._lock:
+            pendientes = self._pendientes or []
+            if self._pendientes is not None:
+                self._pendientes = []
+        return pendientes
+
+    def incorporar(self, pendientes):
+        """Suma los registros de `extraer_pendientes` de otro proceso a los de este."""
+        if not self.activo or not pendientes:
+            return
+        with self._lock:
+            for tipo, clave, valor in pendientes:
+                if tipo == 'tiempo':
+                    self._observar(clave, valor)
+                else:
+                    self._contar(clave, valor)
+
+    def reiniciar(self):
+        with self._lock:
+            self._tiempos.clear()
+            self._contadores.clear()
+            self.inicio = time.time()
+
+    def resumen(self):
+        """
+        Estado actual: {'desde', 'tramos': [...], 'contadores': [...]}. Cada
+        tramo trae nombre, etiquetas, cuenta, suma, máximo y p50/p95/p99 en
+        segundos.
+        """
+        with self._lock:
+            tiempos = [(clave, s.cuenta, s.suma, s.maximo, list(s.muestras)) for clave, s in self._tiempos.items()]
+            contadores = list(self._contadores.items())
+        tramos = []
+        for (nombre, etiquetas), cuenta, suma, maximo, muestras in sorted(tiempos):
+            muestras.sort()
+            tramo = {'nombre': nombre, 'etiquetas': dict(etiquetas), 'cuenta': cuenta, 'suma': suma, 'maximo': maximo}
+            for q in CUANTILES:
+                tramo[f'p{int(q * 100)}'] = _percentil(muestras, q)
+            tramos.append(tramo)
+        return {
+            'desde': self.inicio,
+            'tramos': tramos,
+            'contadores': [{'nombre': n, 'etiquetas': dict(e), 'valor': v} for (n, e), v in sorted(contadores)],
+        }
+
+    def texto_prometheus(self):
+        """Resumen en el formato de texto de Prometheus (summary y counter)."""
+        resumen = self.resumen()
+        lineas, declarados = [], set()
+        for tramo in resumen['tramos']:
+            metrica = f"siacon_{tramo['nombre']}_segundos"
+            if metrica not in declarados:
+                declarados.add(metrica)
+                lineas.append(f'# TYPE {metrica} summary')
+            etiquetas = tuple(tramo['etiquetas'].items())
+            for q in CUANTILES:
+                lineas.append(f"{metrica}{_etiquetas_prometheus(etiquetas, [('quantile', q)])} {tramo[f'p{int(q * 100)}']:.6g}")
+            lineas.append(f"{metrica}_sum{_etiquetas_prometheus(etiquetas)} {tramo['suma']:.6g}")
+            lineas.append(f"{metrica}_count{_etiquetas_prometheus(etiquetas)} {tramo['cuenta']}")
+        for contador in resumen['contadores']:
+            metrica = f"siacon_{contador['nombre']}_total"
+            if metrica not in declarados:
+                declarados.add(metrica)
+                lineas.append(f'# TYPE {metrica} counter')
+            lineas.append(f"{metrica}{_etiquetas_prometheus(tuple(contador['etiquetas'].items()))} {contador['valor']}")
+        return '\n'.join(lineas) + '\n'
+
+    def volcar_json(self, ruta):
+        """Escribe el resumen en `ruta` (vía archivo temporal, sin lecturas a medias)."""
+        temporal = f'{ruta}.{os.getpid()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(), f, ensure_ascii=False, indent=1)
+        os.replace(temporal, ruta)
+
+
+metricas = Metricas(activo=os.environ.get('SIACON_METRICAS', '1') != '0')
+
+_hilos = {}
+_hilos_lock = threading.Lock()
+
+
+def iniciar_volcado(ruta, intervalo=60.0, registro=metricas):
+    """Vuelca el resumen en JSON a `ruta` cada `intervalo` segundos (una vez por proceso y ruta)."""
+    def volcar():
+        while True:
+            time.sleep(intervalo)
+            try:
+                registro.volcar_json(ruta)
+            except OSError as e:
+                warnings.warn(f'No se pudieron volcar las métricas a {ruta}: {e}')
+    return _iniciar_hilo(('json', os.path.abspath(ruta)), volcar)
+
+
+def iniciar_servidor(puerto, host='127.0.0.1', registro=metricas):
+    """Sirve las métricas en formato Prometheus en http://host:puerto/metrics."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            cuerpo = registro.texto_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    def servir():
+        try:
+            servidor = ThreadingHTTPServer((host, int(puerto)), Manejador)
+        except OSError as e:
+            warnings.warn(f'No se pudo abrir el puerto de métricas {host}:{puerto}: {e}')
+            return
+        servidor.serve_forever()
+    return _iniciar_hilo(('http', host, int(puerto)), servir)
+
+
+def _iniciar_hilo(clave, objetivo):
+    with _hilos_lock:
+        hilo = _hilos.get(clave)
+        if hilo is None:
+            hilo = _hilos[clave] = threading.Thread(target=objetivo, name=f'metricas-{clave[0]}', daemon=True)
+            hilo.start()
+        return hilo
+
+
+def iniciar_desde_entorno():
+    """Arranca el volcado JSON y/o el endpoint Prometheus si sus variables de entorno están definidas."""
+    if not metricas.activo:
+        return
+    if os.environ.get('SIACON_METRICAS_JSON'):
+        iniciar_volcado(os.environ['SIACON_METRICAS_JSON'], float(os.environ.get('SIACON_METRICAS_INTERVALO', 60)))
+    if os.environ.get('SIACON_METRICAS_PUERTO'):
+        iniciar_servidor(os.environ['SIACON_METRICAS_PUERTO'])
@@ -0,0 +1,594 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializa dentro del proceso
+    fcntl = None
+
+from .consultas import consultar, filtrar, valores_distintos
+from .datos import COLUMNAS_CATEGORICAS, COLUMNAS_CONTRATOS, RUTA_CONTRATOS, cargar_datos_contratos
+from .difuso import IndiceDifuso
+from .indices import obtener_indice
+from .metricas import metricas
+from .texto import normalizar_texto
+
+RUTA_SQLITE = os.path.join('data', 'contratos.db')
+
+# Backend por defecto: 'pandas' (en memoria) o 'sqlite'
+BACKEND = os.environ.get('SIACON_BACKEND', 'pandas')
+
+
+class RepositorioContratos:
+    """
+    Acceso a los contratos para el bot y la app. Las funciones de consulta de
+    `chatbot.datos`, los intents y las vistas de Streamlit pasan por aquí, de
+    modo que el origen de los datos (DataFrame en memoria o SQLite) se elige
+    en un solo lugar. Los DataFrames que retorna tienen las columnas de
+    `COLUMNAS_CONTRATOS`.
+    """
+
+    @property
+    def version(self):
+        """Versión de los datos; cambia cuando se recarga o sincroniza el origen."""
+        raise NotImplementedError
+
+    @property
+    def cambios(self):
+        """
+        Diferencias con la versión anterior si la última recarga fue
+        incremental (`chatbot.cambios.CambiosContratos`), o None.
+        """
+        return None
+
+    def buscar_fila(self, valor):
+        """Primera fila (dict) cuyo nombre sin tildes, DNI o email coincide, o None."""
+        raise NotImplementedError
+
+    def sugerir_nombres(self, nombre, n=1, minimo=0.7):
+        """
+        Nombres parecidos: lista de dicts con 'nombre' y 'puntaje'. `nombre`
+        se normaliza (minúsculas, sin tildes) antes de comparar, así que
+        puede venir tal como lo escribió el usuario o una planilla.
+        """
+        raise NotImplementedError
+
+    def nombres_que_contienen(self, fragmento):
+        """Nombres (uno por fila, en orden) cuyo nombre normalizado contiene el fragmento, también normalizado."""
+        raise NotImplementedError
+
+    def resolver(self, claves):
+        """
+        Resuelve muchas claves (nombre, DNI o email) de una vez, con la misma
+        regla que `buscar_fila`. Retorna un DataFrame con una fila por clave,
+        en el mismo orden (índice 0..n-1), vacía (NaN) si no hubo coincidencia.
+        """
+        raise NotImplementedError
+
+    def por_rango(self, desde=None, hasta=None):
+        """Contratos que vencen entre dos días (incluidos), ordenados por fecha."""
+        raise NotImplementedError
+
+    def por_mes(self, mes):
+        """Contratos que vencen en el mes (1-12) de cualquier año, ordenados por fecha."""
+        raise NotImplementedError
+
+    def filtrar_igual(self, columna, valor):
+        """Contratos cuya columna es igual al valor, sin distinguir mayúsculas."""
+        raise NotImplementedError
+
+    def valores_distintos(self, columna):
+        raise NotImplementedError
+
+    def consultar(self, filtros=None, desde=None, hasta=None, orden=None, descendente=False, pagina=1, tam_pagina=50):
+        """Página de una consulta filtrada y ordenada (ver `chatbot.consultas.consultar`)."""
+        raise NotImplementedError
+
+    def resultado(self, filtros=None, desde=None, hasta=None, orden=None, descendente=False):
+        """Resultado completo de la misma consulta, p. ej. para exportarlo."""
+        raise NotImplementedError
+
+
+class RepositorioPandas(RepositorioContratos):
+    """Repositorio sobre un DataFrame normalizado y sus índices en memoria."""
+
+    def __init__(self, df, version=None, cambios=None):
+        self.df = df
+        self._version = version
+        self._cambios = cambios
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def cambios(self):
+        return self._cambios
+
+    def buscar_fila(self, valor):
+        pos = obtener_indice(self.df).buscar(valor)
+        return None if pos is None else self.df.iloc[pos].to_dict()
+
+    def resolver(self, claves):
+        indice = obtener_indice(self.df)
+        claves = pd.Series(list(claves), dtype=object).fillna('').astype(str).str.strip().str.lower()
+        # Un cruce por cada diccionario del índice; gana la primera fila
+        posiciones = pd.concat([
+            claves.map(normalizar_texto).map(indice.por_nombre),
+            claves.map(indice.por_dni),
+            claves.map(indice.por_email),
+        ], axis=1).min(axis=1)
+        encontradas = posiciones.notna().to_numpy()
+        filas = self.df.iloc[posiciones[encontradas].astype(np.int64)]
+        filas.index = np.flatnonzero(encontradas)
+        return filas.reindex(range(len(claves)))
+
+    def sugerir_nombres(self, nombre, n=1, minimo=0.7):
+        return obtener_indice(self.df).difuso.sugerir(normalizar_texto(nombre), n=n, minimo=minimo)
+
+    def nombres_que_contienen(self, fragmento):
+        return obtener_indice(self.df).difuso.contienen(normalizar_texto(fragmento))
+
+    def por_rango(self, desde=None, hasta=None):
+        return self.df.iloc[obtener_indice(self.df).fechas.rango(desde, hasta)]
+
+    def por_mes(self, mes):
+        return self.df.iloc[obtener_indice(self.df).fechas.mes(mes)]
+
+    def filtrar_igual(self, columna, valor):
+        grupos = obtener_indice(self.df).por_valor(columna)
+        valor = str(valor).lower()
+        partes = [pos for clave, pos in grupos.items() if str(clave).lower() == valor]
+        return self.df.iloc[np.sort(np.concatenate(partes))] if partes else self.df.iloc[:0]
+
+    def valores_distintos(self, columna):
+        return valores_distintos(self.df, columna)
+
+    def consultar(self, filtros=None, desde=None, hasta=None, orden=None, descendente=False, pagina=1, tam_pagina=50):
+        resultado = consultar(self.df, filtros, desde, hasta, orden, descendente, pagina, tam_pagina)
+        del resultado['posiciones']
+        return resultado
+
+    def resultado(self, filtros=None, desde=None, hasta=None, orden=None, descendente=False):
+        return self.df.iloc[filtrar(self.df, filtros, desde, hasta, orden, descendente)]
+
+
+# --- Backend SQLite ---
+
+# Columna del DataFrame -> columna de la tabla
+_COLUMNAS_SQL = {
+    'DNI / C.E.': 'dni',
+    'Apellidos y nombres': 'nombre',
+    'Régimen Laboral': 'regimen',
+    'Tipo de Contrato': 'tipo',
+    'Act': 'act',
+    'Usuario': 'usuario',
+    'Nº Celular': 'celular',
+    'Fch. VENCIMIENTO': 'vencimiento',
+    'Email': 'email',
+}
+
+_SELECT = 'SELECT ' + ', '.join(f'{sql} AS "{col}"' for col, sql in _COLUMNAS_SQL.items()) + ' FROM contratos'
+
+_ESQUEMA = '''
+CREATE TABLE contratos (
+    fila INTEGER PRIMARY KEY,
+    dni TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    regimen TEXT NOT NULL COLLATE NOCASE,
+    tipo TEXT NOT NULL COLLATE NOCASE,
+    act TEXT NOT NULL COLLATE NOCASE,
+    usuario TEXT NOT NULL COLLATE NOCASE,
+    celular TEXT NOT NULL,
+    vencimiento TEXT,
+    email TEXT NOT NULL,
+    nombre_norm TEXT NOT NULL,
+    dni_lower TEXT NOT NULL,
+    email_lower TEXT NOT NULL
+);
+CREATE INDEX ix_contratos_dni ON contratos (dni_lower);
+CREATE INDEX ix_contratos_nombre ON contratos (nombre_norm);
+CREATE INDEX ix_contratos_email ON contratos (email_lower);
+CREATE INDEX ix_contratos_usuario ON contratos (usuario);
+CREATE INDEX ix_contratos_regimen ON contratos (regimen);
+CREATE INDEX ix_contratos_tipo ON contratos (tipo);
+CREATE INDEX ix_contratos_act ON contratos (act);
+CREATE INDEX ix_contratos_vencimiento ON contratos (vencimiento);
+CREATE TABLE meta (clave TEXT PRIMARY KEY, valor TEXT);
+'''
+
+
+def _version_fuente(ruta_fuente):
+    try:
+        info = os.stat(ruta_fuente)
+    except FileNotFoundError:
+        return 'vacio'
+    return f'{info.st_mtime_ns:x}-{info.st_size:x}'
+
+
+def version_sqlite(ruta_db=RUTA_SQLITE):
+    """Versión del archivo de origen importado en la base, o None si no existe."""
+    if not os.path.exists(ruta_db):
+        return None
+    ruta = os.path.abspath(ruta_db).replace('\\', '/')
+    conexion = sqlite3.connect(f'file:{ruta}?mode=ro', uri=True)
+    try:
+        fila = conexion.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conexion.close()
+    return fila[0] if fila else None
+
+
+def sqlite_vigente(ruta_fuente=RUTA_CONTRATOS, ruta_db=RUTA_SQLITE, version=None):
+    """
+    True si la base tiene importado el archivo de origen tal como está ahora
+    (o si el origen no existe, en cuyo caso no hay con qué sincronizar).
+    `version` evita volver a leerla de la base si ya se conoce.
+    """
+    fuente = _version_fuente(ruta_fuente)
+    return fuente == 'vacio' or fuente == (version if version is not None else version_sqlite(ruta_db))
+
+
+@contextmanager
+def _bloqueo_sqlite(ruta_db):
+    """Bloqueo entre procesos (flock sobre '<base>.lock') mientras se importa la base."""
+    directorio = os.path.dirname(ruta_db)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(f'{ruta_db}.lock', 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def sincronizar_sqlite(ruta_fuente=RUTA_CONTRATOS, ruta_db=RUTA_SQLITE):
+    """
+    Importa el CSV/XLSX de contratos a una base SQLite con índices por DNI,
+    nombre normalizado, email, usuario, régimen, tipo, Act y vencimiento.
+    La base se arma en un archivo temporal y reemplaza a la anterior de una
+    vez, así los lectores nunca ven una importación a medias. Retorna la
+    cantidad de filas importadas.
+    """
+    with _bloqueo_sqlite(ruta_db):
+        return _importar_sqlite(ruta_fuente, ruta_db)
+
+
+def actualizar_sqlite(ruta_fuente=RUTA_CONTRATOS, ruta_db=RUTA_SQLITE):
+    """
+    Sincroniza la base solo si no existe o quedó desactualizada. Los
+    procesos que lo notan a la vez importan de a uno: los demás esperan el
+    bloqueo y encuentran la base ya al día. Retorna True si la importó.
+    """
+    with _bloqueo_sqlite(ruta_db):
+        if os.path.exists(ruta_db) and sqlite_vigente(ruta_fuente, ruta_db):
+            return False
+        _importar_sqlite(ruta_fuente, ruta_db)
+        return True
+
+
+@metricas.medir('carga_datos', etapa='sqlite')
+def _importar_sqlite(ruta_fuente, ruta_db):
+    version = _version_fuente(ruta_fuente)
+    df = cargar_datos_contratos(ruta_fuente)
+    temporal = f'{ruta_db}.{os.getpid()}.tmp'
+    if os.path.exists(temporal):
+        os.remove(temporal)
+    conexion = sqlite3.connect(temporal)
+    try:
+        conexion.executescript(_ESQUEMA)
+        texto = {col: df[col].astype(str).tolist() for col in COLUMNAS_CONTRATOS if col != 'Fch. VENCIMIENTO'}
+        vencimientos = [None if pd.isna(f) else f.strftime('%Y-%m-%d') for f in df['Fch. VENCIMIENTO']]
+        filas = (
+            (fila, dni, nombre, regimen, tipo, act, usuario, celular, venc, email,
+             normalizar_texto(nombre), dni.strip().lower(), email.strip().lower())
+            for fila, (dni, nombre, regimen, tipo, act, usuario, celular, email, venc) in enumerate(zip(
+                texto['DNI / C.E.'], texto['Apellidos y nombres'], texto['Régimen Laboral'],
+                texto['Tipo de Contrato'], texto['Act'], texto['Usuario'], texto['Nº Celular'],
+                texto['Email'], vencimientos))
+        )
+        conexion.executemany('INSERT INTO contratos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', filas)
+        conexion.executemany('INSERT INTO meta VALUES (?, ?)', [
+            ('version', version), ('fuente', os.path.abspath(ruta_fuente))])
+        conexion.commit()
+        conexion.execute('ANALYZE')
+    finally:
+        conexion.close()
+    os.replace(temporal, ruta_db)
+    return len(df)
+
+
+class RepositorioSQLite(RepositorioContratos):
+    """
+    Repositorio sobre la base SQLite creada por `sincronizar_sqlite`. Cada
+    proceso mantiene un pool de conexiones de solo lectura; solo trae las
+    filas que pide cada consulta, y en memoria guarda únicamente los nombres
+    para las sugerencias aproximadas. Si la base se vuelve a sincronizar, el
+    pool se renueva en la siguiente consulta. Con `sincronizar=True` importa
+    el archivo de origen cuando la base no existe o quedó desactualizada.
+    """
+
+    def __init__(self, ruta_db=RUTA_SQLITE, ruta_fuente=RUTA_CONTRATOS, sincronizar=True, max_conexiones=8):
+        self.ruta_db = ruta_db
+        self.ruta_fuente = ruta_fuente
+        self.sincronizar = sincronizar
+        self._pool = queue.LifoQueue(maxsize=max_conexiones)
+        self._lock = threading.Lock()
+        self._firma = None
+        self._version = None
+        self._difuso = None
+        self._distintos = {}
+
+    # --- Conexiones ---
+
+    def _firma_db(self):
+        try:
+            info = os.stat(self.ruta_db)
+        except FileNotFoundError:
+            return None
+        return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+    def _verificar(self):
+        """Sincroniza si hace falta y renueva el pool si la base cambió."""
+        if self.sincronizar and self._firma is not None and not sqlite_vigente(self.ruta_fuente, version=self._version):
+            with self._lock:
+                actualizar_sqlite(self.ruta_fuente, self.ruta_db)
+        if self._firma is None or self._firma_db() != self._firma:
+            with self._lock:
+                self._renovar()
+
+    def _renovar(self):
+        """
+        Abre la base (creándola si falta) y renueva el pool. Al abrirla se
+        compara su versión con el archivo de origen, así que también la
+        primera consulta del proceso responde con datos al día. Se llama con
+        `_lock` tomado.
+        """
+        firma = self._firma_db()
+        if firma is None:
+            if not self.sincronizar:
+                raise FileNotFoundError(f'No existe {self.ruta_db}; créala con: python -m chatbot.cli sqlite')
+            actualizar_sqlite(self.ruta_fuente, self.ruta_db)
+            firma = self._firma_db()
+        if self._firma is not None and firma == self._firma:
+            return
+        version = version_sqlite(self.ruta_db)
+        if self.sincronizar and not sqlite_vigente(self.ruta_fuente, version=version):
+            actualizar_sqlite(self.ruta_fuente, self.ruta_db)
+            firma, version = self._firma_db(), version_sqlite(self.ruta_db)
+        self._vaciar_pool()
+        self._version = version
+        self._difuso = None
+        self._distintos = {}
+        self._firma = firma
+
+    def _abrir(self):
+        ruta = os.path.abspath(self.ruta_db).replace('\\', '/')
+        return sqlite3.connect(f'file:{ruta}?mode=ro', uri=True, check_same_thread=False)
+
+    def _vaciar_pool(self):
+        while True:
+            try:
+                self._pool.get_nowait()[1].close()
+            except queue.Empty:
+                return
+
+    @contextmanager
+    def _conexion(self):
+        self._verificar()
+        firma = self._firma
+        try:
+            firma_conexion, conexion = self._pool.get_nowait()
+            if firma_conexion != firma:
+                conexion.close()
+                conexion = self._abrir()
+        except queue.Empty:
+            conexion = self._abrir()
+        try:
+            yield conexion
+        finally:
+            try:
+                self._pool.put_nowait((firma, conexion))
+            except queue.Full:
+                conexion.close()
+
+    def _df(self, sql, parametros=()):
+        with self._conexion() as conexion:
+            filas = conexion.execute(sql, parametros).fetchall()
+        return self._a_dataframe(filas)
+
+    @staticmethod
+    def _a_dataframe(filas):
+        df = pd.DataFrame.from_records(filas, columns=COLUMNAS_CONTRATOS)
+        df['Fch. VENCIMIENTO'] = pd.to_datetime(df['Fch. VENCIMIENTO'], errors='coerce')
+        for col in COLUMNAS_CATEGORICAS:
+            df[col] = df[col].astype('category')
+        return df
+
+    # --- Consultas ---
+
+    @property
+    def version(self):
+        self._verificar()
+        return self._version
+
+    def buscar_fila(self, valor):
+        clave = str(valor).strip().lower()
+        df = self._df(f'{_SELECT} WHERE nombre_norm = ? OR dni_lower = ? OR email_lower = ? ORDER BY fila LIMIT 1',
+                      (normalizar_texto(clave), clave, clave))
+        return None if df.empty else df.iloc[0].to_dict()
+
+    def resolver(self, claves):
+        claves = [str(c).strip().lower() if c is not None else '' for c in claves]
+        columnas = ', '.join(f'c.{sql}' for sql in _COLUMNAS_SQL.values())
+        with self._conexion() as conexion:
+            # Las claves van a una tabla temporal de la conexión y se cruzan en
+            # una sola consulta con los índices por nombre, DNI y email
+            conexion.execute('CREATE TEMP TABLE IF NOT EXISTS lote (orden INTEGER PRIMARY KEY, clave TEXT, clave_norm TEXT)')
+            conexion.execute('DELETE FROM lote')
+            try:
+                conexion.executemany('INSERT INTO lote VALUES (?, ?, ?)',
+                                     ((i, c, normalizar_texto(c)) for i, c in enumerate(claves)))
+                filas = conexion.execute(f'''
+                    SELECT {columnas} FROM lote l LEFT JOIN contratos c ON c.fila = (
+                        SELECT min(fila) FROM (
+                            SELECT fila FROM contratos WHERE nombre_norm = l.clave_norm
+                            UNION ALL SELECT fila FROM contratos WHERE dni_lower = l.clave
+                            UNION ALL SELECT fila FROM contratos WHERE email_lower = l.clave))
+                    ORDER BY l.orden''').fetchall()
+            finally:
+                conexion.execute('DELETE FROM lote')
+                conexion.commit()
+        return self._a_dataframe(filas)
+
+    def _indice_difuso(self):
+        self._verificar()
+        difuso = self._difuso
+        if difuso is None:
+            with self._conexion() as conexion:
+                filas = conexion.execute('SELECT nombre, nombre_norm FROM contratos ORDER BY fila').fetchall()
+            difuso = IndiceDifuso([f[0] for f in filas], [f[1] for f in filas])
+            self._difuso = difuso
+        return difuso
+
+    def sugerir_nombres(self, nombre, n=1, minimo=0.7):
+        return self._indice_difuso().sugerir(normalizar_texto(nombre), n=n, minimo=minimo)
+
+    def nombres_que_contienen(self, fragmento):
+        fragmento = normalizar_texto(fragmento)
+        if not fragmento:
+            return []
+        patron = '%' + fragmento.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        with self._conexion() as conexion:
+            filas = conexion.execute("SELECT nombre FROM contratos WHERE nombre_norm LIKE ? ESCAPE '\\' ORDER BY fila",
+                                     (patron,)).fetchall()
+        return [f[0] for f in filas]
+
+    @staticmethod
+    def _dia(fecha):
+        return None if fecha is None else pd.Timestamp(fecha).strftime('%Y-%m-%d')
+
+    def _condiciones(self, filtros=None, desde=None, hasta=None):
+        condiciones, parametros = [], []
+        for columna, valores in (filtros or {}).items():
+            if columna not in _COLUMNAS_SQL or columna == 'Fch. VENCIMIENTO':
+                raise ValueError(f'No se puede filtrar por la columna {columna!r}')
+            if not isinstance(valores, (list, tuple, set)):
+                valores = [valores]
+            if not valores:
+                continue
+            condiciones.append(f"{_COLUMNAS_SQL[columna]} IN ({', '.join('?' * len(valores))})")
+            parametros.extend(str(v) for v in valores)
+        if desde is not None:
+            condiciones.append('vencimiento >= ?')
+            parametros.append(self._dia(desde))
+        if hasta is not None:
+            condiciones.append('vencimiento <= ?')
+            parametros.append(self._dia(hasta))
+        donde = (' WHERE ' + ' AND '.join(condiciones)) if condiciones else ''
+        return donde, parametros
+
+    def por_rango(self, desde=None, hasta=None):
+        donde, parametros = self._condiciones(desde=desde, hasta=hasta)
+        donde += (' AND ' if donde else ' WHERE ') + 'vencimiento IS NOT NULL'
+        return self._df(f'{_SELECT}{donde} ORDER BY vencimiento, fila', parametros)
+
+    def por_mes(self, mes):
+        with self._conexion() as conexion:
+            minimo, maximo = conexion.execute(
+                'SELECT min(vencimiento), max(vencimiento) FROM contratos WHERE vencimiento IS NOT NULL').fetchone()
+        if minimo is None:
+            return self._df(f'{_SELECT} WHERE 0')
+        rangos, parametros = [], []
+        for anio in range(int(minimo[:4]), int(maximo[:4]) + 1):
+            rangos.append('vencimiento BETWEEN ? AND ?')
+            parametros.extend([f'{anio:04d}-{mes:02d}-01', f'{anio:04d}-{mes:02d}-31'])
+        return self._df(f"{_SELECT} WHERE {' OR '.join(rangos)} ORDER BY vencimiento, fila", parametros)
+
+    def filtrar_igual(self, columna, valor):
+        # Las columnas de filtro se declaran COLLATE NOCASE, igual que sus índices
+        donde, parametros = self._condiciones({columna: valor})
+        return self._df(f'{_SELECT}{donde} ORDER BY fila', parametros)
+
+    def valores_distintos(self, columna):
+        # Se guardan por versión de la base: las opciones de los filtros se
+        # piden en cada rerun de la app
+        self._verificar()
+        distintos = self._distintos
+        if columna not in distintos:
+            sql = _COLUMNAS_SQL[columna]
+            with self._conexion() as conexion:
+                filas = conexion.execute(f"SELECT DISTINCT {sql} FROM contratos WHERE {sql} != '' ORDER BY {sql}").fetchall()
+            distintos[columna] = [f[0] for f in filas]
+        return list(distintos[columna])
+
+    def _orden(self, orden, descendente):
+        if orden is None:
+            return ' ORDER BY fila'
+        sql = _COLUMNAS_SQL[orden]
+        sentido = 'DESC' if descendente else 'ASC'
+        return f' ORDER BY {sql} IS NULL, {sql} {sentido}, fila'
+
+    def consultar(self, filtros=None, desde=None, hasta=None, orden=None, descendente=False, pagina=1, tam_pagina=50):
+        donde, parametros = self._condiciones(filtros, desde, hasta)
+        with self._conexion() as conexion:
+            total = conexion.execute(f'SELECT count(*) FROM contratos{donde}', parametros).fetchone()[0]
+        paginas = max(1, -(-total // tam_pagina))
+        pagina = min(max(1, int(pagina)), paginas)
+        inicio = (pagina - 1) * tam_pagina
+        filas = self._df(f'{_SELECT}{donde}{self._orden(orden, descendente)} LIMIT ? OFFSET ?',
+                         [*parametros, tam_pagina, inicio])
+        return {
+            'filas': filas,
+            'total': total,
+            'pagina': pagina,
+            'paginas': paginas,
+            'desde_fila': inicio + 1 if total else 0,
+            'hasta_fila': inicio + len(filas),
+        }
+
+    def resultado(self, filtros=None, desde=None, hasta=None, orden=None, descendente=False):
+        donde, parametros = self._condiciones(filtros, desde, hasta)
+        return self._df(f'{_SELECT}{donde}{self._orden(orden, descendente)}', parametros)
+
+
+_repositorios_sqlite = {}
+_repositorios_lock = threading.Lock()
+
+
+def como_repositorio(fuente):
+    """Acepta un repositorio o un DataFrame de contratos y retorna un repositorio."""
+    if isinstance(fuente, RepositorioContratos):
+        return fuente
+    return RepositorioPandas(fuente)
+
+
+def obtener_repositorio(backend=None, ruta=RUTA_CONTRATOS, ruta_db=RUTA_SQLITE):
+    """
+    Repositorio del proceso según `backend` ('pandas' o 'sqlite'; por defecto
+    la variable de entorno SIACON_BACKEND). El de pandas se arma sobre la
+    instantánea vigente del almacén compartido; el de SQLite es único por base.
+    """
+    backend = backend or BACKEND
+    if backend == 'sqlite':
+        clave = os.path.abspath(ruta_db)
+        with _repositorios_lock:
+            repositorio = _repositorios_sqlite.get(clave)
+            if repositorio is None:
+                repositorio = _repositorios_sqlite[clave] = RepositorioSQLite(ruta_db, ruta)
+            return repositorio
+    if backend != 'pandas':
+        raise ValueError(f'Backend desconocido: {backend!r}')
+    from .almacen import obtener_almacen
+    return obtener_almacen(ruta).obtener().repositorio
@@ -0,0 +1,334 @@
+"""
+Servicio de consultas de contratos: un proceso que atiende `responder`, las
+búsquedas de `chatbot.datos` y las consultas del repositorio por HTTP local
+(TCP o socket UNIX), repartiendo el trabajo en un pool de procesos. Cada
+worker carga los contratos una sola vez, desde el snapshot columnar (sin
+volver a parsear el CSV, aunque cada uno arma su propio DataFrame en memoria)
+o desde la base SQLite, y los mantiene al día como cualquier proceso (ver
+`chatbot.almacen`). Los tiempos y contadores que registra cada worker
+vuelven con cada respuesta y se suman a las métricas del proceso principal. La app de Streamlit lo usa con `chatbot.cliente` cuando
+SIACON_SERVICIO está definida, y así no carga los datos en su proceso.
+
+Uso (desde ChatBot-SiamControl/):
+    python -m chatbot.cli servicio [--puerto 8765] [--workers 4] [--backend sqlite]
+    python -m chatbot.cli servicio --socket /tmp/siacon.sock
+
+API (JSON, UTF-8):
+    POST /api/<operacion>  {"args": [...], "kwargs": {...}} -> {"resultado": ...}
+    GET  /salud            estado, workers, backend y versión de los datos
+    GET  /metrics          métricas del servicio y sus workers (formato Prometheus)
+"""
+import inspect
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import stat
+from datetime import date
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from .datos import RUTA_CONTRATOS
+from .metricas import metricas
+
+PUERTO = 8765
+
+# Segundos que se espera a un worker antes de responder 504
+TIEMPO_MAXIMO = 60
+
+# Métodos de chatbot.repositorio.RepositorioContratos
+OPERACIONES_REPOSITORIO = (
+    'buscar_fila', 'sugerir_nombres', 'nombres_que_contienen', 'resolver', 'por_rango', 'por_mes',
+    'filtrar_igual', 'valores_distintos', 'consultar', 'resultado',
+)
+# Búsquedas de chatbot.datos; reciben el repositorio del worker como fuente
+OPERACIONES_DATOS = (
+    'buscar_vencimiento_por_nombre', 'listar_contratos_por_mes', 'estado_correo_bienvenida', 'buscar_celular',
+    'buscar_email', 'contratos_por_rango', 'contratos_proximos_dias', 'contratos_por_valor',
+)
+OPERACIONES = frozenset(('responder', 'version', *OPERACIONES_REPOSITORIO, *OPERACIONES_DATOS))
+
+
+# --- Codificación JSON ---
+
+def codificar(valor):
+    """
+    `default` de json.dumps para lo que retornan las consultas: DataFrames
+    (con sus columnas de fecha y categóricas), fechas y escalares de numpy.
+    """
+    if isinstance(valor, pd.DataFrame):
+        fechas = [c for c in valor.columns if pd.api.types.is_datetime64_any_dtype(valor[c])]
+        datos = valor.astype(object).where(valor.notna(), None)
+        for col in fechas:
+            datos[col] = valor[col].dt.strftime('%Y-%m-%dT%H:%M:%S').astype(object).where(valor[col].notna(), None)
+        return {'__tabla__': {
+            'columnas': list(valor.columns),
+            'fechas': fechas,
+            'categorias': {c: valor[c].cat.categories.tolist() for c in valor.columns
+                           if isinstance(valor[c].dtype, pd.CategoricalDtype)},
+            'indice': valor.index.tolist(),
+            'filas': datos.to_numpy().tolist(),
+        }}
+    if valor is pd.NaT:
+        return None
+    if isinstance(valor, date):
+        return {'__fecha__': pd.Timestamp(valor).isoformat()}
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    raise TypeError(f'No se puede enviar un {type(valor).__name__} por el servicio')
+
+
+def decodificar(objeto):
+    """`object_hook` de json.loads, inverso de `codificar`."""
+    if '__fecha__' in objeto:
+        return pd.Timestamp(objeto['__fecha__'])
+    tabla = objeto.get('__tabla__')
+    if tabla is None:
+        return objeto
+    df = pd.DataFrame(tabla['filas'], columns=tabla['columnas'], index=tabla['indice'])
+    for col in tabla['fechas']:
+        df[col] = pd.to_datetime(df[col])
+    for col, categorias in tabla['categorias'].items():
+        df[col] = pd.Categorical(df[col], categories=categorias)
+    return df
+
+
+def _error(mensaje):
+    return json.dumps({'error': str(mensaje)}, ensure_ascii=False).encode('utf-8')
+
+
+# --- Workers ---
+
+def _iniciar_worker(backend):
+    """Inicializador de cada worker: carga los contratos, sus índices y los intents una vez."""
+    from . import repositorio
+    metricas.acumular_pendientes()
+    from . import bot  # noqa: F401  (registra los intents)
+    # `responder` usa el repositorio por defecto del proceso
+    repositorio.BACKEND = backend
+    repositorio.obtener_repositorio()
+
+
+def _leer_pedido(cuerpo):
+    """(args, kwargs) del cuerpo JSON; ValueError si no tiene la forma esperada."""
+    try:
+        pedido = json.loads(cuerpo or b'{}', object_hook=decodificar)
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        # JSON inválido o un __tabla__/__fecha__ mal armado
+        raise ValueError(f'Pedido inválido: {type(e).__name__}: {e}') from e
+    if not isinstance(pedido, dict):
+        raise ValueError('El pedido debe ser un objeto JSON con "args" y "kwargs"')
+    args, kwargs = pedido.get('args', []), pedido.get('kwargs', {})
+    if not isinstance(args, list) or not isinstance(kwargs, dict):
+        raise ValueError('"args" debe ser una lista y "kwargs" un objeto')
+    return args, kwargs
+
+
+def _funcion(operacion):
+    """Función del worker que atiende la operación."""
+    from . import datos
+    from .bot import responder
+    from .repositorio import obtener_repositorio
+    if operacion == 'responder':
+        return responder
+    repo = obtener_repositorio()
+    if operacion == 'version':
+        return lambda: repo.version
+    if operacion in OPERACIONES_DATOS:
+        return partial(getattr(datos, operacion), repo)
+    return getattr(repo, operacion)
+
+
+def _ejecutar(operacion, cuerpo):
+    """
+    Corre una operación en el worker. Recibe y retorna JSON (bytes), de modo
+    que entre procesos solo viajan bytes y no DataFrames serializados.
+    Retorna (estado HTTP, cuerpo): 400 solo si el pedido no se puede leer o
+    sus argumentos no corresponden a la operación; cualquier error al
+    ejecutarla es 500.
+    """
+    try:
+        args, kwargs = _leer_pedido(cuerpo)
+    except ValueError as e:
+        return 400, _error(e)
+    try:
+        funcion = _funcion(operacion)
+        try:
+            inspect.signature(funcion).bind(*args, **kwargs)
+        except TypeError as e:
+            return 400, _error(f'Argumentos inválidos para {operacion}: {e}')
+        resultado = funcion(*args, **kwargs)
+        return 200, json.dumps({'resultado': resultado}, default=codificar, ensure_ascii=False).encode('utf-8')
+    except Exception as e:  # el worker sigue atendiendo las demás consultas
+        return 500, _error(f'{type(e).__name__}: {e}')
+
+
+def _atender(operacion, cuerpo):
+    """`_ejecutar` más las métricas que registró el worker desde la consulta anterior."""
+    estado, respuesta = _ejecutar(operacion, cuerpo)
+    return estado, respuesta, metricas.extraer_pendientes()
+
+
+def preparar_datos(backend):
+    """
+    Deja al día, antes de crear los workers, lo que estos comparten: la base
+    SQLite o el snapshot columnar del archivo de contratos (si hay pyarrow),
+    para que no lo reconstruyan todos a la vez al arrancar.
+    """
+    if backend == 'sqlite':
+        from .repositorio import RUTA_SQLITE, actualizar_sqlite
+        actualizar_sqlite(RUTA_CONTRATOS, RUTA_SQLITE)
+        return
+    from .snapshot import construir_snapshot, snapshot_vigente
+    if os.path.exists(RUTA_CONTRATOS) and not snapshot_vigente(RUTA_CONTRATOS):
+        try:
+            construir_snapshot(RUTA_CONTRATOS)
+        except (RuntimeError, OSError):  # sin pyarrow cada worker lee el CSV/XLSX
+            pass
+
+
+class ServicioContratos:
+    """
+    Pool de `workers` procesos con los contratos cargados y el reparto de
+    operaciones entre ellos. Los workers se crean con 'spawn' (no heredan
+    hilos ni conexiones del proceso principal, y funciona igual en Windows).
+    """
+
+    def __init__(self, workers=None, backend=None, tiempo_maximo=TIEMPO_MAXIMO):
+        from .repositorio import BACKEND
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend or BACKEND
+        self.tiempo_maximo = tiempo_maximo
+        self._pool = None
+
+    def iniciar(self):
+        preparar_datos(self.backend)
+        contexto = multiprocessing.get_context('spawn')
+        self._pool = contexto.Pool(self.workers, initializer=_iniciar_worker, initargs=(self.backend,))
+        return self
+
+    def llamar(self, operacion, cuerpo=b''):
+        """Corre `operacion` en algún worker; retorna (estado HTTP, cuerpo JSON)."""
+        if operacion not in OPERACIONES:
+            return 404, _error(f'Operación desconocida: {operacion}')
+        with metricas.tramo('servicio', operacion=operacion):
+            try:
+                estado, respuesta, pendientes = self._pool.apply_async(_atender, (operacion, cuerpo)).get(self.tiempo_maximo)
+                metricas.incorporar(pendientes)
+            except multiprocessing.TimeoutError:
+                estado, respuesta = 504, _error(f'La operación {operacion} superó {self.tiempo_maximo} s')
+            except Exception as e:  # p. ej. un resultado que no se pudo pasar entre procesos
+                estado, respuesta = 500, _error(f'{type(e).__name__}: {e}')
+        if estado != 200:
+            metricas.contar('servicio_errores', operacion=operacion, estado=estado)
+        return estado, respuesta
+
+    def cerrar(self):
+        """Termina los workers dejando que vacíen el historial pendiente."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def crear_servidor(self, puerto=PUERTO, host='127.0.0.1', socket=None):
+        """
+        Servidor HTTP (un hilo por conexión, con keep-alive) en host:puerto o,
+        si se indica `socket`, en ese socket UNIX (reemplaza solo el socket
+        que haya dejado un servicio anterior). Se atiende con `serve_forever()`.
+        """
+        if socket:
+            _liberar_socket(socket)
+            servidor = _ServidorUnix(socket, _Manejador)
+        else:
+            servidor = ThreadingHTTPServer((host, int(puerto)), _Manejador)
+        servidor.servicio = self
+        return servidor
+
+
+def _liberar_socket(ruta):
+    """
+    Borra el socket UNIX que dejó un servicio anterior en `ruta`. Si ahí hay
+    otra cosa (p. ej. un archivo de datos por una ruta mal escrita) o un
+    servicio que todavía atiende, levanta OSError sin tocarlo.
+    """
+    try:
+        modo = os.lstat(ruta).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(modo):
+        raise FileExistsError(f'{ruta} existe y no es un socket; no se reemplaza')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as prueba:
+        try:
+            prueba.connect(ruta)
+        except (ConnectionRefusedError, FileNotFoundError):
+            pass
+        else:
+            raise OSError(f'Ya hay un servicio atendiendo en {ruta}')
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    # HTTP/1.1: el cliente reutiliza la conexión entre consultas
+    protocol_version = 'HTTP/1.1'
+    # Encabezados y cuerpo salen juntos al final de cada respuesta; escritos
+    # por separado, Nagle y el ACK retardado de TCP suman ~40 ms por consulta
+    wbufsize = -1
+
+    def do_POST(self):
+        ruta = self.path.split('?')[0]
+        cuerpo = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if not ruta.startswith('/api/'):
+            self._enviar(404, _error(f'Ruta desconocida: {ruta}'))
+            return
+        self._enviar(*self.server.servicio.llamar(ruta[len('/api/'):], cuerpo))
+
+    def do_GET(self):
+        ruta = self.path.split('?')[0]
+        servicio = self.server.servicio
+        if ruta == '/metrics':
+            self._enviar(200, metricas.texto_prometheus().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+        elif ruta == '/salud':
+            estado, respuesta = servicio.llamar('version')
+            salud = {'estado': 'ok' if estado == 200 else 'error', 'workers': servicio.workers,
+                     'backend': servicio.backend, 'version': json.loads(respuesta).get('resultado')}
+            self._enviar(estado, json.dumps(salud).encode('utf-8'))
+        else:
+            self._enviar(404, _error(f'Ruta desconocida: {ruta}'))
+
+    def _enviar(self, estado, cuerpo, tipo='application/json; charset=utf-8'):
+        self.send_response(estado)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
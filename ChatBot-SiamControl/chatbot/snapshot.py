@@ -0,0 +1,104 @@
+import os
+
+from .datos import cargar_datos_contratos
+
+# Claves de metadatos con la firma del archivo de origen
+_META_MTIME = b'siacon.fuente_mtime_ns'
+_META_TAM = b'siacon.fuente_tam'
+
+
+def _arrow():
+    """pyarrow y pyarrow.feather, o (None, None) si no está instalado."""
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:  # sin pyarrow se lee siempre el CSV/XLSX
+        return None, None
+    return pa, feather
+
+
+def ruta_snapshot(ruta_fuente):
+    """Ruta del snapshot columnar (Feather/Arrow) junto al archivo de origen."""
+    return ruta_fuente + '.feather'
+
+
+def _firma_fuente(ruta_fuente):
+    info = os.stat(ruta_fuente)
+    return str(info.st_mtime_ns).encode(), str(info.st_size).encode()
+
+
+def snapshot_vigente(ruta_fuente, ruta=None):
+    """
+    True si existe un snapshot construido a partir del archivo de origen tal
+    como está ahora (misma fecha de modificación y tamaño).
+    """
+    pa, feather = _arrow()
+    ruta = ruta or ruta_snapshot(ruta_fuente)
+    if feather is None or not os.path.exists(ruta) or not os.path.exists(ruta_fuente):
+        return False
+    try:
+        metadatos = feather.read_table(ruta, memory_map=True).schema.metadata or {}
+    except (OSError, pa.ArrowException):
+        return False
+    mtime, tam = _firma_fuente(ruta_fuente)
+    return metadatos.get(_META_MTIME) == mtime and metadatos.get(_META_TAM) == tam
+
+
+def construir_snapshot(ruta_fuente, ruta=None, df=None, firma=None):
+    """
+    Convierte el CSV/XLSX de contratos en un snapshot Feather sin compresión
+    (para poder mapearlo en memoria), con columnas categóricas y fechas ya
+    convertidas. Si se pasa `df` ya cargado, `firma` debe ser la del origen
+    tomada antes de leerlo. Retorna la ruta escrita.
+    """
+    pa, feather = _arrow()
+    if feather is None:
+        raise RuntimeError('Se necesita pyarrow para construir el snapshot de contratos.')
+    ruta = ruta or ruta_snapshot(ruta_fuente)
+    mtime, tam = firma or _firma_fuente(ruta_fuente)
+    if df is None:
+        df = cargar_datos_contratos(ruta_fuente)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    metadatos = dict(tabla.schema.metadata or {})
+    metadatos.update({_META_MTIME: mtime, _META_TAM: tam})
+    tabla = tabla.replace_schema_metadata(metadatos)
+    # Se escribe a un temporal y se reemplaza, para que un lector nunca vea
+    # un snapshot a medio escribir
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    feather.write_feather(tabla, temporal, compression='uncompressed')
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def leer_snapshot(ruta):
+    """
+    Lee el snapshot mapeándolo en memoria. Ya viene normalizado (tipos,
+    categorías y fechas), así que no se vuelve a procesar.
+    """
+    _, feather = _arrow()
+    tabla = feather.read_table(ruta, memory_map=True)
+    return tabla.to_pandas()
+
+
+def cargar_contratos(ruta_fuente, usar_snapshot=True):
+    """
+    Carga los contratos desde el snapshot si está al día; si no, lee el
+    CSV/XLSX y reconstruye el snapshot para las próximas cargas. Sin
+    pyarrow, o si no se puede escribir junto al origen, lee el origen.
+    """
+    pa, feather = _arrow()
+    if not usar_snapshot or feather is None or not os.path.exists(ruta_fuente):
+        return cargar_datos_contratos(ruta_fuente)
+    ruta = ruta_snapshot(ruta_fuente)
+    if snapshot_vigente(ruta_fuente, ruta):
+        try:
+            return leer_snapshot(ruta)
+        except (OSError, pa.ArrowException):
+            pass
+    firma = _firma_fuente(ruta_fuente)
+    df = cargar_datos_contratos(ruta_fuente)
+    try:
+        construir_snapshot(ruta_fuente, ruta, df=df, firma=firma)
+    except (OSError, pa.ArrowException):
+        pass
+    return df
@@ -0,0 +1,11 @@
+import unicodedata
+
+
+# --- Función utilitaria para normalizar texto ---
+def normalizar_texto(texto):
+    """
+    Normaliza un texto eliminando tildes, convirtiendo a minúsculas y quitando espacios extra.
+    Esto permite comparar cadenas de texto de forma robusta ante errores comunes de usuario.
+    """
+    texto = ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+    return ' '.join(texto.lower().split())
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.datos import normalizar_contratos  # noqa: E402
+
+
+@pytest.fixture
+def contratos():
+    """Contratos de ejemplo, ya normalizados."""
+    return normalizar_contratos(pd.DataFrame({
+        'DNI / C.E.': ['01234567', '76543210', '11112222'],
+        'Apellidos y nombres': ['Pérez Gómez Juan', 'Quispe Rojas Ana', 'Torres Díaz Luis'],
+        'Régimen Laboral': ['CAS', '276', 'CAS'],
+        'Tipo de Contrato': ['Plazo fijo', 'Indeterminado', 'Plazo fijo'],
+        'Act': ['Activo', 'Inactivo', 'Activo'],
+        'Usuario': ['jperez', 'aquispe', 'ltorres'],
+        'Nº Celular': ['987654321', '912345678', '999888777'],
+        'Fch. VENCIMIENTO': ['2025-07-15', '2030-01-31', '2100-12-31'],
+        'Email': ['jperez@siam.pe', 'aquispe@siam.pe', 'ltorres@siam.pe'],
+    }))
@@ -0,0 +1,22 @@
+from chatbot.cache import CacheRespuestas
+from chatbot.intents import EnrutadorIntents
+
+
+def test_acierto_retorna_el_intent_que_calculo_la_respuesta():
+    cache = CacheRespuestas()
+    assert cache.obtener('email de ana', 1) is None
+    cache.guardar('email de ana', 1, 'ana@siam.pe', set(), 'email')
+    assert cache.obtener('email de ana', 1) == ('ana@siam.pe', 'email')
+
+
+def test_estadisticas_cuentan_aciertos_por_intent():
+    enrutador = EnrutadorIntents(por_defecto=lambda datos, slots: 'no entiendo')
+    enrutador.registrar('email', r'email de (?P<valor>\w+)', lambda datos, slots: slots['valor'])
+    assert enrutador.atender('email de ana', None) == ('email', 'ana')
+    enrutador.contar_acierto('email')
+    enrutador.contar_acierto('email')
+    enrutador.contar_acierto('desconocido')
+    estadisticas = enrutador.estadisticas()
+    assert estadisticas['email']['consultas'] == 1
+    assert estadisticas['email']['aciertos_cache'] == 2
+    assert estadisticas['desconocido'] == {'consultas': 0, 'aciertos_cache': 1, 'tiempo_total': 0.0, 'tiempo_promedio': 0.0}
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chatbot.bot import enrutador
+from chatbot.cache import CacheRespuestas, recolectar_dependencias
+from chatbot.cambios import calcular_cambios
+from chatbot.datos import COLUMNAS_CATEGORICAS, normalizar_contratos
+from chatbot.indices import IndiceContratos
+from chatbot.repositorio import RepositorioPandas
+from chatbot.texto import normalizar_texto
+
+NOMBRES = ['Pérez Gómez Juan', 'Quispe Rojas Ana', 'Torres Díaz Luis', 'Mamani Flores Rosa', 'Huamán Cruz Pedro']
+
+
+def _contratos(n=50):
+    """n contratos con DNIs distintos, nombres repetidos, algunas fechas vacías y pocos valores por categoría."""
+    fechas = pd.date_range('2025-01-15', periods=n, freq='11D').strftime('%Y-%m-%d').tolist()
+    fechas[3] = fechas[17] = ''
+    return normalizar_contratos(pd.DataFrame({
+        'DNI / C.E.': [f'{40000000 + i:08d}' for i in range(n)],
+        'Apellidos y nombres': [f'{NOMBRES[i % len(NOMBRES)]} {i // len(NOMBRES)}' if i % 7 else NOMBRES[0] for i in range(n)],
+        'Régimen Laboral': [('CAS', '276', '728')[i % 3] for i in range(n)],
+        'Tipo de Contrato': [('Plazo fijo', 'Indeterminado')[i % 2] for i in range(n)],
+        'Act': [('Activo', 'Inactivo')[i % 2] for i in range(n)],
+        'Usuario': [f'usuario{i}' for i in range(n)],
+        'Nº Celular': [f'9{i:08d}' for i in range(n)],
+        'Fch. VENCIMIENTO': fechas,
+        'Email': [f'usuario{i}@siam.pe' for i in range(n)],
+    }))
+
+
+def _incremental(viejo, nuevo):
+    """(cambios, índice actualizado) partiendo de un índice de `viejo` con los grupos por valor ya armados."""
+    indice = IndiceContratos(viejo)
+    for columna in COLUMNAS_CATEGORICAS:
+        indice.por_valor(columna)
+    cambios = calcular_cambios(viejo, nuevo)
+    assert cambios is not None
+    return cambios, indice.actualizar(nuevo, cambios)
+
+
+def _comparar_con_reconstruccion(incremental, nuevo):
+    completo = IndiceContratos(nuevo)
+    assert incremental.nombres == completo.nombres
+    assert incremental.nombres_normalizados == completo.nombres_normalizados
+    assert incremental.por_nombre == completo.por_nombre
+    assert incremental.por_dni == completo.por_dni
+    assert incremental.por_email == completo.por_email
+    np.testing.assert_array_equal(incremental.fechas.posiciones, completo.fechas.posiciones)
+    np.testing.assert_array_equal(incremental.fechas.fechas, completo.fechas.fechas)
+    for columna in COLUMNAS_CATEGORICAS:
+        grupos, esperados = incremental.por_valor(columna), completo.por_valor(columna)
+        assert {k: v.tolist() for k, v in grupos.items() if len(v)} == {k: v.tolist() for k, v in esperados.items()}
+    for nombre in set(completo.nombres_normalizados):
+        for consulta in (nombre, nombre[:-1] + 'x', nombre.split()[0]):
+            assert incremental.difuso.sugerir(consulta, n=3) == completo.difuso.sugerir(consulta, n=3)
+            assert incremental.difuso.contienen(consulta) == completo.difuso.contienen(consulta)
+
+
+def test_filas_modificadas():
+    viejo = _contratos()
+    nuevo = viejo.copy()
+    nuevo.loc[5, 'Apellidos y nombres'] = 'Salazar Vega Marta'
+    nuevo.loc[9, 'Fch. VENCIMIENTO'] = pd.Timestamp('2031-03-01')
+    nuevo.loc[3, 'Fch. VENCIMIENTO'] = pd.Timestamp('2026-06-30')
+    nuevo.loc[12, 'Email'] = 'nuevo@siam.pe'
+    nuevo['Usuario'] = nuevo['Usuario'].cat.add_categories(['otro'])
+    nuevo.loc[20, 'Usuario'] = 'otro'
+    cambios, indice = _incremental(viejo, nuevo)
+    assert (len(cambios.altas), len(cambios.bajas), cambios.modificadas) == (0, 0, 5)
+    assert cambios.misma_posicion
+    _comparar_con_reconstruccion(indice, nuevo)
+
+
+def test_altas_y_bajas():
+    viejo = _contratos()
+    altas = _contratos(53).iloc[50:]
+    nuevo = normalizar_contratos(pd.concat([viejo.drop([0, 7, 30]), altas], ignore_index=True).astype(object))
+    cambios, indice = _incremental(viejo, nuevo)
+    assert (len(cambios.altas), len(cambios.bajas), cambios.modificadas) == (3, 3, 0)
+    assert not cambios.misma_posicion
+    _comparar_con_reconstruccion(indice, nuevo)
+
+
+def test_altas_bajas_y_modificadas_juntas():
+    viejo = _contratos()
+    nuevo = viejo.drop([2, 44]).reset_index(drop=True)
+    nuevo.loc[10, 'Apellidos y nombres'] = NOMBRES[1]
+    nuevo = normalizar_contratos(pd.concat([_contratos(52).iloc[50:], nuevo], ignore_index=True).astype(object))
+    cambios, indice = _incremental(viejo, nuevo)
+    assert (len(cambios.altas), len(cambios.bajas), cambios.modificadas) == (2, 2, 1)
+    _comparar_con_reconstruccion(indice, nuevo)
+
+
+@pytest.mark.parametrize('dni', ['', '40000001'])
+def test_dni_vacio_o_repetido_reconstruye(dni):
+    viejo = _contratos()
+    nuevo = viejo.copy()
+    nuevo.loc[0, 'DNI / C.E.'] = dni
+    assert calcular_cambios(viejo, nuevo) is None
+    assert calcular_cambios(nuevo, viejo) is None
+
+
+def test_filas_reordenadas_reconstruye():
+    viejo = _contratos()
+    nuevo = viejo.iloc[[1, 0, *range(2, 50)]].reset_index(drop=True)
+    assert calcular_cambios(viejo, nuevo) is None
+
+
+def test_umbral_de_cambios():
+    viejo = _contratos()
+    nuevo = viejo.copy()
+    # 10 de 50 filas (20 %) todavía es incremental; 11 ya no
+    nuevo.loc[:9, 'Nº Celular'] = '911111111'
+    assert len(calcular_cambios(viejo, nuevo)) == 10
+    nuevo.loc[10, 'Nº Celular'] = '911111111'
+    assert calcular_cambios(viejo, nuevo) is None
+
+
+def test_sin_cambios():
+    viejo = _contratos()
+    cambios, indice = _incremental(viejo, viejo.copy())
+    assert len(cambios) == 0
+    _comparar_con_reconstruccion(indice, viejo)
+
+
+def _respuesta(repo, pregunta):
+    with recolectar_dependencias() as dependencias:
+        intent, respuesta = enrutador.atender(normalizar_texto(pregunta), repo)
+    return respuesta, dependencias, intent
+
+
+def test_cache_descarta_solo_las_respuestas_afectadas():
+    viejo = _contratos()
+    nuevo = viejo.copy()
+    nuevo.loc[1, 'Email'] = 'ana.quispe@siam.pe'                        # afecta al email de la fila 1
+    nuevo.loc[2, 'Fch. VENCIMIENTO'] = pd.Timestamp('2025-02-08')      # antes 2025-02-06
+    cambios = calcular_cambios(viejo, nuevo)
+    cambios.version_anterior, cambios.version = 'v1', 'v2'
+    preguntas = {
+        '¿Cuál es el email de 40000001?': True,
+        '¿Cuál es el email de 40000004?': False,
+        '¿Qué contratos vencen entre 2025-02-01 y 2025-02-10?': True,
+        '¿Qué contratos vencen entre 2026-01-01 y 2026-01-31?': False,
+        '¿Qué contratos vencen en febrero?': True,
+        '¿Qué contratos vencen en noviembre?': False,
+        '¿Qué contrato para usuario usuario2 existe?': True,
+        '¿Qué contrato para usuario usuario8 existe?': False,
+        '¿Cuándo vence el contrato de Nadie Conocido?': False,
+    }
+    cache = CacheRespuestas()
+    repo = RepositorioPandas(viejo, 'v1')
+    cache.obtener('', 'v1')
+    for pregunta in preguntas:
+        respuesta, dependencias, intent = _respuesta(repo, pregunta)
+        cache.guardar(normalizar_texto(pregunta), 'v1', respuesta, dependencias, intent)
+    cache.guardar('sin dependencias', 'v1', 'respuesta', None)
+
+    cache.actualizar_version('v1', 'v2', cambios)
+    for pregunta, afectada in preguntas.items():
+        assert (cache.obtener(normalizar_texto(pregunta), 'v2') is None) == afectada, pregunta
+    assert cache.obtener('sin dependencias', 'v2') is None
+    assert cache.estadisticas()['invalidadas'] == 5
+
+    # Las respuestas que quedaron son las mismas que daría la carga nueva
+    repo_nuevo = RepositorioPandas(nuevo, 'v2')
+    for pregunta, afectada in preguntas.items():
+        if not afectada:
+            assert cache.obtener(normalizar_texto(pregunta), 'v2')[0] == _respuesta(repo_nuevo, pregunta)[0]
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from chatbot.bot import enrutador
+from chatbot.datos import FECHA_MAXIMA, contratos_proximos_dias, rango_proximos_dias
+from chatbot.repositorio import RepositorioPandas
+
+
+def test_rango_proximos_dias():
+    assert rango_proximos_dias(30, '2025-07-01 15:30') == (pd.Timestamp('2025-07-01'), pd.Timestamp('2025-07-31'))
+
+
+def test_rango_proximos_dias_se_acota_a_la_fecha_maxima():
+    hoy = pd.Timestamp('2025-07-01')
+    assert rango_proximos_dias(200000, hoy) == (hoy, FECHA_MAXIMA)
+    assert rango_proximos_dias(10 ** 30, hoy) == (hoy, FECHA_MAXIMA)
+
+
+def test_contratos_proximos_dias_con_plazo_grande(contratos):
+    resultados = contratos_proximos_dias(contratos, 200000, hoy='2025-07-01')
+    assert list(resultados['Usuario']) == ['jperez', 'aquispe', 'ltorres']
+
+
+def test_responder_proximos_dias_con_plazo_grande(contratos):
+    respuesta = enrutador.despachar('que contratos vencen en los proximos 200000 dias', RepositorioPandas(contratos))
+    assert respuesta.startswith('Contratos que vencen en los próximos 200000 días:')
+    assert 'Torres Díaz Luis' in respuesta
@@ -0,0 +1,43 @@
+import csv
+import os
+import time
+
+from chatbot.historial import HistorialChat
+
+
+def _escribir(archivo, filas, **opciones):
+    historial = HistorialChat(str(archivo), **opciones)
+    for fila in filas:
+        historial.registrar(*fila)
+    historial.cerrar()
+
+
+def test_rota_por_edad_del_archivo_aunque_el_proceso_sea_nuevo(tmp_path):
+    archivo = tmp_path / 'historial.csv'
+    _escribir(archivo, [('hola', 'respuesta 1')], max_segundos=3600)
+    # El archivo empezó hace dos horas; un historial recién creado (como tras
+    # reiniciar la app) igual debe rotarlo
+    inicio = time.time() - 7200
+    (tmp_path / 'historial.csv.lock').write_text(repr(inicio), encoding='utf-8')
+    _escribir(archivo, [('chau', 'respuesta 2')], max_segundos=3600)
+    rotados = [n for n in os.listdir(tmp_path) if n.startswith('historial.') and n.endswith('.csv') and n != 'historial.csv']
+    assert len(rotados) == 1
+    with open(archivo, newline='', encoding='utf-8') as f:
+        assert list(csv.reader(f)) == [['pregunta', 'respuesta'], ['chau', 'respuesta 2']]
+    assert float((tmp_path / 'historial.csv.lock').read_text(encoding='utf-8')) > inicio
+
+
+def test_no_rota_antes_de_tiempo(tmp_path):
+    archivo = tmp_path / 'historial.csv'
+    _escribir(archivo, [('hola', 'respuesta 1')], max_segundos=3600)
+    _escribir(archivo, [('chau', 'respuesta 2')], max_segundos=3600)
+    assert sorted(os.listdir(tmp_path)) == ['historial.csv', 'historial.csv.lock']
+    with open(archivo, newline='', encoding='utf-8') as f:
+        assert len(list(csv.reader(f))) == 3
+
+
+def test_rota_por_tamano(tmp_path):
+    archivo = tmp_path / 'historial.csv'
+    _escribir(archivo, [('hola', 'x' * 100)], max_bytes=50)
+    _escribir(archivo, [('chau', 'respuesta 2')], max_bytes=50)
+    assert len(os.listdir(tmp_path)) == 3
@@ -0,0 +1,46 @@
+import pytest
+
+from chatbot.bot import enrutador
+from chatbot.intents import clave_literal
+from chatbot.texto import normalizar_texto
+
+# Una pregunta de ejemplo por intent registrado en chatbot.bot
+EJEMPLOS = {
+    'vencimiento_por_nombre': '¿Cuándo vence el contrato de Juan Pérez?',
+    'proximos_dias': '¿Qué contratos vencen en los próximos 30 días?',
+    'rango_fechas': '¿Qué contratos vencen entre 2025-07-01 y 2025-08-15?',
+    'contratos_por_mes': '¿Qué contratos vencen en julio?',
+    'correo_bienvenida': '¿Se envió el correo de bienvenida a Ana Quispe?',
+    'celular': '¿Qué número de celular tiene 12345678?',
+    'email': '¿Cuál es el email de Juan Pérez?',
+    'regimen_laboral': '¿Qué contratos del régimen laboral CAS hay?',
+    'tipo_contrato': '¿Qué contratos del tipo de contrato plazo hay?',
+    'usuario': '¿Qué contrato de usuario jperez vence?',
+}
+
+
+def test_hay_un_ejemplo_por_intent():
+    assert set(EJEMPLOS) == {intent.nombre for intent in enrutador.intents}
+
+
+@pytest.mark.parametrize('intent', enrutador.intents, ids=lambda intent: intent.nombre)
+def test_ejemplo_pasa_la_clave_y_la_regex(intent):
+    pregunta = normalizar_texto(EJEMPLOS[intent.nombre])
+    assert intent.clave in pregunta
+    assert intent.regex.search(pregunta)
+    assert enrutador.clasificar(pregunta)[0] is intent
+
+
+@pytest.mark.parametrize('patron, clave', [
+    ('abc', 'abc'),
+    ('?abc', 'abc'),
+    ('a?bc', 'bc'),
+    ('ab{2,3}cd', 'cd'),
+    ('ab|cd', ''),
+    ('(ab|cd)ef', 'ef'),
+    (r'x[a-z]yz', 'yz'),
+    (r'\.com\d', '.com'),
+    (r'n(?:ú|u)mero de celular (?:de|tiene) (?P<valor>.+)', 'mero de celular '),
+])
+def test_clave_literal(patron, clave):
+    assert clave_literal(patron) == clave
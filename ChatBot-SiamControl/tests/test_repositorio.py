@@ -0,0 +1,25 @@
+import time
+
+from chatbot.repositorio import RepositorioSQLite, actualizar_sqlite, sqlite_vigente
+
+
+def test_actualizar_sqlite_importa_solo_si_hace_falta(tmp_path, contratos):
+    fuente, db = str(tmp_path / 'contratos.csv'), str(tmp_path / 'contratos.db')
+    contratos.to_csv(fuente, index=False)
+    assert actualizar_sqlite(fuente, db)
+    assert not actualizar_sqlite(fuente, db)
+    time.sleep(0.01)
+    contratos.assign(Usuario='otro').to_csv(fuente, index=False)
+    assert not sqlite_vigente(fuente, db)
+    assert actualizar_sqlite(fuente, db)
+    assert sqlite_vigente(fuente, db)
+
+
+def test_repositorio_sqlite_ve_la_base_resincronizada(tmp_path, contratos):
+    fuente, db = str(tmp_path / 'contratos.csv'), str(tmp_path / 'contratos.db')
+    contratos.to_csv(fuente, index=False)
+    repo = RepositorioSQLite(db, fuente)
+    assert repo.buscar_fila('99999999') is None
+    time.sleep(0.01)
+    contratos.assign(**{'DNI / C.E.': ['99999999', '76543210', '11112222']}).to_csv(fuente, index=False)
+    assert repo.buscar_fila('99999999')['Apellidos y nombres'] == 'Pérez Gómez Juan'